@@ -7,8 +7,33 @@ import math
 #import pygame.math.Vector2
 #import pygame.math.Vector3 as Vec3d
 #import pygame.math.Vector2 as Vec2d
+import numpy
 from Vec2d import Vec2d
 from Vec3d import Vec3d
+from Vec3dArray import get_rotation_matrix
+
+# normalized circle points for every number of steps, shared by all circles
+GEOMETRY = {}
+
+
+def get_circle_points(steps):
+    """
+    return (segments x 3) array of points on unit circle
+    in x-z plane at y=0, first and last point are the same
+    """
+    steps = int(steps)
+    try:
+        return GEOMETRY[steps]
+    except KeyError:
+        pass
+    angle = numpy.linspace(0, 2 * math.pi, steps + 1)
+    points = numpy.zeros((steps + 1, 3))
+    points[:, 0] = numpy.cos(angle)
+    points[:, 2] = numpy.sin(angle)
+    # shared, so nobody should change it
+    points.setflags(write=False)
+    GEOMETRY[steps] = points
+    return points
 
 
 class Circle(object):
@@ -23,28 +48,21 @@ class Circle(object):
         self.viewer_distance = viewer_distance
         self.fov = fov
         # class variables
-        self.circle_raw_points = []
+        self.circle_raw_points = None
         self.circle = None
         self.transformed_circle = None
-        # generate master circle radius 1.0 no rotation
+        # get master circle radius 1.0 no rotation
         self.generate()
         self.resize_and_center()
 
     def generate(self):
-        """generate master circle"""
-        radius = 1.0
-        # draw circle in x-z plane at y=0
-        y = 0.0
-        for angle in self.step_generator(0, 2 * math.pi, self.steps):
-            x = math.cos(angle) * radius
-            z = math.sin(angle) * radius
-            self.circle_raw_points.append(Vec3d(x, y, z))
-        
+        """get master circle"""
+        self.circle_raw_points = get_circle_points(self.steps)
+
     def resize_and_center(self):
         """recenter and resize master circle"""
-        self.circle = []
-        for point in self.circle_raw_points:
-            self.circle.append(point * self.size + self.center)
+        self.circle = self.circle_raw_points * (self.size.x, self.size.y, self.size.z) + \
+            (self.center.x, self.center.y, self.center.z)
 
     def set_color(self, color):
         """setter for self.color"""
@@ -62,28 +80,19 @@ class Circle(object):
 
     def rotate(self, dx, dy, dz, offset2d=Vec2d(0, 0)):
         """rotates circle points and generates tranformed point array in 2d"""
-        # rotate and project every point to 2d
-        self.transformed_circle = []
-        for point in self.circle:
-            new_point = point.rotated_around_x(dx).rotated_around_y(dy).rotated_around_z(dz)
-            transformed = new_point.project(self.surface.get_width(), self.surface.get_height(), self.viewer_distance, self.fov)
-            self.transformed_circle.append((transformed.x + offset2d.x, transformed.y + offset2d.y))
-                
+        # rotate and project all points at once
+        points = self.circle.dot(get_rotation_matrix(dx, dy, dz).T)
+        # same projection as Vec3d.project, which got viewer_distance and fov swapped
+        factor = self.viewer_distance / (self.fov + points[:, 2])
+        self.transformed_circle = numpy.empty((len(points), 2))
+        self.transformed_circle[:, 0] = points[:, 0] * factor + self.surface.get_width() / 2 + offset2d.x
+        self.transformed_circle[:, 1] = -points[:, 1] * factor + self.surface.get_height() / 2 + offset2d.y
+
     def update(self, viewer_distance, fov):
-        """drawing"""
+        """drawing, returns rect drawn to"""
         self.viewer_distance = viewer_distance
         self.fov = fov
-        pygame.draw.polygon(self.surface, self.color, self.transformed_circle, 1)
-
-    @staticmethod
-    def step_generator(start, stop, steps):
-        """yields steps values between start and stop for float values"""
-        distance = stop - start
-        step = float(distance) / float(steps)
-        value = float(start)
-        while value <= stop:
-            yield value
-            value += step
+        return pygame.draw.polygon(self.surface, self.color, self.transformed_circle, 1)
 
 
 def test():
@@ -139,7 +148,7 @@ def test():
                     thing.update(viewer_distance=viewer_distance, fov=fov)
                 pygame.display.flip()
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 if __name__ == "__main__":
     test()
@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+"""
+compositor with dirty rectangles for effects on one display surface
+
+static layers like a Tree or the image of PlasmaFractal2 are drawn once
+into a cached background. every frame only the rectangles touched in the
+last frame are restored from this background, dynamic layers are drawn
+on top and the union of old and new dirty rectangles is pushed with
+pygame.display.update(rects), instead of clearing and flipping the whole
+screen.
+
+update() of a dynamic layer returns the pygame.Rect, or list of Rects,
+it has drawn to. None means unknown, the whole surface is dirty then
+
+    compositor = Compositor(surface)
+    compositor.add(Tree(surface, color, root, 8, 200), static=True)
+    compositor.add(ScrollText(surface, "text", 400, color))
+    while True:
+        compositor.update()
+"""
+import pygame
+
+
+def merge_rects(rects):
+    """union of overlapping rects, until no two of them overlap"""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class Layer(object):
+    """
+    one effect in compositor
+
+    effect - object with update()
+    static - if True, drawn once into background
+    start, stop - seconds since start of compositor, in which layer is
+        active, None for always
+    kwargs - passed to every effect.update()
+    """
+
+    def __init__(self, effect, static=False, start=None, stop=None, kwargs=None):
+        self.effect = effect
+        self.static = static
+        self.start = start
+        self.stop = stop
+        self.kwargs = kwargs or {}
+
+    def is_active(self, runtime):
+        if self.start is not None and runtime < self.start:
+            return False
+        if self.stop is not None and runtime >= self.stop:
+            return False
+        return True
+
+    def update(self):
+        return self.effect.update(**self.kwargs)
+
+
+class Compositor(object):
+    """
+    compositor for effects on one display surface
+
+    surface - display surface, all effects have to draw on this
+    background - color of empty background
+    """
+
+    def __init__(self, surface, background=(0, 0, 0, 255)):
+        self.surface = surface
+        self.background_color = background
+        self.rect = surface.get_rect()
+        self.layers = []
+        # cached background with static layers
+        self.background = None
+        # static layers drawn into background
+        self.static_layers = None
+        # rects drawn in last frame, have to be restored in next one
+        self.dirty = []
+        # statistics
+        self.frames = 0
+        self.pixels = 0
+
+    def add(self, effect, static=False, start=None, stop=None, **kwargs):
+        """
+        add effect as topmost layer, static layers are always
+        below of all dynamic layers. returns layer
+        """
+        layer = Layer(effect, static, start, stop, kwargs)
+        self.layers.append(layer)
+        return layer
+
+    def invalidate(self):
+        """static layers changed, cache is drawn again in next frame"""
+        self.static_layers = None
+
+    def render_background(self, static_layers):
+        """draw static layers once, and keep copy of result"""
+        self.surface.fill(self.background_color)
+        for layer in static_layers:
+            layer.update()
+        self.background = self.surface.copy()
+        self.static_layers = static_layers
+
+    def get_dirty_rects(self, rects):
+        """list of rects clipped to surface, from return value of update()"""
+        if rects is None:
+            return [self.rect]
+        if isinstance(rects, pygame.Rect):
+            rects = (rects, )
+        return [self.rect.clip(rect) for rect in rects]
+
+    def update(self, runtime=0):
+        """
+        draw one frame, runtime in seconds selects active layers,
+        returns list of rects pushed to display
+        """
+        active = [layer for layer in self.layers if layer.is_active(runtime)]
+        static_layers = [layer for layer in active if layer.static]
+        if static_layers != self.static_layers:
+            self.render_background(static_layers)
+            # whole screen changed
+            self.dirty = [self.rect]
+        else:
+            # restore background under last frame
+            for rect in self.dirty:
+                self.surface.blit(self.background, rect, rect)
+        dirty = []
+        for layer in active:
+            if not layer.static:
+                dirty.extend(self.get_dirty_rects(layer.update()))
+        update_rects = merge_rects(rect for rect in self.dirty + dirty if rect.width and rect.height)
+        pygame.display.update(update_rects)
+        self.dirty = dirty
+        self.frames += 1
+        self.pixels += sum(rect.width * rect.height for rect in update_rects)
+        return update_rects
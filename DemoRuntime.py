@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+"""
+fixed timestep runtime for effects
+
+simulation of every effect runs at its own fixed rate, independent of
+rendering. effects with step() and draw(alpha) are stepped as often as
+needed to keep up with wall clock, and drawn interpolated between the
+last two simulation states. on a loaded machine rendered frames are
+skipped first, then simulation steps above the per effect budget are
+dropped, so a slow frame does not slow down the whole simulation.
+
+effects with only update() are simulated and drawn once per rendered
+frame, like before
+
+    runtime = Runtime(surface, fps=60)
+    runtime.add(Universe(surface, stars=2000), rate=30, budget=0.01)
+    runtime.run()
+"""
+import sys
+import time
+import pygame
+
+
+class UpdateEffect(object):
+    """adapter for effects, which only have update()"""
+
+    def __init__(self, effect):
+        self.effect = effect
+
+    def step(self):
+        pass
+
+    def draw(self, alpha=1.0):
+        self.effect.update()
+
+
+class Scheduler(object):
+    """
+    fixed timestep scheduler of one effect
+
+    effect - object with step() and draw(alpha)
+    rate - simulation steps per second
+    budget - seconds per frame this effect may spend in step(),
+        if used up, the rest of the backlog is dropped
+    max_steps - at most this many steps per frame
+    """
+
+    def __init__(self, effect, rate=30, budget=0.01, max_steps=5):
+        self.effect = effect
+        self.rate = rate
+        self.dt = 1.0 / rate
+        self.budget = budget
+        self.max_steps = max_steps
+        # wall clock seconds not yet simulated
+        self.accumulator = 0.0
+        # statistics
+        self.steps = 0
+        self.dropped = 0
+
+    def advance(self, elapsed):
+        """
+        simulate elapsed seconds of wall clock in fixed steps,
+        returns alpha, fraction of next step already elapsed
+        """
+        self.accumulator += elapsed
+        starttime = time.perf_counter()
+        steps = 0
+        while self.accumulator >= self.dt:
+            if steps >= self.max_steps or time.perf_counter() - starttime > self.budget:
+                # behind schedule, simulation slows down instead of
+                # taking longer and longer to catch up
+                dropped = int(self.accumulator / self.dt)
+                self.dropped += dropped
+                self.accumulator -= dropped * self.dt
+                break
+            self.effect.step()
+            self.accumulator -= self.dt
+            steps += 1
+        self.steps += steps
+        return self.accumulator / self.dt
+
+    def draw(self, alpha):
+        self.effect.draw(alpha)
+
+
+class Runtime(object):
+    """
+    main loop for effects on one surface
+
+    surface - display surface
+    fps - rendering rate
+    max_skip - if behind schedule, up to this many frames in a row
+        are not drawn, simulation still advances
+    background - fill color of every frame, None for no fill
+    """
+
+    def __init__(self, surface, fps=60, max_skip=5, background=(0, 0, 0, 255)):
+        self.surface = surface
+        self.fps = fps
+        self.period = 1.0 / fps
+        self.max_skip = max_skip
+        self.background = background
+        self.schedulers = []
+        self.deadline = None
+        self.lasttime = None
+        self.skipped_in_row = 0
+        # statistics
+        self.frames = 0
+        self.skipped = 0
+
+    def add(self, effect, rate=30, budget=0.01, max_steps=5):
+        """add effect, returns its scheduler"""
+        if not hasattr(effect, "step"):
+            effect = UpdateEffect(effect)
+        scheduler = Scheduler(effect, rate, budget, max_steps)
+        self.schedulers.append(scheduler)
+        return scheduler
+
+    def frame(self):
+        """advance simulation to now and draw, returns True if frame was drawn"""
+        now = time.perf_counter()
+        if self.lasttime is None:
+            self.lasttime = self.deadline = now
+        elapsed = now - self.lasttime
+        self.lasttime = now
+        alphas = [scheduler.advance(elapsed) for scheduler in self.schedulers]
+        # deadline is the planned start of next frame, more than
+        # one frame behind it, drawing is left out
+        self.deadline += self.period
+        late = time.perf_counter() - self.deadline > self.period
+        if late and self.skipped_in_row < self.max_skip:
+            self.skipped += 1
+            self.skipped_in_row += 1
+            return False
+        if late:
+            # too far behind to catch up, start schedule over
+            self.deadline = time.perf_counter()
+        self.skipped_in_row = 0
+        if self.background is not None:
+            self.surface.fill(self.background)
+        for (scheduler, alpha) in zip(self.schedulers, alphas):
+            scheduler.draw(alpha)
+        pygame.display.flip()
+        self.frames += 1
+        return True
+
+    def run(self, duration=None, keyhandler=None):
+        """
+        run until window is closed, escape is pressed or
+        duration seconds are over, p pauses simulation and rendering
+
+        keyhandler - called with result of pygame.key.get_pressed()
+        """
+        starttime = time.perf_counter()
+        pause = False
+        while True:
+            # wait for planned start of frame, no waiting if behind
+            if self.deadline is not None:
+                delay = self.deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                time.sleep(self.period)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                    pause = not pause
+            keyinput = pygame.key.get_pressed()
+            if keyinput[pygame.K_ESCAPE]:
+                return
+            if keyhandler is not None:
+                keyhandler(keyinput)
+            if pause:
+                # time in pause is not simulated
+                self.lasttime = self.deadline = None
+                continue
+            self.frame()
+            if duration is not None and time.perf_counter() - starttime > duration:
+                return
+
+    def print_stats(self, out=sys.stdout):
+        """print drawn and skipped frames, steps and dropped steps per effect"""
+        out.write("%d frames drawn, %d skipped\n" % (self.frames, self.skipped))
+        for scheduler in self.schedulers:
+            out.write("%s: %d steps at %d/s, %d dropped\n" % (
+                scheduler.effect.__class__.__name__, scheduler.steps, scheduler.rate, scheduler.dropped))
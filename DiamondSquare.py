@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+"""
+iterative diamond-square heightmap generator
+
+the heightmap is calculated level by level, not recursively. all
+midpoints of one level are calculated at once with array operations on
+strided views of one float32 array, so a 4096x4096 map takes only some
+hundred milliseconds. random numbers come from a numpy Generator, the
+same seed gives the same map.
+
+    heights = diamond_square(1024, roughness=1.5, rng=42)
+    index = to_index(heights)
+    pixels[:] = palette[index]
+"""
+import numpy
+
+
+def next_power_of_two(value):
+    """smallest power of two not less than value"""
+    return 1 << max(int(value) - 1, 0).bit_length()
+
+
+def diamond_square(size, roughness=1.0, rng=None, corners=None, tileable=False):
+    """
+    heightmap of (size + 1, size + 1) values, or (size, size) if tileable
+
+    size - power of two
+    roughness - random displacement of midpoints of cells with width step
+        is uniform in +/- roughness * step / size / 2
+    rng - numpy Generator, seed or None
+    corners - values of the four corners, random in 0 to 1 if None
+    tileable - if True, map wraps around at its borders, it can be tiled
+        seamlessly, all four corners have the first value of corners
+    """
+    if size < 1 or size & (size - 1):
+        raise ValueError("size %s is not a power of two" % size)
+    rng = numpy.random.default_rng(rng)
+    if corners is None:
+        corners = rng.random(4)
+    heights = numpy.zeros((size + 1, size + 1), dtype=numpy.float32)
+    if tileable:
+        heights[::size, ::size] = corners[0]
+    else:
+        heights[::size, ::size] = numpy.reshape(corners, (2, 2))
+    step = size
+    while step > 1:
+        half = step // 2
+        scale = numpy.float32(roughness * step / size)
+        # values at corners of all cells of this level
+        corner = heights[::step, ::step]
+        cells = corner.shape[0] - 1
+        # diamond step, center of every cell from its four corners
+        center = heights[half::step, half::step]
+        center[:] = corner[:-1, :-1] + corner[1:, :-1] + corner[:-1, 1:] + corner[1:, 1:]
+        center *= 0.25
+        center += (rng.random(center.shape, dtype=numpy.float32) - 0.5) * scale
+        # centers padded with their neighbours beyond the border, wrapped
+        # around or zero, then count of neighbours is 3 at the border
+        padded = numpy.zeros((cells + 2, cells + 2), dtype=numpy.float32)
+        padded[1:-1, 1:-1] = center
+        count = numpy.full(cells + 1, 4, dtype=numpy.float32)
+        if tileable:
+            padded[0, 1:-1] = center[-1]
+            padded[-1, 1:-1] = center[0]
+            padded[1:-1, 0] = center[:, -1]
+            padded[1:-1, -1] = center[:, 0]
+        else:
+            count[0] = count[-1] = 3
+        # square step, midpoints of edges along second axis from the two
+        # corners, and centers of the cells on both sides
+        edge = heights[::step, half::step]
+        edge[:] = corner[:, :-1] + corner[:, 1:] + padded[:-1, 1:-1] + padded[1:, 1:-1]
+        edge /= count[:, numpy.newaxis]
+        edge += (rng.random(edge.shape, dtype=numpy.float32) - 0.5) * scale
+        # same for edges along first axis
+        edge = heights[half::step, ::step]
+        edge[:] = corner[:-1] + corner[1:] + padded[1:-1, :-1] + padded[1:-1, 1:]
+        edge /= count[numpy.newaxis, :]
+        edge += (rng.random(edge.shape, dtype=numpy.float32) - 0.5) * scale
+        if tileable:
+            # border on right and bottom is the same as on left and top
+            heights[-1, half::step] = heights[0, half::step]
+            heights[half::step, -1] = heights[half::step, 0]
+        step = half
+    if tileable:
+        return heights[:-1, :-1]
+    return heights
+
+
+def tile(heights, width, height):
+    """tileable heightmap repeated to cover width x height"""
+    (size_x, size_y) = heights.shape
+    return numpy.tile(heights, (-(-width // size_x), -(-height // size_y)))[:width, :height]
+
+
+def to_index(heights, low=0.0, high=1.0, out=None):
+    """heights between low and high clipped and quantized to 8 bit palette index"""
+    if out is None:
+        out = numpy.empty(heights.shape, dtype=numpy.uint8)
+    scaled = (heights - numpy.float32(low)) * numpy.float32(255.0 / (high - low))
+    numpy.clip(scaled, 0, 255, out=scaled)
+    out[:] = scaled
+    return out
+
+
+########################################################################
+## Unit Testing                                                       ##
+########################################################################
+if __name__ == "__main__":
+
+    import unittest
+
+    ####################################################################
+    class UnitTestDiamondSquare(unittest.TestCase):
+
+        def testShape(self):
+            self.assertEqual(diamond_square(16, rng=1).shape, (17, 17))
+            self.assertEqual(diamond_square(16, rng=1, tileable=True).shape, (16, 16))
+            self.assertEqual(diamond_square(1, rng=1).shape, (2, 2))
+
+        def testPowerOfTwo(self):
+            for size in (0, -4, 3, 12, 100):
+                self.assertRaises(ValueError, diamond_square, size)
+            self.assertEqual([next_power_of_two(value) for value in (0, 1, 3, 4, 5, 600)], [1, 1, 4, 4, 8, 1024])
+
+        def testSeed(self):
+            heights = diamond_square(64, roughness=1.5, rng=42)
+            self.assertTrue(numpy.array_equal(heights, diamond_square(64, roughness=1.5, rng=42)))
+            self.assertTrue(numpy.array_equal(heights, diamond_square(64, roughness=1.5, rng=numpy.random.default_rng(42))))
+            self.assertFalse(numpy.array_equal(heights, diamond_square(64, roughness=1.5, rng=43)))
+
+        def testCorners(self):
+            heights = diamond_square(8, rng=1, corners=(0.1, 0.2, 0.3, 0.4))
+            self.assertTrue(numpy.allclose(heights[::8, ::8], ((0.1, 0.2), (0.3, 0.4))))
+
+        def testTileable(self):
+            for seed in range(5):
+                heights = diamond_square(64, rng=seed, tileable=True)
+                # step across the border is as big as steps inside
+                for axis in (0, 1):
+                    inside = numpy.abs(numpy.diff(heights, axis=axis)).mean()
+                    border = numpy.abs(heights.take(-1, axis=axis) - heights.take(0, axis=axis)).mean()
+                    self.assertLess(border, 2 * inside)
+
+        def testTile(self):
+            heights = diamond_square(8, rng=1, tileable=True)
+            tiled = tile(heights, 20, 12)
+            self.assertEqual(tiled.shape, (20, 12))
+            self.assertTrue(numpy.array_equal(tiled[8:16, :8], heights))
+            self.assertTrue(numpy.array_equal(tiled[16:, 8:], heights[:4, :4]))
+
+        def testToIndex(self):
+            heights = numpy.array(((-1.0, 0.0, 0.5), (1.0, 2.0, 0.25)), dtype=numpy.float32)
+            index = to_index(heights)
+            self.assertEqual(index.dtype, numpy.uint8)
+            self.assertEqual(index.tolist(), [[0, 0, 127], [255, 255, 63]])
+            self.assertEqual(to_index(heights, low=-1.0, high=2.0).tolist(), [[0, 85, 127], [170, 255, 106]])
+            out = numpy.zeros(heights.shape, dtype=numpy.uint8)
+            self.assertTrue(to_index(heights, out=out) is out)
+            self.assertEqual(out.tolist(), index.tolist())
+
+    ####################################################################
+    unittest.main()
@@ -1,87 +1,48 @@
 #!/usr/bin/python3
 
-import sys
 import pygame
-import random
 import cProfile
 import time
 import numpy
 # own modules
-from Vec2dFast import Vec2d
-#from Vec3d import Vec3d
+from Vec2d import Vec2d
+from Vec2dArray import Vec2dArray
 
 
 class Thing(object):
     """
     the thing at starting point moves randomly
+
+    only a view of one thing, all data is stored in arrays of universe
     """
 
-    def __init__(self, surface, universe, pos2d, color):
-        self.surface = surface
+    color = pygame.Color(128, 128, 128, 255)
+    kind = None
+
+    def __init__(self, universe, index):
         self.universe = universe
-        self.position = pos2d
-        # define some additional variables
-        self.direction = Vec2d(random.random(), random.random())
-        self.color = pygame.Color(128, 128, 128, 255)
-        self.next_direction = self.direction
-        self.next_position = None
-
-    def update(self):
-        # sum up all directions to every other particle
-        #print sum(self.get_direction_to(other) for other in self.universe.things)
-        #    direction = self.get_direction_to(other)
-        #    self.next_direction.x += direction.x
-        #    self.next_direction.y += direction.y
-        # multiply by timescaler, to get fast movement also on slow
-        # computers
-        self.next_direction = self.next_direction.normalized() * self.universe.timescale
-        self.next_position = self.position + self.next_direction
-        self.check_boundaries() # inside visible area
-        if not self.check_reserved(): # is the new position already used
-            self.position = self.next_position
-        self.direction = self.next_direction
-        self.surface.set_at((int(self.position.x), int(self.position.y)), self.color)
+        self.index = index
 
-    def get_nearest_thing(self):
-        min_dist = None
-        nearest_thing = None
-        for other_thing in self.universe.things:
-            if other_thing == self:
-                continue
-            direction = other_thing.get_direction_to(self)
-            distance = direction.length
-            if (min_dist is None) or (min_dist > distance):
-                nearest_thing = other_thing
-                min_dist = distance
-        return nearest_thing
-
-    def check_reserved(self):
-        """
-        check if on new position there is some other element
-        if yes, stop
-        """
-        if self.surface.get_at((int(self.next_position.x), int(self.next_position.y))) != self.universe.empty:
-        #if new_position in self.universe.positions:
-            return True
-        return False
+    def __getposition(self):
+        return self.universe.positions[self.index]
+    def __setposition(self, value):
+        self.universe.positions[self.index] = value
+    position = property(__getposition, __setposition, None, "position, view into universe")
 
-    def check_boundaries(self):
-        """
-        check if position is outside of visible surface,
-        and change direction accordingly
-        """
-        if not (0 < self.next_position.x < self.surface.get_width()):
-            self.next_direction.x *= -1
-            self.next_position.x = self.position.x
-        if not (0 < self.next_position.y < self.surface.get_height()):
-            self.next_direction.y *= -1
-            self.next_position.y = self.position.y
+    def __getdirection(self):
+        return self.universe.directions[self.index]
+    def __setdirection(self, value):
+        self.universe.directions[self.index] = value
+    direction = property(__getdirection, __setdirection, None, "direction, view into universe")
+
+    def get_nearest_thing(self):
+        return self.universe.get_nearest_thing(self.position, exclude=self.index)
 
     def get_direction_to(self, other):
         return self.position - other.position
 
     def get_distance_to(self, other):
-        return self.get_direction_to(other).length()
+        return self.get_direction_to(other).length
 
 
 class Neutron(Thing):
@@ -89,10 +50,8 @@ class Neutron(Thing):
     the thing at starting point moves randomly
     """
 
-    def __init__(self, surface, universe, pos2d, color):
-        Thing.__init__(self, surface, universe, pos2d, color)
-        self.color = pygame.Color(0, 0, 255, 255)
-        self.kind = "Neutron"
+    color = pygame.Color(0, 0, 255, 255)
+    kind = "Neutron"
 
     def get_direction_to(self, other):
         if other.kind == self.kind:
@@ -100,19 +59,13 @@ class Neutron(Thing):
         return other.position - self.position
 
 
-    def get_distance_to(self, other):
-        return self.get_direction_to(other).length()
-
-
 class Proton(Thing):
     """
     the thing at starting point moves randomly
     """
 
-    def __init__(self, surface, universe, pos2d, color):
-        Thing.__init__(self, surface, universe, pos2d, color)
-        self.color = pygame.Color(0, 255, 0, 255)
-        self.kind = "Proton"
+    color = pygame.Color(0, 255, 0, 255)
+    kind = "Proton"
 
     def get_direction_to(self, other):
         # wants to neutron
@@ -120,22 +73,14 @@ class Proton(Thing):
             return self.position - other.position
         return other.position - self.position
 
-    def get_distance_to(self, other):
-        return self.get_direction_to(other).length()
-
 
 class Electron(Thing):
     """
     the thing at starting point moves randomly
     """
 
-    def __init__(self, surface, universe, pos2d, color):
-        Thing.__init__(self, surface, universe, pos2d, color)
-        self.color = pygame.Color(255, 0, 0, 255)
-        self.kind = "Electron"
-
-    def get_distance_to(self, other):
-        return self.get_direction_to(other).length
+    color = pygame.Color(255, 0, 0, 255)
+    kind = "Electron"
 
     def get_direction_to(self, other):
         # wants to pronton
@@ -147,9 +92,13 @@ class Electron(Thing):
             return other.position - self.position
 
 
-
 class Universe(object):
-    """Universe with Things"""
+    """Universe with Things
+
+    positions and directions of all things are held in arrays,
+    collisions are checked against an occupancy bitmap with one
+    entry per pixel, all things move at once
+    """
 
     kinds = (Proton, Electron, Neutron)
     #kinds = (Proton, )
@@ -157,8 +106,7 @@ class Universe(object):
     def __init__(self, surface, number, speed=0.01):
         """
         surface = pygame.Surface
-        stars - amount of strar to create
-        depth - z axis depth from 0 to 0+depth
+        number - ignored, every point of text becomes a thing
         speed - how fast should stars travel
         """
         self.surface = surface
@@ -166,100 +114,125 @@ class Universe(object):
         self.speed = speed
         # set initial variables
         self.color = pygame.Color(255, 255, 255, 255)
-        self.empty = pygame.Color(0, 0, 0, 255) # indicates empty place
+        self.width = surface.get_width()
+        self.height = surface.get_height()
+        self.rng = numpy.random.default_rng()
+        # True for every pixel used by a thing
+        self.occupied = numpy.zeros((self.width, self.height), dtype=bool)
         # initialize array
         self.things = []
-        self.positions = []
         # initial text surface to get points from
         self.font = pygame.font.SysFont("mono", 20, bold=True)
         self.text_surface = self.font.render("AM", True, self.color)
         self.number = self.text_surface.get_width() * self.text_surface.get_height()
-        print "There are %d points in Textsurface" % self.number
+        print("There are %d points in Textsurface" % self.number)
         self.timestamp = 1
-        self.fps = 1.0 / 30.0
-        self.lasttime = None
-        self.timescale = None
+        # positions before last step, for interpolation
+        self.previous = None
         # initialize universe
         self.generate()
 
     def generate(self):
-        zoom = Vec2d(10, 10)
+        """one thing for every visible pixel of text surface"""
+        zoom = 10
         pan = Vec2d(200, 100)
-        """ generates 3d starfield, z=0 to z=depth """
-        for x in range(self.text_surface.get_width()):
-            for y in range(self.text_surface.get_height()):
-                color = self.text_surface.get_at((x, y))
-                if color != pygame.Color(255, 255, 255, 0):
-                    print "Found non-black color %s at %s x %s" % (color, x, y)
-                    kind = int(random.random() * len(self.kinds))
-                    pos2d = Vec2d(x, y) * zoom + pan
-                    new_thing = self.kinds[kind](self.surface, self, pos2d, self.color)
-                    self.things.append(self.kinds[kind](self.surface, self, pos2d, self.color))
-                    self.positions.append(new_thing.position)
-        print "Placed %d things in universe" % len(self.things)
-        self.lasttime = time.time()
+        (xs, ys) = numpy.nonzero(pygame.surfarray.array_alpha(self.text_surface))
+        count = len(xs)
+        kind_index = self.rng.integers(0, len(self.kinds), count)
+        self.positions = Vec2dArray(xs * zoom + pan.x, ys * zoom + pan.y)
+        self.directions = Vec2dArray(self.rng.random(count), self.rng.random(count))
+        self.things = [self.kinds[index](self, number) for (number, index) in enumerate(kind_index)]
+        self.colors = numpy.array([self.surface.map_rgb(kind.color) for kind in self.kinds], dtype=numpy.uint32)[kind_index]
+        (x, y, inside) = self.get_pixels(self.positions)
+        self.occupied[:] = False
+        self.occupied[x[inside], y[inside]] = True
+        print("Placed %d things in universe" % len(self.things))
+
+    def get_pixels(self, positions):
+        """pixel of every position, and mask of pixels on surface"""
+        x = positions.data[0].astype(numpy.intp)
+        y = positions.data[1].astype(numpy.intp)
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        return x, y, inside
+
+    def get_nearest_thing(self, position, exclude=None):
+        """nearest thing to position, thing with index exclude is skipped"""
+        distance = (self.positions - position).get_length_sqrd()
+        if exclude is not None:
+            distance[exclude] = numpy.inf
+        return self.things[int(numpy.argmin(distance))]
+
+    def draw(self, alpha=1.0):
+        """
+        write all things in one scatter into pixels2d,
+        alpha interpolates between positions before and after last step
+        """
+        positions = self.positions
+        if alpha < 1.0 and self.previous is not None:
+            positions = self.previous.interpolate_to(self.positions, alpha)
+        (x, y, inside) = self.get_pixels(positions)
+        pixels = pygame.surfarray.pixels2d(self.surface)
+        pixels[x[inside], y[inside]] = self.colors[inside]
+        del pixels
+
+    def step(self):
+        """
+        one tick of simulation, every thing moves one pixel,
+        the scheduler of DemoRuntime calls this at fixed rate
+        """
+        self.previous = self.positions.copy()
+        directions = self.directions.normalized()
+        next_positions = self.positions + directions
+        # inside visible area, else reflect and stay
+        for (axis, size) in ((0, self.width), (1, self.height)):
+            outside = (next_positions.data[axis] <= 0) | (next_positions.data[axis] >= size)
+            directions.data[axis, outside] *= -1
+            next_positions.data[axis, outside] = self.positions.data[axis, outside]
+        # is the new pixel already used by some other thing
+        (x, y, inside) = self.get_pixels(self.positions)
+        (next_x, next_y, next_inside) = self.get_pixels(next_positions)
+        moving = (next_x != x) | (next_y != y)
+        targets = moving & next_inside
+        blocked = numpy.zeros(len(x), dtype=bool)
+        blocked[targets] = self.occupied[next_x[targets], next_y[targets]]
+        # of all things moving to the same free pixel, the first one wins
+        candidates = numpy.flatnonzero(targets & ~blocked)
+        (_, first) = numpy.unique(next_x[candidates] * self.height + next_y[candidates], return_index=True)
+        losers = numpy.ones(len(candidates), dtype=bool)
+        losers[first] = False
+        blocked[candidates[losers]] = True
+        # update occupancy bitmap in bulk
+        move = ~blocked
+        leave = move & moving & inside
+        self.occupied[x[leave], y[leave]] = False
+        enter = move & moving & next_inside
+        self.occupied[next_x[enter], next_y[enter]] = True
+        self.positions.data[:, move] = next_positions.data[:, move]
+        self.directions = directions
+        self.timestamp += 1
 
     def update(self, fov=2, viewer_distance=256):
         """update every frame"""
-        duration = time.time() - self.lasttime
-        self.timescale = self.fps / duration
-        #print "Duration %f fps should %f Timescale %f" % (duration, self.fps, self.timescale)
-        #parray = pygame.surfarray.pixels2d(surface)
-        for thing in self.things:
-            thing.update()
-        self.timestamp += 1
-        self.lasttime = time.time()
+        self.step()
+        self.draw()
 
 def main():
     """test"""
+    from DemoRuntime import Runtime
     try:
-        fps = 255
         surface = pygame.display.set_mode((600, 600))
         pygame.init()
         # create universe
         universe = Universe(surface, number=50, speed=0.01)
-        clock = pygame.time.Clock()
-        # for 3d projection
-        fov = 1
-        max_running_time = time.time() + 30
-        viewer_distance = 256
-        pause = False
+        runtime = Runtime(surface, fps=60)
+        runtime.add(universe, rate=30)
         starttime = time.time()
-        while True:
-            clock.tick(fps)
-            events = pygame.event.get()
-            for event in events:
-                if event.type == pygame.QUIT:
-                    sys.exit(0)
-            keyinput = pygame.key.get_pressed()
-            if keyinput is not None:
-                # print keyinput
-                if keyinput[pygame.K_ESCAPE]:
-                    break
-                if keyinput[pygame.K_UP]:
-                    viewer_distance += 1
-                if keyinput[pygame.K_DOWN]:
-                    viewer_distance -= 1
-                if keyinput[pygame.K_PLUS]:
-                    fov += .1
-                if keyinput[pygame.K_MINUS]:
-                    fov -= .1
-                if keyinput[pygame.K_p]:
-                    pause = not pause
-                if keyinput[pygame.K_r]:
-                    viewer_distance = 256
-                    fov = 2
-            if pause is not True:
-                surface.fill((0, 0, 0, 255))
-                universe.update(viewer_distance=viewer_distance, fov=fov)
-                pygame.display.flip()
-            if time.time() > max_running_time:
-                break
-        print "Last observed universe timestamp %d" % universe.timestamp
-        print "Took %f seconds" % (time.time() - starttime)
-        print "Took %f per frame at %f fps" % ((time.time() - starttime) / universe.timestamp, universe.timestamp/(time.time() - starttime))
+        runtime.run(duration=30)
+        runtime.print_stats()
+        print("Last observed universe timestamp %d" % universe.timestamp)
+        print("Took %f seconds" % (time.time() - starttime))
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 if __name__ == "__main__":
     cProfile.run("main()")
@@ -0,0 +1,228 @@
+#!/usr/bin/python3
+"""
+glyph atlas shared by all text effects
+
+every glyph, given by font, size, bold, color and character, is rendered
+once into one packed texture surface. if the atlas is full, least recently
+used glyphs are evicted, so memory is bounded by size of atlas, not by
+length of texts. fonts are loaded only once too.
+
+strings are not rendered into one surface, TextLine lays them out and
+blits only the glyphs around the visible window into a small cache
+surface, no longer than twice the window
+
+    line = TextLine("Dolor Ipsum", ("mono", 30, True), pygame.Color(255, 255, 0))
+    line.draw(surface, (0, 400), left=position, width=surface.get_width())
+"""
+import os
+import collections
+import numpy
+import pygame
+
+
+# loaded fonts by (name, size, bold)
+FONTS = {}
+
+def get_font(name, size, bold=False):
+    """
+    load font once, name is None for default font,
+    a path to font file, or the name of a system font
+    """
+    key = (name, size, bold)
+    font = FONTS.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        if name is None or os.path.isfile(name):
+            font = pygame.font.Font(name, size)
+            font.set_bold(bold)
+        else:
+            font = pygame.font.SysFont(name, size, bold=bold)
+        FONTS[key] = font
+    return font
+
+
+class GlyphAtlas(object):
+    """
+    packed texture of glyphs with LRU eviction
+
+    glyphs are packed in shelves, one shelf for every glyph height.
+    space of evicted glyphs is reused by glyphs of same size, if no
+    such glyph is left, the atlas starts over empty
+
+    width, height - size of texture surface
+    """
+
+    def __init__(self, width=1024, height=1024):
+        self.width = width
+        self.height = height
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+        # statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.clear()
+
+    def clear(self):
+        """remove all glyphs"""
+        self.surface.fill((0, 0, 0, 0))
+        # rect in surface by key, oldest first
+        self.glyphs = collections.OrderedDict()
+        # [y, height, next free x] of every shelf
+        self.shelves = []
+        self.next_y = 0
+        # rects of evicted glyphs by size
+        self.free = {}
+
+    def pack(self, width, height):
+        """free rect of size in shelves, None if atlas is full"""
+        for shelf in self.shelves:
+            if shelf[1] == height and shelf[2] + width <= self.width:
+                rect = pygame.Rect(shelf[2], shelf[0], width, height)
+                shelf[2] += width
+                return rect
+        if self.next_y + height <= self.height and width <= self.width:
+            self.shelves.append([self.next_y, height, width])
+            self.next_y += height
+            return pygame.Rect(0, self.next_y - height, width, height)
+        return None
+
+    def allocate(self, size):
+        """rect for glyph of size, evicts least recently used glyphs if needed"""
+        free = self.free.get(size)
+        if free:
+            return free.pop()
+        rect = self.pack(*size)
+        while rect is None and self.glyphs:
+            (_, old) = self.glyphs.popitem(last=False)
+            self.evictions += 1
+            if old.size == size:
+                return old
+            self.free.setdefault(old.size, []).append(old)
+        if rect is None:
+            # nothing of this size to evict, start over
+            self.clear()
+            rect = self.pack(*size)
+            if rect is None:
+                raise ValueError("glyph of size %s does not fit into atlas" % (size, ))
+        return rect
+
+    def get_glyph(self, font, color, char):
+        """
+        rect of glyph in surface, rendered if not already in atlas
+        font - (name, size, bold)
+        only valid until next call, which could evict this glyph
+        """
+        key = (font, tuple(color), char)
+        rect = self.glyphs.get(key)
+        if rect is not None:
+            self.glyphs.move_to_end(key)
+            self.hits += 1
+            return rect
+        self.misses += 1
+        glyph = get_font(*font).render(char, True, color)
+        rect = self.allocate(glyph.get_size())
+        # copy glyph with its alpha, blending onto transparent would darken it
+        self.surface.fill((0, 0, 0, 0), rect)
+        self.surface.blit(glyph, rect, special_flags=pygame.BLEND_RGBA_MAX)
+        self.glyphs[key] = rect
+        return rect
+
+
+# atlas used by default
+ATLAS = None
+
+def get_atlas():
+    """shared atlas of all text effects"""
+    global ATLAS
+    if ATLAS is None:
+        ATLAS = GlyphAtlas()
+    return ATLAS
+
+
+class TextLine(object):
+    """
+    one line of text, laid out with glyphs of atlas
+
+    only x offset of every character is stored, glyphs are looked up
+    in atlas, when they are drawn. the part around the visible window
+    is kept in a cache surface of about twice the window width, so
+    scrolling text needs one blit per frame, and glyphs are blitted
+    only if the window leaves this part
+    """
+
+    def __init__(self, text, font, color, atlas=None):
+        """
+        (string) text - text to draw
+        (tuple) font - (name, size, bold) as for get_font
+        (pygame.Color) color - color of font
+        (GlyphAtlas) atlas - None for shared atlas
+        """
+        self.text = text
+        self.font = font
+        self.color = color
+        self.atlas = atlas if atlas is not None else get_atlas()
+        loaded = get_font(*font)
+        sizes = dict((char, loaded.size(char)) for char in set(text))
+        self.offsets = numpy.zeros(len(text) + 1, dtype=int)
+        numpy.cumsum([sizes[char][0] for char in text], out=self.offsets[1:])
+        if self.offsets[-1] != loaded.size(text)[0]:
+            # kerning or fractional advances, widths of single glyphs do not
+            # add up. every character ends where the prefix up to it ends,
+            # like font.render places it, quadratic in length but done once
+            self.offsets[:-1] = [loaded.size(text[:index + 1])[0] - sizes[char][0] for (index, char) in enumerate(text)]
+            self.offsets[-1] = loaded.size(text)[0]
+            numpy.maximum.accumulate(self.offsets, out=self.offsets)
+        self.width = int(self.offsets[-1])
+        # rendered glyphs are higher than font.get_height()
+        self.height = max([size[1] for size in sizes.values()] + [loaded.get_linesize()])
+        # part of line from cache_left in cache
+        self.cache = None
+        self.cache_left = 0
+
+    def get_size(self):
+        return (self.width, self.height)
+
+    def blit_glyphs(self, target, pos, left, right, special_flags=0):
+        """blit glyphs of line between left and right at pos on target"""
+        (x, y) = pos
+        # characters inside of window
+        first = max(int(numpy.searchsorted(self.offsets, left, side="right")) - 1, 0)
+        last = int(numpy.searchsorted(self.offsets, right, side="left"))
+        for index in range(first, last):
+            rect = self.atlas.get_glyph(self.font, self.color, self.text[index])
+            start = self.offsets[index]
+            # cut glyph at borders of window
+            cut_left = max(left - start, 0)
+            cut_right = min(right - start, rect.width)
+            if cut_right > cut_left:
+                target.blit(self.atlas.surface, (x + start + cut_left - left, y),
+                    (rect.x + cut_left, rect.y, cut_right - cut_left, rect.height), special_flags)
+
+    def render_cache(self, left, width):
+        """draw part of line starting at left into cache"""
+        size = (max(2 * width, 256), self.height)
+        if self.cache is None or self.cache.get_size() != size:
+            self.cache = pygame.Surface(size, pygame.SRCALPHA, self.atlas.surface)
+        self.cache.fill((0, 0, 0, 0))
+        self.cache_left = left
+        # copy glyphs with their alpha, blending onto transparent would darken them
+        self.blit_glyphs(self.cache, (0, 0), left, min(left + size[0], self.width), pygame.BLEND_RGBA_MAX)
+
+    def draw(self, target, pos, left=0, width=None, height=None, special_flags=0):
+        """
+        blit part of line from left to left + width, and up to height rows
+        at pos on target, like target.blit(text_surface, pos, (left, 0, width, height))
+        returns rect drawn to
+        """
+        if width is None:
+            width = self.width - left
+        if height is None:
+            height = self.height
+        right = min(left + width, self.width)
+        if right <= left:
+            return pygame.Rect(pos, (0, 0))
+        if self.cache is None or left < self.cache_left or right > self.cache_left + self.cache.get_width() \
+                or self.cache.get_width() < width:
+            self.render_cache(left, width)
+        return target.blit(self.cache, pos, (left - self.cache_left, 0, right - left, min(height, self.height)), special_flags)
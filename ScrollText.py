@@ -2,9 +2,15 @@
 
 import pygame
 import sys
+# own modules
+from GlyphAtlas import TextLine
 
 class ScrollText(object):
-    """Simple 2d Scrolling Text"""
+    """Simple 2d Scrolling Text
+
+    text is not rendered as whole, only glyphs in visible window
+    are blitted from shared glyph atlas
+    """
     
     def __init__(self, surface, text, hpos, color, size=30):
         """
@@ -16,28 +22,25 @@ class ScrollText(object):
         """
         self.surface = surface
         # prepend and append some blanks
-        appendix = " " * (self.surface.get_width() / size)
+        appendix = " " * (self.surface.get_width() // size)
         self.text = appendix + text + appendix
         self.hpos = hpos
         self.color = color
         self.size = size
         # initialize
         self.position = 0
-        self.font = pygame.font.SysFont("mono", self.size, bold=True)
-        self.text_surface = self.font.render(self.text, True, self.color)
+        self.line = TextLine(self.text, ("mono", self.size, True), self.color)
 
     def update(self, hpos=None):
-        """update every frame"""
+        """update every frame, returns rect drawn to"""
         if hpos is not None:
             self.hpos = hpos
-        self.surface.blit(self.text_surface, 
-            (0, self.hpos), 
-            (self.position, 0, self.surface.get_width(), self.size)
-        )
-        if self.position < self.text_surface.get_width():
+        rect = self.line.draw(self.surface, (0, self.hpos), self.position, self.surface.get_width(), self.size)
+        if self.position < self.line.width:
             self.position += 1
         else:
             self.position = 0
+        return rect
 
 
 def test():
@@ -66,7 +69,7 @@ def test():
                     thing.update()
                 pygame.display.flip()
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 if __name__ == '__main__':
     test()
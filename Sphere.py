@@ -3,8 +3,39 @@
 import pygame
 import sys
 import math
+import numpy
 from Vec2d import Vec2d
 from Vec3d import Vec3d
+from Vec3dArray import get_rotation_matrix
+
+# normalized sphere points for every number of steps, shared by all spheres
+GEOMETRY = {}
+
+
+def get_sphere_points(steps):
+    """
+    return (rings x segments x 3) array of points on unit sphere,
+    steps + 1 rings from y=-1 to y=1, every ring is closed,
+    so first and last point are the same
+    """
+    steps = int(steps)
+    try:
+        return GEOMETRY[steps]
+    except KeyError:
+        pass
+    y = numpy.linspace(-1, 1, steps + 1)
+    # c**2 = a**2 + b**2
+    radius = numpy.sqrt(1 - y ** 2)[:, numpy.newaxis]
+    angle = numpy.linspace(0, 2 * math.pi, steps + 1)
+    points = numpy.empty((steps + 1, steps + 1, 3))
+    points[:, :, 0] = numpy.cos(angle) * radius
+    points[:, :, 1] = y[:, numpy.newaxis]
+    points[:, :, 2] = numpy.sin(angle) * radius
+    # shared, so nobody should change it
+    points.setflags(write=False)
+    GEOMETRY[steps] = points
+    return points
+
 
 class Sphere(object):
     """Object represents a sphere"""
@@ -20,34 +51,20 @@ class Sphere(object):
         self.viewer_distance = viewer_distance
         self.fov = fov
         # set parameters and variables
-        self.sphere_raw_points = []
+        self.sphere_raw_points = None
         self.generate()
         self.sphere_points = None
         self.transformed_sphere = None
         self.resize_and_center()
 
     def generate(self):
-        """generate normalized array of sphere points"""
-        radius = 0.0
-        for y in self.step_generator(-1, 1, self.steps):
-            circle = []
-            # c**2 = a**2 + b**2
-            radius = math.sqrt(1 - y**2)
-            for angle in self.step_generator(0, 2 * math.pi, self.steps):
-                x = math.cos(angle) * radius
-                z = math.sin(angle) * radius
-                circle.append(Vec3d(x, y, z))
-            self.sphere_raw_points.append(circle)
-        
+        """get normalized array of sphere points"""
+        self.sphere_raw_points = get_sphere_points(self.steps)
 
     def resize_and_center(self):
         """calculate actual sphere from normalized array"""
-        self.sphere_points = []
-        for circle in self.sphere_raw_points:
-            new_circle = []
-            for point in circle:
-                new_circle.append(point * self.size + self.center)
-            self.sphere_points.append(new_circle)
+        self.sphere_points = self.sphere_raw_points * (self.size.x, self.size.y, self.size.z) + \
+            (self.center.x, self.center.y, self.center.z)
 
     def set_color(self, color):
         """set color"""
@@ -65,39 +82,27 @@ class Sphere(object):
 
     def rotate(self, dx, dy, dz, offset2d=Vec2d(0, 0)):
         """rotate sphere and generate transformed 2d point array for polygon"""
-        # rotate and project every point to 2d
-        self.transformed_sphere = []
-        for circle in self.sphere_points:
-            transformed_circle = []
-            for point in circle:
-                new_point = point.rotated_around_x(dx).rotated_around_y(dy).rotated_around_z(dz)
-                transformed = new_point.project(self.surface.get_width(), self.surface.get_height(), self.viewer_distance, self.fov)
-                transformed_circle.append((transformed.x + offset2d.x, transformed.y + offset2d.y))
-            self.transformed_sphere.append(transformed_circle)
-                
+        # rotate and project all points at once
+        points = self.sphere_points.dot(get_rotation_matrix(dx, dy, dz).T)
+        # same projection as Vec3d.project, which got viewer_distance and fov swapped
+        factor = self.viewer_distance / (self.fov + points[:, :, 2])
+        self.transformed_sphere = numpy.empty(points.shape[:2] + (2, ))
+        self.transformed_sphere[:, :, 0] = points[:, :, 0] * factor + self.surface.get_width() / 2 + offset2d.x
+        self.transformed_sphere[:, :, 1] = -points[:, :, 1] * factor + self.surface.get_height() / 2 + offset2d.y
+
     def update(self, viewer_distance, fov):
-        """update every frame, given transformation parameters"""
+        """
+        update every frame, given transformation parameters,
+        returns rect drawn to
+        """
         # draw every face of the cube
         self.viewer_distance = viewer_distance
         self.fov = fov
-        for circle in self.transformed_sphere:
-            pygame.draw.polygon(self.surface, self.color, circle, 1)
-        for point_index in range(len(self.transformed_sphere[0])):
-            points = []
-            for circle_index in range(len(self.transformed_sphere)):
-                points.append(self.transformed_sphere[circle_index][point_index])
-            pygame.draw.polygon(self.surface, self.color, points, 1)
-
-    @staticmethod
-    def step_generator(start, stop, steps):
-        """yields steps values between start and stop for float values"""
-        distance = stop - start
-        step = float(distance) / float(steps)
-        value = float(start)
-        while value <= stop:
-            yield value
-            value += step
-
+        rects = [pygame.draw.polygon(self.surface, self.color, circle, 1) for circle in self.transformed_sphere]
+        # last point of every ring is the first one again
+        for point_index in range(self.transformed_sphere.shape[1] - 1):
+            rects.append(pygame.draw.polygon(self.surface, self.color, self.transformed_sphere[:, point_index], 1))
+        return rects[0].unionall(rects[1:])
 
 def test():
     """test"""
@@ -152,7 +157,7 @@ def test():
                     thing.update(viewer_distance=viewer_distance, fov=fov)
                 pygame.display.flip()
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 if __name__ == "__main__":
     test()
@@ -1,100 +1,132 @@
 #!/usr/bin/python3
 
-import sys
 import pygame
-import random
-# own modules
-from Vec2d import Vec2d
-from Vec3d import Vec3d
+import numpy
 
 
 class Starfield(object):
-    """Starfield with 3D Points"""
+    """Starfield with 3D Points
 
-    def __init__(self, surface, stars, depth, speed=0.01):
+    all stars are stored in one (N x 3) array, every frame they are moved,
+    wrapped and projected at once and written into pixels2d of surface
+    with one scatter, no drawing calls per star
+    """
+
+    def __init__(self, surface, stars, depth=4, speed=0.01, shading=False):
         """
         surface = pygame.Surface
-        stars - amount of strar to create
-        depth - z axis depth from 0 to 0+depth
+        stars - amount of stars to create, exactly this many
+        depth - z axis depth from -depth/2 to depth/2
         speed - how fast should stars travel
+        shading - if True, far away stars are darker
         """
         self.surface = surface
         self.stars = stars
         self.depth = depth
         self.speed = speed
+        self.shading = shading
         # set initial variables
         self.color = pygame.Color(255, 255, 255, 255)
+        self.width = surface.get_width()
+        self.height = surface.get_height()
+        self.rng = numpy.random.default_rng()
+        # projection used by draw, if not given
+        self.fov = 2
+        self.viewer_distance = 256
+        # x before last step, for interpolation
+        self.previous = None
         # initialize array
         self.generate()
 
     def generate(self):
-        """ generates 3d starfield, z=0 to z=depth """
-        depth_count = self.stars / self.depth
-        self.stars = []
-        for index in range(depth_count ** 3):
-            star_x = random.random() * 4 - 2
-            star_y = random.random() * 4 - 2
-            star_z = random.random() * 4 - 2
-            self.stars.append(Vec3d(star_x, star_y, star_z))
+        """generates 3d starfield, x and y from -2 to 2, z from -depth/2 to depth/2"""
+        self.stars = self.rng.random((self.stars, 3))
+        self.stars[:, :2] *= 4
+        self.stars[:, :2] -= 2
+        self.stars[:, 2] -= 0.5
+        self.stars[:, 2] *= self.depth
+        # brightness lookup table, from white for nearest to dark grey for farthest
+        self.palette = numpy.array([self.surface.map_rgb((value, value, value))
+            for value in numpy.linspace(255, 64, 256).astype(int)], dtype=numpy.uint32)
+        if self.shading:
+            # z does not change, so every star keeps its color
+            levels = ((self.stars[:, 2] / self.depth + 0.5) * 255).astype(numpy.intp)
+            self.colors = self.palette[levels]
+        else:
+            self.colors = numpy.full(len(self.stars), self.surface.map_rgb(self.color), dtype=numpy.uint32)
+
+    def step(self):
+        """move stars one tick and wrap around"""
+        self.previous = self.stars[:, 0].copy()
+        self.stars[:, 0] -= self.speed
+        self.stars[self.stars[:, 0] < -2, 0] += 4
+
+    def draw(self, alpha=1.0, fov=None, viewer_distance=None):
+        """
+        draw stars, alpha interpolates between position before
+        and after last step, with 1.0 the current position is drawn.
+        returns bounding rect of all drawn stars
+
+        projection is the same as before, where fov and viewer_distance
+        were passed swapped to Vec3d.project
+        """
+        if fov is None:
+            fov = self.fov
+        if viewer_distance is None:
+            viewer_distance = self.viewer_distance
+        stars = self.stars
+        x = stars[:, 0]
+        if alpha < 1.0 and self.previous is not None:
+            # wrapped stars jump, they are drawn at new position
+            x = numpy.where(x < self.previous, self.previous + (x - self.previous) * alpha, x)
+        distance = fov + stars[:, 2]
+        # stars behind viewer are not drawn
+        with numpy.errstate(divide="ignore"):
+            factor = numpy.where(distance > 0, viewer_distance / distance, 0.0)
+        x = x * factor + self.width / 2
+        y = -stars[:, 1] * factor + self.height / 2
+        visible = (distance > 0) & (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        x = x[visible].astype(numpy.intp)
+        y = y[visible].astype(numpy.intp)
+        pixels = pygame.surfarray.pixels2d(self.surface)
+        pixels[x, y] = self.colors[visible]
+        del pixels
+        if len(x) == 0:
+            return pygame.Rect(0, 0, 0, 0)
+        return pygame.Rect(x.min(), y.min(), x.max() - x.min() + 1, y.max() - y.min() + 1)
 
     def update(self, fov=2, viewer_distance=256):
-        """update every frame"""
-        #parray = pygame.surfarray.pixels2d(surface)
-        for star in self.stars:
-            tstar = star.project(self.surface.get_width(), self.surface.get_height(), \
-                viewer_distance, fov)
-            tstar2d = Vec2d(tstar.x, tstar.y)
-            pygame.draw.line(self.surface, self.color, tstar2d, tstar2d, 1)
-            star.x -= self.speed
-            if star.x < -2:
-                star.x = 2
+        """update every frame, draw and then move stars"""
+        rect = self.draw(1.0, fov, viewer_distance)
+        self.step()
+        return rect
 
 def test():
     """test"""
+    from DemoRuntime import Runtime
     try:
-        fps = 50
         surface = pygame.display.set_mode((600, 600))
         pygame.init()
-        spheres = (
-            Starfield(surface, stars=100, depth=10, speed=0.01),
-            )
-        clock = pygame.time.Clock()       
-        # for 3d projection
-        fov = 1
-        viewer_distance = 256
-        pause = False
-        while True:
-            clock.tick(fps)
-            events = pygame.event.get()  
-            for event in events:  
-                if event.type == pygame.QUIT:  
-                    sys.exit(0)
-            keyinput = pygame.key.get_pressed()
-            if keyinput is not None:
-                # print keyinput
-                if keyinput[pygame.K_ESCAPE]:
-                    sys.exit(1)
-                if keyinput[pygame.K_UP]:
-                    viewer_distance += 1
-                if keyinput[pygame.K_DOWN]:
-                    viewer_distance -= 1
-                if keyinput[pygame.K_PLUS]:
-                    fov += .1
-                if keyinput[pygame.K_MINUS]:
-                    fov -= .1
-                if keyinput[pygame.K_p]:
-                    pause = not pause
-                if keyinput[pygame.K_r]:
-                    viewer_distance = 256
-                    fov = 2
-            if pause is not True:
-                surface.fill((0, 0, 0, 255))
-                for thing in spheres:
-                    # draw
-                    thing.update(viewer_distance=viewer_distance, fov=fov)
-                pygame.display.flip()
+        starfield = Starfield(surface, stars=1000, speed=0.01, shading=True)
+        starfield.fov = 1
+        runtime = Runtime(surface, fps=50)
+        runtime.add(starfield, rate=50)
+        def keyhandler(keyinput):
+            if keyinput[pygame.K_UP]:
+                starfield.viewer_distance += 1
+            if keyinput[pygame.K_DOWN]:
+                starfield.viewer_distance -= 1
+            if keyinput[pygame.K_PLUS]:
+                starfield.fov += .1
+            if keyinput[pygame.K_MINUS]:
+                starfield.fov -= .1
+            if keyinput[pygame.K_r]:
+                starfield.viewer_distance = 256
+                starfield.fov = 2
+        runtime.run(keyhandler=keyhandler)
+        runtime.print_stats()
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 if __name__ == "__main__":
     test()
@@ -2,14 +2,27 @@
 
 import pygame
 import sys
+import time
 import math
 import random
+import numpy
 # own modules
 from Vec2d import Vec2d
 
 
 class Tree(object):
-    """Tree in 2D"""
+    """Tree in 2D
+
+    geometry is generated once into arrays, one entry per branch with
+    parent, depth level, angle and length. all branches of one subtree
+    are stored one after another. the whole tree is one polyline, going
+    up and down every branch, which is drawn with one call into an
+    offscreen surface. every frame only this surface is blitted, it is
+    drawn again only, if the tree bends, grows or regrows.
+    """
+
+    # transparent color of offscreen surface, do not use for tree
+    colorkey = (255, 0, 255)
 
     def __init__(self, surface, color, root, depth, length):
         """
@@ -37,55 +50,196 @@ class Tree(object):
         self.total_angle = self.angle_between_branches * (self.branching_factor - 1)
         # draw leafs or not
         self.leafs = True
-        # hold every drawing operation, for update
-        self.storyboard = []
+        self.leaf_size = 10
+        # additional angle in degrees of every level, to bend in wind
+        self.bends = numpy.zeros(depth)
+        # only branches of lower levels are drawn, to grow tree
+        self.visible_levels = depth
+        # offscreen surface has to be drawn again
+        self.changed = True
+        self.baked = None
+        self.scratch = None
+        self.rect = None
         # initialize tree
         self.initialize()
 
-    def draw(self, root, angle, length, width):
-        """draw line from root with angle and length in width thickness"""
-        assert isinstance(root, Vec2d)
-        myangle = angle * self.deg2rad
-        dest = root + Vec2d(math.cos(myangle), math.sin(myangle)) * (-length)
-        self.storyboard.append((pygame.draw.line, (self.surface, self.color, root, dest, width)))
-        # return new root point
-        return(dest)
-
-    def tree(self, depth, length, root, angle):
-        """this method is recurdively called"""
-        if depth == 0:
-            if self.leafs is True:
-                leaf_color = (random.randint(16, 65), int(length * 2 + 40), 0)
-                self.storyboard.append((pygame.draw.ellipse, (self.surface, leaf_color, (int(root.x), int(root.y), 10, 10), 0)))
-            return
+    def branch(self, depth, length, parent, angle):
+        """this method is recursively called, adds branch and its subtree"""
+        index = len(self.parents)
+        level = self.depth - depth
+        self.parents.append(parent)
+        self.levels.append(level)
+        self.angles.append(angle)
+        self.lengths.append(length)
+        self.subtree_ends.append(None)
         # forward
-        root = self.draw(root, angle, length, self.depth / 2)
+        self.walk.append(index + 1)
+        self.walk_levels.append(level)
         # turn right
         angle -= self.total_angle / 2.0
         for i in range(self.branching_factor):
             # next recursion, smaller
-            self.tree(depth - 1, length * self.scale_factor * (0.5 + random.random() * 0.5), root, angle)
+            next_length = length * self.scale_factor * (0.5 + random.random() * 0.5)
+            if depth > 1:
+                self.branch(depth - 1, next_length, index, angle)
+            else:
+                # all leafs are at the same point, last one is on top
+                leaf_color = (random.randint(16, 65), min(255, int(next_length * 2 + 40)), 0)
             # turn left, one step
             angle += self.angle_between_branches
-            # next branch
-        # turn back right, and one step left
-        angle -= self.total_angle / 2.0 + self.angle_between_branches
-        # draw back
-        root = self.draw(root, angle, -length, self.depth / 2)
-        # we are at root
+        if depth == 1:
+            self.leaf_branches.append(index)
+            self.leaf_colors.append(self.surface.map_rgb(leaf_color))
+        self.subtree_ends[index] = len(self.parents)
+        # draw back, we are at root
+        self.walk.append(parent + 1)
+        self.walk_levels.append(level)
 
     def set_color(self, color):
         """set color"""
         self.color = color
+        self.changed = True
 
     def initialize(self):
         """initialize tree"""
-        self.tree(depth=self.depth, length=self.length, root=self.root, angle=90)
+        self.parents = []
+        self.levels = []
+        self.angles = []
+        self.lengths = []
+        self.subtree_ends = []
+        self.leaf_branches = []
+        self.leaf_colors = []
+        # point indices of polyline, point 0 is root, point i + 1 end of branch i
+        self.walk = [0]
+        self.walk_levels = [-1]
+        self.branch(depth=self.depth, length=self.length, parent=-1, angle=90)
+        self.parents = numpy.array(self.parents)
+        self.levels = numpy.array(self.levels)
+        self.angles = numpy.array(self.angles, dtype=float)
+        self.lengths = numpy.array(self.lengths, dtype=float)
+        self.subtree_ends = numpy.array(self.subtree_ends)
+        self.leaf_branches = numpy.array(self.leaf_branches, dtype=int)
+        self.leaf_colors = numpy.array(self.leaf_colors, dtype=numpy.uint32)
+        self.walk = numpy.array(self.walk)
+        self.walk_levels = numpy.array(self.walk_levels)
+        self.level_branches = [numpy.flatnonzero(self.levels == level) for level in range(self.depth)]
+        # pixels of one leaf, relative to its position
+        stamp = pygame.Surface((self.leaf_size, self.leaf_size))
+        pygame.draw.ellipse(stamp, (255, 255, 255), (0, 0, self.leaf_size, self.leaf_size), 0)
+        (self.leaf_x, self.leaf_y) = numpy.nonzero(pygame.surfarray.array2d(stamp))
+        self.points = numpy.empty((len(self.parents) + 1, 2))
+        self.calculate()
+
+    def calculate(self):
+        """end points of all branches, level by level from trunk to leafs"""
+        angles = (self.angles + numpy.cumsum(self.bends)[self.levels]) * self.deg2rad
+        vectors = numpy.column_stack((numpy.cos(angles), numpy.sin(angles))) * -self.lengths[:, numpy.newaxis]
+        self.points[0] = (self.root.x, self.root.y)
+        for branches in self.level_branches:
+            self.points[branches + 1] = self.points[self.parents[branches] + 1] + vectors[branches]
+        self.changed = True
+
+    def get_rect(self, index=None):
+        """bounding rect of tree, or subtree of branch index, with lines and leafs"""
+        if index is None:
+            points = self.points
+        else:
+            branches = numpy.arange(index, self.subtree_ends[index])
+            points = numpy.concatenate((self.points[branches + 1], self.points[self.parents[index] + 1:self.parents[index] + 2]))
+        (left, top) = numpy.floor(points.min(axis=0)).astype(int) - self.depth
+        (right, bottom) = numpy.ceil(points.max(axis=0)).astype(int) + self.depth + self.leaf_size
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def get_polyline(self):
+        """points of polyline through all visible branches"""
+        return self.points[self.walk[self.walk_levels < self.visible_levels]]
+
+    def draw_leafs(self, target, rect):
+        """all leafs at once into pixels of target, only inside of rect"""
+        if self.leafs is not True or self.visible_levels < self.depth:
+            return
+        positions = self.points[self.leaf_branches + 1].astype(int)
+        # leafs touching rect
+        near = (positions[:, 0] > rect.left - self.leaf_size) & (positions[:, 0] < rect.right) & \
+            (positions[:, 1] > rect.top - self.leaf_size) & (positions[:, 1] < rect.bottom)
+        positions = positions[near]
+        x = (positions[:, 0, numpy.newaxis] + self.leaf_x).ravel()
+        y = (positions[:, 1, numpy.newaxis] + self.leaf_y).ravel()
+        colors = numpy.repeat(self.leaf_colors[near], len(self.leaf_x))
+        inside = (x >= rect.left) & (x < rect.right) & (y >= rect.top) & (y < rect.bottom)
+        pixels = pygame.surfarray.pixels2d(target)
+        pixels[x[inside], y[inside]] = colors[inside]
+        del pixels
+
+    def bake(self):
+        """draw whole tree again into offscreen surface"""
+        if self.baked is None:
+            self.baked = pygame.Surface(self.surface.get_size(), 0, self.surface)
+            self.baked.set_colorkey(self.colorkey)
+        self.baked.fill(self.colorkey)
+        self.rect = self.surface.get_rect().clip(self.get_rect())
+        polyline = self.get_polyline()
+        if len(polyline) > 1:
+            pygame.draw.lines(self.baked, self.color, False, polyline.tolist(), self.depth // 2)
+        self.draw_leafs(self.baked, self.rect)
+        self.changed = False
+
+    def render(self, rect):
+        """
+        draw tree again only inside of rect, every line crossing rect
+        is drawn whole into scratch surface, clipped lines would
+        differ in some pixels from whole tree drawn at once
+        """
+        if self.scratch is None:
+            self.scratch = pygame.Surface(self.surface.get_size(), 0, self.surface)
+        self.scratch.fill(self.colorkey, rect)
+        width = self.depth // 2
+        polyline = self.get_polyline()
+        lower = numpy.minimum(polyline[:-1], polyline[1:]) - width
+        upper = numpy.maximum(polyline[:-1], polyline[1:]) + width
+        crossing = numpy.flatnonzero((upper[:, 0] >= rect.left) & (lower[:, 0] < rect.right) &
+            (upper[:, 1] >= rect.top) & (lower[:, 1] < rect.bottom))
+        for (start, end) in zip(polyline[crossing].tolist(), polyline[crossing + 1].tolist()):
+            pygame.draw.line(self.scratch, self.color, start, end, width)
+        self.draw_leafs(self.scratch, rect)
+        self.baked.blit(self.scratch, rect, rect)
+
+    def bend(self, angles):
+        """bend every level by angles in degree, scalar or one per level"""
+        self.bends[:] = angles
+        self.calculate()
+
+    def grow(self, levels):
+        """show only levels of branches, leafs with all levels"""
+        self.visible_levels = levels
+        self.changed = True
+
+    def regrow(self, index):
+        """
+        new random lengths for all branches above branch index,
+        only area of old and new subtree is drawn again.
+        returns this rect
+        """
+        if self.changed:
+            self.bake()
+        old = self.get_rect(index)
+        branches = numpy.arange(index + 1, self.subtree_ends[index])
+        for level in range(self.levels[index] + 1, self.depth):
+            selected = branches[self.levels[branches] == level]
+            self.lengths[selected] = self.lengths[self.parents[selected]] * self.scale_factor * \
+                (0.5 + numpy.random.random(len(selected)) * 0.5)
+        self.calculate()
+        dirty = self.surface.get_rect().clip(old.union(self.get_rect(index)))
+        self.rect = self.surface.get_rect().clip(self.get_rect())
+        self.render(dirty)
+        self.changed = False
+        return dirty
 
     def update(self):
-        """update every frame"""
-        for func, args in self.storyboard:
-            func(*args)
+        """update every frame, returns rect drawn to"""
+        if self.changed:
+            self.bake()
+        return self.surface.blit(self.baked, self.rect, self.rect)
 
 def test():
     try:
@@ -110,11 +264,13 @@ def test():
                     sys.exit(1)
             if pause is not True:
                 surface.fill((0, 0, 0, 255))
+                # some wind
+                spheres[1].bend(math.sin(time.time()) * 2)
                 for thing in spheres:
                     thing.update()
                 pygame.display.flip()
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 if __name__ == '__main__':
     test()
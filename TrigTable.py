@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+"""
+shared sinus and cosinus lookup tables
+
+one full turn is divided into size phases, size is a power of two, so
+any integer phase is wrapped into the table with & mask. tables are
+built once per size and shared by all effects
+
+    table = get_table(4096)
+    value = table.sin(phase)
+    value = table.sin_radians(angle)
+    values = table.sin_array(phases)
+"""
+import math
+import numpy
+
+
+class TrigTable(object):
+    """
+    sinus and cosinus of size phases per full turn
+
+    scalar accessors use python lists, which are faster to index from
+    python than numpy arrays, array accessors gather from numpy tables
+    """
+
+    def __init__(self, size=4096):
+        """
+        (int) size - phases per full turn, power of two
+        """
+        if size < 1 or size & (size - 1):
+            raise ValueError("size %s is not a power of two" % size)
+        self.size = size
+        self.mask = size - 1
+        # phases per radian
+        self.factor = size / (2 * math.pi)
+        angles = numpy.arange(size) * (2 * math.pi / size)
+        self.sin_table = numpy.sin(angles)
+        self.cos_table = numpy.cos(angles)
+        self.sins = self.sin_table.tolist()
+        self.coss = self.cos_table.tolist()
+
+    def phase(self, radians):
+        """nearest integer phase of angle in radians"""
+        return int(round(radians * self.factor))
+
+    def phases(self, radians):
+        """nearest integer phases of array of angles in radians"""
+        return numpy.rint(numpy.multiply(radians, self.factor)).astype(numpy.intp)
+
+    def sin(self, phase):
+        return self.sins[phase & self.mask]
+
+    def cos(self, phase):
+        return self.coss[phase & self.mask]
+
+    def sin_radians(self, radians):
+        return self.sins[int(round(radians * self.factor)) & self.mask]
+
+    def cos_radians(self, radians):
+        return self.coss[int(round(radians * self.factor)) & self.mask]
+
+    def sin_array(self, phases, out=None):
+        """sinus of array of integer phases"""
+        return numpy.take(self.sin_table, numpy.bitwise_and(phases, self.mask), out=out)
+
+    def cos_array(self, phases, out=None):
+        """cosinus of array of integer phases"""
+        return numpy.take(self.cos_table, numpy.bitwise_and(phases, self.mask), out=out)
+
+    def sin_radians_array(self, radians, out=None):
+        return self.sin_array(self.phases(radians), out)
+
+    def cos_radians_array(self, radians, out=None):
+        return self.cos_array(self.phases(radians), out)
+
+
+# tables by size
+TABLES = {}
+
+def get_table(size=4096):
+    """shared table with size phases per full turn"""
+    table = TABLES.get(size)
+    if table is None:
+        table = TABLES[size] = TrigTable(size)
+    return table
+
+
+########################################################################
+## Unit Testing                                                       ##
+########################################################################
+if __name__ == "__main__":
+
+    import unittest
+
+    ####################################################################
+    class UnitTestTrigTable(unittest.TestCase):
+
+        def setUp(self):
+            self.table = TrigTable(64)
+            # nearest phase is at most half a phase away
+            self.tolerance = math.pi / self.table.size
+            self.angles = numpy.linspace(-10, 10, 1001)
+
+        def testSize(self):
+            for size in (0, -8, 3, 100):
+                self.assertRaises(ValueError, TrigTable, size)
+            self.assertEqual(self.table.mask, 63)
+
+        def testPhases(self):
+            for phase in range(self.table.size):
+                angle = phase * 2 * math.pi / self.table.size
+                self.assertAlmostEqual(self.table.sin(phase), math.sin(angle))
+                self.assertAlmostEqual(self.table.cos(phase), math.cos(angle))
+                self.assertEqual(self.table.phase(angle), phase)
+
+        def testWrap(self):
+            for phase in (-65, -1, 0, 1, 17, 63):
+                for turns in (-3, 1, 1000):
+                    self.assertEqual(self.table.sin(phase + turns * 64), self.table.sin(phase))
+                    self.assertEqual(self.table.cos(phase + turns * 64), self.table.cos(phase))
+            self.assertEqual(self.table.sin(-1), self.table.sin(63))
+            phases = numpy.arange(-200, 200)
+            self.assertEqual(self.table.sin_array(phases).tolist(), [self.table.sin(phase) for phase in phases.tolist()])
+            self.assertEqual(self.table.cos_array(phases).tolist(), [self.table.cos(phase) for phase in phases.tolist()])
+
+        def testRadians(self):
+            for angle in self.angles.tolist():
+                self.assertLessEqual(abs(self.table.sin_radians(angle) - math.sin(angle)), self.tolerance)
+                self.assertLessEqual(abs(self.table.cos_radians(angle) - math.cos(angle)), self.tolerance)
+
+        def testArrays(self):
+            self.assertLessEqual(numpy.abs(self.table.sin_radians_array(self.angles) - numpy.sin(self.angles)).max(), self.tolerance)
+            self.assertLessEqual(numpy.abs(self.table.cos_radians_array(self.angles) - numpy.cos(self.angles)).max(), self.tolerance)
+            self.assertEqual(self.table.sin_radians_array(self.angles).tolist(), [self.table.sin_radians(angle) for angle in self.angles.tolist()])
+            out = numpy.empty(self.angles.shape)
+            self.assertTrue(self.table.sin_array(self.table.phases(self.angles), out=out) is out)
+
+        def testShared(self):
+            self.assertTrue(get_table(1024) is get_table(1024))
+            table = get_table()
+            self.assertEqual(table.size, 4096)
+            self.assertLessEqual(numpy.abs(table.sin_radians_array(self.angles) - numpy.sin(self.angles)).max(), math.pi / 4096)
+
+    ####################################################################
+    unittest.main()
@@ -1,76 +1,62 @@
 #!/usr/bin/python3
 
-import sys
 import pygame
-import random
+import numpy
 # own modules
 from Vec2d import Vec2d
-from Vec3d import Vec3d
+from Vec2dArray import Vec2dArray
 
 
 class Thing(object):
     """
     the thing at starting point moves randomly
+
+    only a view of one thing, all data is stored in arrays of universe
     """
 
-    def __init__(self, surface, universe, pos2d, color):
-        self.surface = surface
+    # things of same kind repel each other, different kinds attract
+    kind = None
+    # only charged things move other things
+    charged = True
+
+    def __init__(self, universe, index):
         self.universe = universe
-        self.pos2d = pos2d
-        self.mass = random.random()
-        print self.mass
-        self.acceleration = random.random()
-        self.direction = Vec2d(random.random(), random.random()) * self.mass
-        self.color = pygame.Color(int(128 + 127 * self.mass), 0, 0, 255)
-
-    def draw(self, viewer_distance, fov):
-        color = pygame.Color(int(255 * self.mass), int(255 * self.acceleration), 0, 255)
-        pygame.draw.line(self.surface, color, self.pos2d, self.pos2d, 2)
-
-    def update(self):
-        #print self.pos3d
-        new_direction = self.direction
-        for other_thing in self.universe.things:
-            if other_thing == self:
-                continue
-            #if int(other_thing.pos2d.x) == int(self.pos2d.x) and int(other_thing.pos2d.y) == int(self.pos2d.y):
-            #    self.mass += other_thing.mass
-            #    print "removing %s" % other_thing
-            #    self.universe.things.remove(other_thing)
-            #    continue
-            direction = other_thing.get_direction_to(self)
-            new_direction += direction * other_thing.mass
-        #pygame.draw.line(self.surface, pygame.Color(0, 0, 255, 0), self.pos2d, self.pos2d + new_direction.normalized() * 10, 1)
-        #self.acceleration *= (1 - self.mass)
-        self.check_boundaries()
-        self.pos2d += (new_direction * self.acceleration).normalized()
+        self.index = index
+
+    @staticmethod
+    def get_color(mass, acceleration):
+        return pygame.Color(int(255 * mass), int(255 * acceleration), 0, 255)
+
+    def __getpos2d(self):
+        return self.universe.positions[self.index]
+    def __setpos2d(self, value):
+        self.universe.positions[self.index] = value
+    pos2d = property(__getpos2d, __setpos2d, None, "position, view into universe")
+
+    def __getdirection(self):
+        return self.universe.directions[self.index]
+    def __setdirection(self, value):
+        self.universe.directions[self.index] = value
+    direction = property(__getdirection, __setdirection, None, "direction, view into universe")
+
+    @property
+    def mass(self):
+        return float(self.universe.masses[self.index])
+
+    @property
+    def acceleration(self):
+        return float(self.universe.accelerations[self.index])
 
     def get_nearest_thing(self):
-        min_dist = None
-        nearest_thing = None
-        for other_thing in self.universe.things:
-            if other_thing == self:
-                continue
-            direction = other_thing.get_direction_to(self)
-            distance = direction.length
-            if (min_dist is None) or (min_dist > distance):
-                nearest_thing = other_thing
-                min_dist = distance
-        return nearest_thing
-
-    def check_boundaries(self):
-        """
-        check if position is outside of visible surface,
-        and change direction accordingly
-        """
-        newpos = self.pos2d + self.direction
-        if (newpos.x < 0) or (newpos.x > self.surface.get_width()):
-            self.direction.x *= -1
-        if (newpos.y < 0) or (newpos.y > self.surface.get_height()):
-            self.direction.y *= -1
+        return self.universe.get_nearest_thing(self.pos2d, exclude=self.index)
 
     def get_direction_to(self, other):
-        return self.pos2d - other.pos2d
+        """direction of force of self on other, not yet weighted by mass"""
+        if not self.charged:
+            return Vec2d(0.0, 0.0)
+        if other.kind != self.kind:
+            return self.pos2d - other.pos2d
+        return other.pos2d - self.pos2d
 
     def get_distance_to(self, other):
         return self.get_direction_to(other).length
@@ -80,21 +66,12 @@ class Neutron(Thing):
     the thing at starting point moves randomly
     """
 
-    def __init__(self, surface, universe, pos2d, color):
-        Thing.__init__(self, surface, universe, pos2d, color)
-        self.kind = "Proton"
-
-    def draw(self, viewer_distance, fov):
-        color = pygame.Color(0, 0, int(255 * self.mass), int(255 * self.acceleration))
-        pygame.draw.line(self.surface, color, self.pos2d, self.pos2d, 2)
-
-
-    def get_direction_to(self, other):
-        return Vec2d(0.0, 0.0)
-
-    def get_distance_to(self, other):
-        return self.get_direction_to(other).length
+    kind = "Proton"
+    charged = False
 
+    @staticmethod
+    def get_color(mass, acceleration):
+        return pygame.Color(0, 0, int(255 * mass), int(255 * acceleration))
 
 
 class Proton(Thing):
@@ -102,22 +79,11 @@ class Proton(Thing):
     the thing at starting point moves randomly
     """
 
-    def __init__(self, surface, universe, pos2d, color):
-        Thing.__init__(self, surface, universe, pos2d, color)
-        self.kind = "Proton"
-
-    def draw(self, viewer_distance, fov):
-        color = pygame.Color(0, int(255 * self.mass), int(255 * self.acceleration), 255)
-        pygame.draw.line(self.surface, color, self.pos2d, self.pos2d, 2)
-
+    kind = "Proton"
 
-    def get_direction_to(self, other):
-        if other.kind != self.kind:
-            return self.pos2d - other.pos2d
-        return other.pos2d - self.pos2d
-
-    def get_distance_to(self, other):
-        return self.get_direction_to(other).length
+    @staticmethod
+    def get_color(mass, acceleration):
+        return pygame.Color(0, int(255 * mass), int(255 * acceleration), 255)
 
 
 class Electron(Thing):
@@ -125,29 +91,22 @@ class Electron(Thing):
     the thing at starting point moves randomly
     """
 
-    def __init__(self, surface, universe, pos2d, color):
-        Thing.__init__(self, surface, universe, pos2d, color)
-        self.kind = "Electron"
-
-    def get_direction_to(self, other):
-        if other.kind != self.kind:
-            return self.pos2d - other.pos2d
-        return other.pos2d - self.pos2d
-
-    def get_distance_to(self, other):
-        return self.get_direction_to(other).length
+    kind = "Electron"
 
 
 class Universe(object):
-    """Universe with Things"""
+    """Universe with Things
+
+    positions, directions, masses and kinds of all things are
+    held in arrays and updated all at once
+    """
 
     kinds = (Proton, Electron, Neutron)
 
     def __init__(self, surface, stars, speed=0.01):
         """
         surface = pygame.Surface
-        stars - amount of strar to create
-        depth - z axis depth from 0 to 0+depth
+        stars - amount of things to create
         speed - how fast should stars travel
         """
         self.surface = surface
@@ -155,70 +114,98 @@ class Universe(object):
         self.speed = speed
         # set initial variables
         self.color = pygame.Color(255, 255, 255, 255)
+        self.width = surface.get_width()
+        self.height = surface.get_height()
+        self.rng = numpy.random.default_rng()
         # initialize array
         self.things = []
+        # positions before last step, for interpolation
+        self.previous = None
         self.generate()
 
     def generate(self):
-        """ generates 3d starfield, z=0 to z=depth """
-        for index in range(self.stars):
-            index = int(random.random() * len(self.kinds))
-            pos2d = Vec2d(random.random() * self.surface.get_width(), random.random() * self.surface.get_height())
-            self.things.append(self.kinds[index](self.surface, self, pos2d, self.color))
+        """generates things at random positions"""
+        kind_index = self.rng.integers(0, len(self.kinds), self.stars)
+        self.positions = Vec2dArray(self.rng.random(self.stars) * self.width, self.rng.random(self.stars) * self.height)
+        self.masses = self.rng.random(self.stars)
+        self.accelerations = self.rng.random(self.stars)
+        self.directions = Vec2dArray(self.rng.random(self.stars), self.rng.random(self.stars)) * self.masses
+        self.things = [self.kinds[index](self, number) for (number, index) in enumerate(kind_index)]
+        # Neutron counts as Proton, so kinds are compared by name
+        self.kind_names = sorted(set(kind.kind for kind in self.kinds))
+        self.charge = numpy.array([self.kind_names.index(kind.kind) for kind in self.kinds])[kind_index]
+        self.charged = numpy.array([kind.charged for kind in self.kinds])[kind_index]
+        self.colors = numpy.array([self.surface.map_rgb(thing.get_color(thing.mass, thing.acceleration))
+            for thing in self.things], dtype=numpy.uint32)
+
+    def get_forces(self):
+        """
+        sum of forces of all charged things on every thing
+
+        force of j on i is mass_j * (p_j - p_i), towards j for different
+        kinds and away from j for the same kind. this is linear in
+        positions, so the sum over all j only needs the total mass and
+        the mass weighted position sum of every kind, O(N) not O(N**2)
+        """
+        positions = self.positions.data
+        forces = numpy.zeros_like(positions)
+        for charge in range(len(self.kind_names)):
+            members = self.charged & (self.charge == charge)
+            mass = self.masses[members].sum()
+            moment = positions[:, members].dot(self.masses[members])
+            pull = moment[:, numpy.newaxis] - mass * positions
+            forces += numpy.where(self.charge == charge, -pull, pull)
+        return Vec2dArray.from_data(forces)
+
+    def get_nearest_thing(self, pos2d, exclude=None):
+        """nearest thing to pos2d, thing with index exclude is skipped"""
+        distance = (self.positions - pos2d).get_length_sqrd()
+        if exclude is not None:
+            distance[exclude] = numpy.inf
+        return self.things[int(numpy.argmin(distance))]
+
+    def draw(self, alpha=1.0):
+        """
+        every thing is two pixel wide, all written at once into pixels2d,
+        alpha interpolates between positions before and after last step
+        """
+        positions = self.positions
+        if alpha < 1.0 and self.previous is not None:
+            positions = self.previous.interpolate_to(self.positions, alpha)
+        x = numpy.floor(positions.x).astype(numpy.intp)
+        y = numpy.floor(positions.y).astype(numpy.intp)
+        pixels = pygame.surfarray.pixels2d(self.surface)
+        for offset in (0, 1):
+            visible = (x + offset >= 0) & (x + offset < self.width) & (y >= 0) & (y < self.height)
+            pixels[x[visible] + offset, y[visible]] = self.colors[visible]
+        del pixels
+
+    def step(self):
+        """one tick of simulation, all things at once"""
+        self.previous = self.positions.copy()
+        self.directions += self.get_forces()
+        # check boundaries of next position, reflect direction
+        (self.positions + self.directions).reflect(self.directions, self.width, self.height)
+        # one pixel per tick in direction
+        self.positions += self.directions.normalized()
 
     def update(self, fov=2, viewer_distance=256):
         """update every frame"""
-        #parray = pygame.surfarray.pixels2d(surface)
-        for thing in self.things:
-            thing.update()
-            thing.draw(viewer_distance, fov)
+        self.step()
+        self.draw()
 
 def main():
     """test"""
+    from DemoRuntime import Runtime
     try:
-        fps = 30
         surface = pygame.display.set_mode((600, 600))
         pygame.init()
-        spheres = (
-            Universe(surface, stars=50, speed=0.01),
-            )
-        clock = pygame.time.Clock()
-        # for 3d projection
-        fov = 1
-        viewer_distance = 256
-        pause = False
-        while True:
-            clock.tick(fps)
-            events = pygame.event.get()
-            for event in events:
-                if event.type == pygame.QUIT:
-                    sys.exit(0)
-            keyinput = pygame.key.get_pressed()
-            if keyinput is not None:
-                # print keyinput
-                if keyinput[pygame.K_ESCAPE]:
-                    sys.exit(1)
-                if keyinput[pygame.K_UP]:
-                    viewer_distance += 1
-                if keyinput[pygame.K_DOWN]:
-                    viewer_distance -= 1
-                if keyinput[pygame.K_PLUS]:
-                    fov += .1
-                if keyinput[pygame.K_MINUS]:
-                    fov -= .1
-                if keyinput[pygame.K_p]:
-                    pause = not pause
-                if keyinput[pygame.K_r]:
-                    viewer_distance = 256
-                    fov = 2
-            if pause is not True:
-                surface.fill((0, 0, 0, 255))
-                for thing in spheres:
-                    # draw
-                    thing.update(viewer_distance=viewer_distance, fov=fov)
-                pygame.display.flip()
+        runtime = Runtime(surface, fps=60)
+        runtime.add(Universe(surface, stars=2000, speed=0.01), rate=30)
+        runtime.run()
+        runtime.print_stats()
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,395 @@
+########################################################################
+import math
+import numpy as np
+# own modules
+from Vec2d import Vec2d
+
+
+class Vec2dView(Vec2d):
+    """Vec2d which reads and writes one element of a Vec2dArray,
+    no data is copied, changes are visible in the array
+    """
+    __slots__ = ['array', 'index']
+
+    def __init__(self, array, index):
+        self.array = array
+        self.index = index
+
+    def __getx(self):
+        return self.array.data[0, self.index]
+    def __setx(self, value):
+        self.array.data[0, self.index] = value
+    x = property(__getx, __setx, None, "x component in parent array")
+
+    def __gety(self):
+        return self.array.data[1, self.index]
+    def __sety(self, value):
+        self.array.data[1, self.index] = value
+    y = property(__gety, __sety, None, "y component in parent array")
+
+    def __repr__(self):
+        return 'Vec2dView(%s, %s)' % (self.x, self.y)
+
+    def __reduce__(self):
+        # pickle as detached Vec2d, the parent array is not part of it
+        return (Vec2d, (float(self.x), float(self.y)))
+
+
+class Vec2dArray(object):
+    """N 2d vectors stored as struct of arrays,
+    one contiguous float64 row for x and y each.
+
+    meant for particle and sprite positions, every call works
+    on all N vectors at once, without allocating N Vec2d objects.
+
+    the other operand could be
+    Vec2dArray - element wise
+    Vec2d, tuple, list - the same vector for every element
+    1d numpy.ndarray - one scalar for every element
+    scalar - the same scalar for every element
+
+    boolean masks select elements, use them with
+    __getitem__ (copy), __setitem__, assign_where or directly
+    on the x and y numpy views, e.g. vectors.x[mask] *= -1
+    """
+    __slots__ = ['data']
+
+    def __init__(self, x_or_pairs, y=None):
+        if y is None:
+            # sequence of pairs or (N x 2) array
+            pairs = np.asarray(x_or_pairs, dtype=np.float64).reshape(-1, 2)
+            self.data = np.ascontiguousarray(pairs.T)
+        else:
+            self.data = np.array((x_or_pairs, y), dtype=np.float64)
+
+    @classmethod
+    def from_data(cls, data):
+        """wrap existing (2 x N) array, without copying"""
+        vectors = cls.__new__(cls)
+        vectors.data = data
+        return vectors
+
+    @classmethod
+    def zeros(cls, length):
+        """return array of length null vectors"""
+        return cls.from_data(np.zeros((2, length), dtype=np.float64))
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            if not -len(self) <= key < len(self):
+                raise IndexError("Invalid subscript "+str(key)+" to Vec2dArray")
+            return Vec2dView(self, key % len(self))
+        # slices return views, masks and index arrays return copies
+        return Vec2dArray.from_data(self.data[:, key])
+
+    def __setitem__(self, key, value):
+        self.data[:, key] = self._coerce(value)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield Vec2dView(self, index)
+
+    def copy(self):
+        return Vec2dArray.from_data(self.data.copy())
+
+    def to_list(self):
+        """return list of detached Vec2d objects"""
+        return [Vec2d(x, y) for x, y in self.data.T.tolist()]
+
+    # String representaion (for debugging)
+    def __repr__(self):
+        return 'Vec2dArray(%s)' % self.data.T.tolist()
+
+    # columns
+    def __getx(self):
+        return self.data[0]
+    def __setx(self, value):
+        self.data[0] = value
+    x = property(__getx, __setx, None, "x components as numpy view")
+
+    def __gety(self):
+        return self.data[1]
+    def __sety(self, value):
+        self.data[1] = value
+    y = property(__gety, __sety, None, "y components as numpy view")
+
+    # Generic operator handlers
+    @staticmethod
+    def _coerce(other):
+        """return other in a shape which broadcasts against (2 x N)"""
+        if isinstance(other, Vec2dArray):
+            return other.data
+        elif isinstance(other, np.generic):
+            return other
+        elif isinstance(other, np.ndarray):
+            if other.ndim == 1:
+                return other[np.newaxis, :]
+            return other
+        elif hasattr(other, "__getitem__"):
+            return np.array((other[0], other[1]), dtype=np.float64)[:, np.newaxis]
+        else:
+            return other
+
+    def _o2(self, other, f):
+        "Any two-operator operation where the left operand is a Vec2dArray"
+        return Vec2dArray.from_data(f(self.data, self._coerce(other)))
+
+    def _r_o2(self, other, f):
+        "Any two-operator operation where the right operand is a Vec2dArray"
+        return Vec2dArray.from_data(f(self._coerce(other), self.data))
+
+    def _io(self, other, f):
+        "inplace operator"
+        f(self.data, self._coerce(other), out=self.data)
+        return self
+
+    # Addition
+    def __add__(self, other):
+        return self._o2(other, np.add)
+    __radd__ = __add__
+    def __iadd__(self, other):
+        return self._io(other, np.add)
+
+    # Subtraction
+    def __sub__(self, other):
+        return self._o2(other, np.subtract)
+    def __rsub__(self, other):
+        return self._r_o2(other, np.subtract)
+    def __isub__(self, other):
+        return self._io(other, np.subtract)
+
+    # Multiplication
+    def __mul__(self, other):
+        return self._o2(other, np.multiply)
+    __rmul__ = __mul__
+    def __imul__(self, other):
+        return self._io(other, np.multiply)
+
+    # Division
+    def __truediv__(self, other):
+        return self._o2(other, np.true_divide)
+    def __rtruediv__(self, other):
+        return self._r_o2(other, np.true_divide)
+    def __itruediv__(self, other):
+        return self._io(other, np.true_divide)
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+    __idiv__ = __itruediv__
+
+    def __floordiv__(self, other):
+        return self._o2(other, np.floor_divide)
+    def __rfloordiv__(self, other):
+        return self._r_o2(other, np.floor_divide)
+    def __ifloordiv__(self, other):
+        return self._io(other, np.floor_divide)
+
+    # Unary operations
+    def __neg__(self):
+        return Vec2dArray.from_data(-self.data)
+
+    def __pos__(self):
+        return self.copy()
+
+    def __abs__(self):
+        return Vec2dArray.from_data(np.abs(self.data))
+
+    # masked updates
+    def assign_where(self, mask, other):
+        """set all elements selected by mask to other, inplace"""
+        np.copyto(self.data, np.broadcast_to(self._coerce(other), self.data.shape), where=mask)
+        return self
+
+    def reflect(self, direction, width, height):
+        """
+        flip the components of direction for every position in self
+        which is outside of 0..width and 0..height, all particles in one pass
+
+        return masks of reflected x and y components, to reset
+        positions of reflected elements
+        """
+        mask_x = (self.data[0] <= 0) | (self.data[0] >= width)
+        mask_y = (self.data[1] <= 0) | (self.data[1] >= height)
+        direction.data[0, mask_x] *= -1
+        direction.data[1, mask_y] *= -1
+        return mask_x, mask_y
+
+    # vectory functions
+    def get_length_sqrd(self):
+        """squared length of every vector"""
+        return self.data[0] ** 2 + self.data[1] ** 2
+
+    def get_length(self):
+        return np.hypot(self.data[0], self.data[1])
+    def __setlength(self, value):
+        length = self.get_length()
+        # null vectors stay null vectors
+        self.data *= np.divide(value, length, out=np.zeros_like(length), where=length != 0)
+    length = property(get_length, __setlength, None, "gets or sets the magnitudes of the vectors")
+
+    @staticmethod
+    def _sin_cos(angle_degrees):
+        if np.ndim(angle_degrees) == 0:
+            radians = math.radians(angle_degrees)
+            return math.sin(radians), math.cos(radians)
+        radians = np.radians(angle_degrees)
+        return np.sin(radians), np.cos(radians)
+
+    def rotate(self, angle_degrees):
+        sin, cos = self._sin_cos(angle_degrees)
+        x = self.data[0] * cos - self.data[1] * sin
+        self.data[1] = self.data[0] * sin + self.data[1] * cos
+        self.data[0] = x
+
+    def rotated(self, angle_degrees):
+        sin, cos = self._sin_cos(angle_degrees)
+        return Vec2dArray(self.data[0] * cos - self.data[1] * sin,
+                          self.data[0] * sin + self.data[1] * cos)
+
+    def get_angle(self):
+        """angle in degrees, null vectors have angle 0"""
+        return np.degrees(np.arctan2(self.data[1], self.data[0]))
+    def __setangle(self, angle_degrees):
+        sin, cos = self._sin_cos(angle_degrees)
+        length = self.get_length()
+        self.data[0] = length * cos
+        self.data[1] = length * sin
+    angle = property(get_angle, __setangle, None, "gets or sets the angles of the vectors")
+
+    def get_angle_between(self, other):
+        other = np.broadcast_to(self._coerce(other), self.data.shape)
+        cross = self.data[0] * other[1] - self.data[1] * other[0]
+        dot = self.data[0] * other[0] + self.data[1] * other[1]
+        return np.degrees(np.arctan2(cross, dot))
+
+    def normalized(self):
+        """return unit vectors, null vectors stay null vectors"""
+        length = self.get_length()
+        length[length == 0] = 1.0
+        return Vec2dArray.from_data(self.data / length)
+
+    def normalize_return_length(self):
+        length = self.get_length()
+        self.data /= np.where(length == 0, 1.0, length)
+        return length
+
+    def perpendicular(self):
+        return Vec2dArray(-self.data[1], self.data[0])
+
+    def dot(self, other):
+        other = np.broadcast_to(self._coerce(other), self.data.shape)
+        return self.data[0] * other[0] + self.data[1] * other[1]
+
+    def cross(self, other):
+        other = np.broadcast_to(self._coerce(other), self.data.shape)
+        return self.data[0] * other[1] - self.data[1] * other[0]
+
+    def get_distance(self, other):
+        return (self - other).get_length()
+
+    def get_dist_sqrd(self, other):
+        return (self - other).get_length_sqrd()
+
+    def interpolate_to(self, other, range):
+        return self + (self._coerce(other) - self.data) * range
+
+########################################################################
+## Unit Testing                                                       ##
+########################################################################
+if __name__ == "__main__":
+
+    import unittest
+    import pickle
+
+    ####################################################################
+    class UnitTestVec2dArray(unittest.TestCase):
+
+        def setUp(self):
+            self.vectors = [Vec2d(111, 222), Vec2d(3, 4), Vec2d(0, -3)]
+            self.array = Vec2dArray(self.vectors)
+
+        def assertVectors(self, array, vectors):
+            self.assertEqual(len(array), len(vectors))
+            for element, vector in zip(array, vectors):
+                self.assertAlmostEqual(element[0], vector[0])
+                self.assertAlmostEqual(element[1], vector[1])
+
+        def testCreationAndAccess(self):
+            v = Vec2dArray((1, 2), (3, 4))
+            self.assertEqual(v[1], Vec2d(2, 4))
+            self.assertTrue(v.y.flags["C_CONTIGUOUS"])
+            self.assertRaises(IndexError, v.__getitem__, 2)
+            self.assertVectors(self.array, self.vectors)
+
+        def testViews(self):
+            v = self.array[1]
+            v.x = 10
+            v += Vec2d(1, 1)
+            self.assertEqual(self.array[1], Vec2d(11, 5))
+            part = self.array[1:]
+            part.y = 0
+            self.assertEqual(self.array.y.tolist(), [222, 0, 0])
+
+        def testMath(self):
+            self.assertVectors(self.array + 1, [v + 1 for v in self.vectors])
+            self.assertVectors(self.array - (1, 2), [v - (1, 2) for v in self.vectors])
+            self.assertVectors(self.array / 2.0, [v / 2.0 for v in self.vectors])
+            self.assertVectors(2 - self.array, [2 - v for v in self.vectors])
+            scalars = np.array((1.0, 2.0, 3.0))
+            self.assertVectors(self.array * scalars, [v * s for v, s in zip(self.vectors, scalars.tolist())])
+
+        def testInplace(self):
+            data = self.array.data
+            self.array *= .5
+            self.array += .5
+            self.array /= (3, 6)
+            self.assertTrue(self.array.data is data)
+            self.assertVectors(self.array, [(v * .5 + .5) / Vec2d(3, 6) for v in self.vectors])
+
+        def testMasked(self):
+            mask = self.array.y > 0
+            self.array.assign_where(mask, (0, 0))
+            self.assertVectors(self.array, [Vec2d(0, 0), Vec2d(0, 0), Vec2d(0, -3)])
+            self.array[~mask] = Vec2d(1, 1)
+            self.assertVectors(self.array, [Vec2d(0, 0), Vec2d(0, 0), Vec2d(1, 1)])
+
+        def testReflect(self):
+            positions = Vec2dArray([(-1, 10), (10, 10), (10, 700)])
+            direction = Vec2dArray([(1, 1), (1, 1), (1, 1)])
+            mask_x, mask_y = positions.reflect(direction, 600, 600)
+            self.assertVectors(direction, [Vec2d(-1, 1), Vec2d(1, 1), Vec2d(1, -1)])
+            self.assertEqual(mask_x.tolist(), [True, False, False])
+            self.assertEqual(mask_y.tolist(), [False, False, True])
+
+        def testLength(self):
+            self.assertEqual(self.array.length.tolist(), [v.length for v in self.vectors])
+            self.array.length = 5
+            self.assertTrue(np.allclose(self.array.length, 5))
+            self.assertVectors(self.array.normalized(), [v.normalized() for v in self.vectors])
+            self.assertEqual(Vec2dArray.zeros(2).normalized().length.tolist(), [0, 0])
+
+        def testAngles(self):
+            self.assertVectors(self.array.rotated(-90), [v.rotated(-90) for v in self.vectors])
+            self.assertEqual(self.array.angle.tolist(), [v.angle for v in self.vectors])
+            self.array.angle = 90
+            self.assertVectors(self.array, [Vec2d(0, v.length) for v in self.vectors])
+            self.array.rotate(np.array((90.0, 180.0, 0.0)))
+            self.assertAlmostEqual(self.array[1].y, -5)
+
+        def testHighLevel(self):
+            other = Vec2d(4, 6)
+            self.assertEqual(self.array.dot(other).tolist(), [v.dot(other) for v in self.vectors])
+            self.assertEqual(self.array.cross(other).tolist(), [v.cross(other) for v in self.vectors])
+            self.assertVectors(self.array.perpendicular(), [v.perpendicular() for v in self.vectors])
+
+        def testPickle(self):
+            loaded_vec = pickle.loads(pickle.dumps(self.array[0]))
+            self.assertEqual(type(loaded_vec), Vec2d)
+            self.assertEqual(loaded_vec, self.vectors[0])
+
+    ####################################################################
+    unittest.main()
+
+    ########################################################################
@@ -0,0 +1,412 @@
+########################################################################
+import math
+import numpy as np
+# own modules
+from Vec3d import Vec3d
+
+
+class Vec3dView(Vec3d):
+    """Vec3d which reads and writes one element of a Vec3dArray,
+    no data is copied, changes are visible in the array
+    """
+    __slots__ = ['array', 'index']
+
+    def __init__(self, array, index):
+        self.array = array
+        self.index = index
+
+    def __getx(self):
+        return self.array.data[0, self.index]
+    def __setx(self, value):
+        self.array.data[0, self.index] = value
+    x = property(__getx, __setx, None, "x component in parent array")
+
+    def __gety(self):
+        return self.array.data[1, self.index]
+    def __sety(self, value):
+        self.array.data[1, self.index] = value
+    y = property(__gety, __sety, None, "y component in parent array")
+
+    def __getz(self):
+        return self.array.data[2, self.index]
+    def __setz(self, value):
+        self.array.data[2, self.index] = value
+    z = property(__getz, __setz, None, "z component in parent array")
+
+    def __repr__(self):
+        return 'Vec3dView(%s, %s, %s)' % (self.x, self.y, self.z)
+
+    def __reduce__(self):
+        # pickle as detached Vec3d, the parent array is not part of it
+        return (Vec3d, (float(self.x), float(self.y), float(self.z)))
+
+
+class Vec3dArray(object):
+    """N 3d vectors stored as struct of arrays,
+    one contiguous float64 row for x, y and z each.
+
+    supports the same operators and high level functions as Vec3d,
+    but every call works on all N vectors at once.
+
+    the other operand could be
+    Vec3dArray - element wise
+    Vec3d, tuple, list - the same vector for every element
+    1d numpy.ndarray - one scalar for every element
+    scalar - the same scalar for every element
+    """
+    __slots__ = ['data']
+
+    def __init__(self, x_or_triples, y=None, z=None):
+        if y is None:
+            # sequence of triples or (N x 3) array
+            triples = np.asarray(x_or_triples, dtype=np.float64).reshape(-1, 3)
+            self.data = np.ascontiguousarray(triples.T)
+        else:
+            self.data = np.array((x_or_triples, y, z), dtype=np.float64)
+
+    @classmethod
+    def from_data(cls, data):
+        """wrap existing (3 x N) array, without copying"""
+        vectors = cls.__new__(cls)
+        vectors.data = data
+        return vectors
+
+    @classmethod
+    def zeros(cls, length):
+        """return array of length null vectors"""
+        return cls.from_data(np.zeros((3, length), dtype=np.float64))
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            if not -len(self) <= key < len(self):
+                raise IndexError("Invalid subscript "+str(key)+" to Vec3dArray")
+            return Vec3dView(self, key % len(self))
+        # slices return views, masks and index arrays return copies
+        return Vec3dArray.from_data(self.data[:, key])
+
+    def __setitem__(self, key, value):
+        self.data[:, key] = self._coerce(value)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield Vec3dView(self, index)
+
+    def copy(self):
+        return Vec3dArray.from_data(self.data.copy())
+
+    def to_list(self):
+        """return list of detached Vec3d objects"""
+        return [Vec3d(x, y, z) for x, y, z in self.data.T.tolist()]
+
+    # String representaion (for debugging)
+    def __repr__(self):
+        return 'Vec3dArray(%s)' % self.data.T.tolist()
+
+    # columns
+    def __getx(self):
+        return self.data[0]
+    def __setx(self, value):
+        self.data[0] = value
+    x = property(__getx, __setx, None, "x components as numpy view")
+
+    def __gety(self):
+        return self.data[1]
+    def __sety(self, value):
+        self.data[1] = value
+    y = property(__gety, __sety, None, "y components as numpy view")
+
+    def __getz(self):
+        return self.data[2]
+    def __setz(self, value):
+        self.data[2] = value
+    z = property(__getz, __setz, None, "z components as numpy view")
+
+    # Generic operator handlers
+    @staticmethod
+    def _coerce(other):
+        """return other in a shape which broadcasts against (3 x N)"""
+        if isinstance(other, Vec3dArray):
+            return other.data
+        elif isinstance(other, np.generic):
+            return other
+        elif isinstance(other, np.ndarray):
+            if other.ndim == 1:
+                return other[np.newaxis, :]
+            return other
+        elif hasattr(other, "__getitem__"):
+            return np.array((other[0], other[1], other[2]), dtype=np.float64)[:, np.newaxis]
+        else:
+            return other
+
+    def _o2(self, other, f):
+        "Any two-operator operation where the left operand is a Vec3dArray"
+        return Vec3dArray.from_data(f(self.data, self._coerce(other)))
+
+    def _r_o2(self, other, f):
+        "Any two-operator operation where the right operand is a Vec3dArray"
+        return Vec3dArray.from_data(f(self._coerce(other), self.data))
+
+    def _io(self, other, f):
+        "inplace operator"
+        f(self.data, self._coerce(other), out=self.data)
+        return self
+
+    # Addition
+    def __add__(self, other):
+        return self._o2(other, np.add)
+    __radd__ = __add__
+    def __iadd__(self, other):
+        return self._io(other, np.add)
+
+    # Subtraction
+    def __sub__(self, other):
+        return self._o2(other, np.subtract)
+    def __rsub__(self, other):
+        return self._r_o2(other, np.subtract)
+    def __isub__(self, other):
+        return self._io(other, np.subtract)
+
+    # Multiplication
+    def __mul__(self, other):
+        return self._o2(other, np.multiply)
+    __rmul__ = __mul__
+    def __imul__(self, other):
+        return self._io(other, np.multiply)
+
+    # Division
+    def __truediv__(self, other):
+        return self._o2(other, np.true_divide)
+    def __rtruediv__(self, other):
+        return self._r_o2(other, np.true_divide)
+    def __itruediv__(self, other):
+        return self._io(other, np.true_divide)
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+    __idiv__ = __itruediv__
+
+    def __floordiv__(self, other):
+        return self._o2(other, np.floor_divide)
+    def __rfloordiv__(self, other):
+        return self._r_o2(other, np.floor_divide)
+    def __ifloordiv__(self, other):
+        return self._io(other, np.floor_divide)
+
+    # Unary operations
+    def __neg__(self):
+        return Vec3dArray.from_data(-self.data)
+
+    def __pos__(self):
+        return self.copy()
+
+    def __abs__(self):
+        return Vec3dArray.from_data(np.abs(self.data))
+
+    # vectory functions
+    def get_length_sqrd(self):
+        """squared length of every vector"""
+        return np.einsum("ij,ij->j", self.data, self.data)
+
+    def get_length(self):
+        return np.sqrt(self.get_length_sqrd())
+    def __setlength(self, value):
+        length = self.get_length()
+        # null vectors stay null vectors
+        self.data *= np.divide(value, length, out=np.zeros_like(length), where=length != 0)
+    length = property(get_length, __setlength, None, "gets or sets the magnitudes of the vectors")
+
+    @staticmethod
+    def _sin_cos(angle_degrees):
+        if np.ndim(angle_degrees) == 0:
+            radians = math.radians(angle_degrees)
+            return math.sin(radians), math.cos(radians)
+        radians = np.radians(angle_degrees)
+        return np.sin(radians), np.cos(radians)
+
+    def _rotated(self, first, second, angle_degrees):
+        """return rotated copy, rotation in plane of axis first and second"""
+        sin, cos = self._sin_cos(angle_degrees)
+        data = self.data.copy()
+        data[first] = self.data[first] * cos - self.data[second] * sin
+        data[second] = self.data[first] * sin + self.data[second] * cos
+        return Vec3dArray.from_data(data)
+
+    def _rotate(self, first, second, angle_degrees):
+        """rotate inplace, rotation in plane of axis first and second"""
+        sin, cos = self._sin_cos(angle_degrees)
+        first_new = self.data[first] * cos - self.data[second] * sin
+        self.data[second] = self.data[first] * sin + self.data[second] * cos
+        self.data[first] = first_new
+
+    def rotate_around_z(self, angle_degrees):
+        self._rotate(0, 1, angle_degrees)
+
+    def rotate_around_x(self, angle_degrees):
+        self._rotate(1, 2, angle_degrees)
+
+    def rotate_around_y(self, angle_degrees):
+        self._rotate(2, 0, angle_degrees)
+
+    def rotated_around_z(self, angle_degrees):
+        return self._rotated(0, 1, angle_degrees)
+
+    def rotated_around_x(self, angle_degrees):
+        return self._rotated(1, 2, angle_degrees)
+
+    def rotated_around_y(self, angle_degrees):
+        return self._rotated(2, 0, angle_degrees)
+
+    def normalized(self):
+        """return unit vectors, null vectors stay null vectors"""
+        length = self.get_length()
+        length[length == 0] = 1.0
+        return Vec3dArray.from_data(self.data / length)
+
+    def normalize_return_length(self):
+        length = self.get_length()
+        self.data /= np.where(length == 0, 1.0, length)
+        return length
+
+    def dot(self, other):
+        return np.einsum("ij,ij->j", self.data, np.broadcast_to(self._coerce(other), self.data.shape))
+
+    def get_distance(self, other):
+        return (self - other).get_length()
+
+    def get_dist_sqrd(self, other):
+        return (self - other).get_length_sqrd()
+
+    def cross(self, other):
+        other = np.broadcast_to(self._coerce(other), self.data.shape)
+        return Vec3dArray.from_data(np.cross(self.data, other, axis=0))
+
+    def interpolate_to(self, other, range):
+        return self + (self._coerce(other) - self.data) * range
+
+    def project(self, win_width, win_height, fov, viewer_distance):
+        """ Transforms all 3D points to 2D using a perspective projection. """
+        factor = fov / (viewer_distance + self.data[2])
+        data = np.empty_like(self.data)
+        np.multiply(self.data[0], factor, out=data[0])
+        data[0] += win_width / 2
+        np.multiply(self.data[1], -factor, out=data[1])
+        data[1] += win_height / 2
+        data[2] = 1
+        return Vec3dArray.from_data(data)
+
+def get_rotation_matrix(dx, dy, dz):
+    """
+    3x3 matrix, same as rotated_around_x(dx).rotated_around_y(dy).rotated_around_z(dz),
+    angles in degrees. apply to (N x 3) points with points.dot(matrix.T)
+    """
+    (sx, cx) = Vec3dArray._sin_cos(dx)
+    (sy, cy) = Vec3dArray._sin_cos(dy)
+    (sz, cz) = Vec3dArray._sin_cos(dz)
+    rot_x = np.array(((1, 0, 0), (0, cx, -sx), (0, sx, cx)))
+    rot_y = np.array(((cy, 0, sy), (0, 1, 0), (-sy, 0, cy)))
+    rot_z = np.array(((cz, -sz, 0), (sz, cz, 0), (0, 0, 1)))
+    return rot_z.dot(rot_y).dot(rot_x)
+
+########################################################################
+## Unit Testing                                                       ##
+########################################################################
+if __name__ == "__main__":
+
+    import unittest
+    import pickle
+
+    ####################################################################
+    class UnitTestVec3dArray(unittest.TestCase):
+
+        def setUp(self):
+            self.vectors = [Vec3d(111, 222, 333), Vec3d(1, 4, 8), Vec3d(0, 3, -3)]
+            self.array = Vec3dArray(self.vectors)
+
+        def assertVectors(self, array, vectors):
+            self.assertEqual(len(array), len(vectors))
+            for element, vector in zip(array, vectors):
+                for index in range(3):
+                    self.assertAlmostEqual(element[index], vector[index])
+
+        def testCreationAndAccess(self):
+            v = Vec3dArray((1, 2), (3, 4), (5, 6))
+            self.assertEqual(v[1], Vec3d(2, 4, 6))
+            self.assertEqual(v[-1], Vec3d(2, 4, 6))
+            self.assertTrue(v.x.flags["C_CONTIGUOUS"])
+            self.assertRaises(IndexError, v.__getitem__, 2)
+            self.assertVectors(self.array, self.vectors)
+
+        def testViews(self):
+            v = self.array[1]
+            v.x = 10
+            v[2] += 1
+            v += Vec3d(1, 1, 1)
+            self.assertEqual(self.array[1], Vec3d(11, 5, 10))
+            part = self.array[1:]
+            part.y = 0
+            self.assertEqual(self.array.y.tolist(), [222, 0, 0])
+            copy = self.array[self.array.x > 50]
+            copy.x = 0
+            self.assertEqual(self.array.x.tolist(), [111, 11, 0])
+
+        def testMath(self):
+            other = Vec3dArray([Vec3d(1, 1, 1), Vec3d(-1, 2, 3), Vec3d(4, 5, 6)])
+            self.assertVectors(self.array + 1, [v + 1 for v in self.vectors])
+            self.assertVectors(self.array - (1, 2, 3), [v - (1, 2, 3) for v in self.vectors])
+            self.assertVectors(self.array * other, [v * o for v, o in zip(self.vectors, other)])
+            self.assertVectors(self.array / 2.0, [v / 2.0 for v in self.vectors])
+            self.assertVectors(2 - self.array, [2 - v for v in self.vectors])
+            self.assertVectors(-self.array, [-v for v in self.vectors])
+            scalars = np.array((1.0, 2.0, 3.0))
+            self.assertVectors(self.array * scalars, [v * s for v, s in zip(self.vectors, scalars.tolist())])
+
+        def testInplace(self):
+            data = self.array.data
+            self.array *= .5
+            self.array += .5
+            self.array /= (3, 6, 9)
+            self.array -= Vec3d(1, 1, 1)
+            self.assertTrue(self.array.data is data)
+            self.assertVectors(self.array, [(v * .5 + .5) / Vec3d(3, 6, 9) - 1 for v in self.vectors])
+
+        def testLength(self):
+            self.assertEqual(self.array.length.tolist(), [v.length for v in self.vectors])
+            self.array.length = 9
+            self.assertTrue(np.allclose(self.array.length, 9))
+            zero = Vec3dArray.zeros(2)
+            self.assertEqual(zero.normalized().length.tolist(), [0, 0])
+            self.assertVectors(self.array.normalized(), [v.normalized() for v in self.vectors])
+
+        def testRotation(self):
+            for name in ("x", "y", "z"):
+                rotated = getattr(self.array, "rotated_around_" + name)(-90)
+                expected = [getattr(v, "rotated_around_" + name)(-90) for v in self.vectors]
+                self.assertVectors(rotated, expected)
+                getattr(self.array, "rotate_around_" + name)(-90)
+                self.assertVectors(self.array, expected)
+                self.array = Vec3dArray(self.vectors)
+
+        def testRotationMatrix(self):
+            matrix = get_rotation_matrix(30, -45, 120)
+            rotated = Vec3dArray.from_data(matrix.dot(self.array.data))
+            expected = [v.rotated_around_x(30).rotated_around_y(-45).rotated_around_z(120) for v in self.vectors]
+            self.assertVectors(rotated, expected)
+
+        def testHighLevel(self):
+            other = Vec3d(4, 6, 1)
+            self.assertEqual(self.array.dot(other).tolist(), [v.dot(other) for v in self.vectors])
+            self.assertVectors(self.array.cross(other), [v.cross(other) for v in self.vectors])
+            projected = self.array.project(600, 400, 2, 256)
+            self.assertVectors(projected, [v.project(600, 400, 2, 256) for v in self.vectors])
+
+        def testPickle(self):
+            loaded_vec = pickle.loads(pickle.dumps(self.array[0]))
+            self.assertEqual(type(loaded_vec), Vec3d)
+            self.assertEqual(loaded_vec, self.vectors[0])
+
+    ####################################################################
+    unittest.main()
+
+    ########################################################################
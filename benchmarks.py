@@ -1,9 +1,24 @@
-#!/usr/bin/python
+#!/usr/bin/python3
+"""
+benchmark of point representations
+
+every candidate stores N 2d points and shifts all of them by (1, 1),
+for several N. creation time, time per element of best and median run
+and memory per element are printed as table, with --csv also written
+to file, so numbers can be tracked across releases
+
+    python3 benchmarks.py -n 1000,10000,100000 -r 5
+    python3 benchmarks.py -f numpy --csv points.csv
+"""
+import csv
 import random
 import array
-import sys
 import time
-from PointC import PointC as PointC
+import argparse
+import tracemalloc
+import collections
+import numpy
+
 
 class Point(object):
 
@@ -17,7 +32,7 @@ class Point(object):
     def __iadd__(self, other):
         self.x += other.x
         self.y += other.y
-        return()
+        return(self)
 
 
 class Point2(object):
@@ -34,129 +49,211 @@ class Point2(object):
     def __iadd__(self, other):
         self.x += other.x
         self.y += other.y
-        return()
-
-
-def generate():
-    amount = 2000000
-    starttime = time.time()
-    global point1
-    point1 = list((Point(random.random() * 800, random.random() * 600) for _ in xrange(amount)))
-    print "creating point1 in %f s" % (time.time()-starttime)
-    starttime = time.time()
-    global point2
-    point2 = list(((random.random() * 800, random.random() * 600) for _ in xrange(amount)))
-    print "creating point2 in %f s" % (time.time()-starttime)
-    starttime = time.time()
-    global point3
-    point3 = list((array.array("f", (random.random() * 800, random.random() * 600)) for _ in xrange(amount)))
-    print "creating point3 in %f s" % (time.time()-starttime)
-    starttime = time.time()
-    global point4
-    point4 = list((Point2(random.random() * 800, random.random() * 600) for _ in xrange(amount)))
-    print "creating point4 in %f s" % (time.time()-starttime)
-    starttime = time.time()
-    global point5
-    point5 = list(([random.random() * 800, random.random() * 600] for _ in xrange(amount)))
-    print "creating point5 in %f s" % (time.time()-starttime)
-    starttime = time.time()
-    global point6
-    point6 = list(({"x" : random.random() * 800, "y" : random.random() * 600} for _ in xrange(amount)))
-    print "creating point6 in %f s" % (time.time()-starttime)
-    starttime = time.time()
-    global point7
-    point7 = list((Point2(random.random() * 800, random.random() * 600) for _ in xrange(amount)))
-    print "creating point7 in %f s" % (time.time()-starttime)
-    global point8
-    point8 = list((PointC(random.random() * 800, random.random() * 600) for _ in xrange(amount)))
-    print "creating point8 in %f s" % (time.time()-starttime)
-
-
-def calculate1(*args, **kwds):
-    for point in point1:
-        point += Point(1.0, 1.0)
-
-def calculate1a(*args, **kwds):
-    for point in point1:
-        point = point + Point(1.0, 1.0)
-
-def calculate2(*args, **kwds):
-    for point in point2:
-        point = (point[0] + 1.0, point[1] + 1.0)
-
-def calculate2a(*args, **kwds):
-    map(lambda a: (a[0] + 1.0, a[1] + 1.0), point2)
-
-def calculate3(*args, **kwds):
-    for point in point3:
-        point = array.array("f", (point[0] + 1.0, point[1] + 1.0))
-
-def calculate4(*args, **kwds):
-    for point in point4:
-        point += Point(1.0, 1.0)
-
-def calculate5(*args, **kwds):
-    for point in point5:
-        point[0] += 1.0
-        point[1] += 1.0
-
-def calculate5a(*args, **kwds):
-    for point in point5:
-        point = [point[0] + 1.0, point[1] + 1.0]
-
-def calculate6(*args, **kwds):
-    for point in point6:
-        point["x"] += 1.0
-        point["y"] += 1.0
-
-def calculate6a(*args, **kwds):
-    for point in point6:
-        point = {"x" : point["x"] + 1.0, "y" : point["y"] + 1.0}
-
-def calculate7(*args, **kwds):
-    for point in point7:
-        point += Point2(1.0, 1.0)
-
-def calculate7a(*args, **kwds):
-    for point in point7:
-        point = point + Point2(1.0, 1.0)
-
-def calculate8(*args, **kwds):
-    for point in point8:
-        point += PointC(1.0, 1.0)
-
-def calculate8a(*args, **kwds):
-    for point in point8:
-        point = point + PointC(1.0, 1.0)
-
-def run_and_stop(name, func, args=None, kwds=None):
-    starttime = time.time()
-    func(args, kwds)
-    print "%s Duration %f s" % (name, time.time() - starttime)
+        return(self)
+
+
+def objects(cls, *rest):
+    """create function for list of objects of cls"""
+    return lambda xs, ys: [cls(x, y, *rest) for (x, y) in zip(xs, ys)]
+
+def iadd(one):
+    """shift function, inplace add of one to every object"""
+    def shift(points):
+        for point in points:
+            point += one
+    return shift
+
+def add(one):
+    """shift function, replaces every object with sum"""
+    def shift(points):
+        points[:] = [point + one for point in points]
+    return shift
+
+def attribute_x(points):
+    return(points[0].x)
+
+def item_x(points):
+    return(points[0][0])
+
+
+def point_iadd():
+    return(objects(Point), iadd(Point(1.0, 1.0)), attribute_x)
+
+def point_add():
+    return(objects(Point), add(Point(1.0, 1.0)), attribute_x)
+
+def point2_iadd():
+    return(objects(Point2), iadd(Point2(1.0, 1.0)), attribute_x)
+
+def point2_add():
+    return(objects(Point2), add(Point2(1.0, 1.0)), attribute_x)
+
+def point_c_iadd():
+    from PointC import PointC
+    return(objects(PointC), iadd(PointC(1.0, 1.0)), attribute_x)
+
+def point_c_add():
+    from PointC import PointC
+    return(objects(PointC), add(PointC(1.0, 1.0)), attribute_x)
+
+def vec2d_iadd():
+    from Vec2d import Vec2d
+    return(objects(Vec2d), iadd(Vec2d(1.0, 1.0)), attribute_x)
+
+def vec2d_fast_iadd():
+    from Vec2dFast import Vec2d
+    return(objects(Vec2d), iadd(Vec2d(1.0, 1.0)), attribute_x)
+
+def vec3d_iadd():
+    from Vec3d import Vec3d
+    return(objects(Vec3d, 0.0), iadd(Vec3d(1.0, 1.0, 0.0)), attribute_x)
+
+def vector3h_iadd():
+    from Vector3h import Vector3h
+    return(objects(Vector3h, 0.0), iadd(Vector3h(1.0, 1.0, 0.0)), attribute_x)
+
+def tuples():
+    def shift(points):
+        points[:] = [(x + 1.0, y + 1.0) for (x, y) in points]
+    return(lambda xs, ys: list(zip(xs, ys)), shift, item_x)
+
+def lists():
+    def shift(points):
+        for point in points:
+            point[0] += 1.0
+            point[1] += 1.0
+    return(lambda xs, ys: [[x, y] for (x, y) in zip(xs, ys)], shift, item_x)
+
+def arrays():
+    def shift(points):
+        for point in points:
+            point[0] += 1.0
+            point[1] += 1.0
+    return(lambda xs, ys: [array.array("d", (x, y)) for (x, y) in zip(xs, ys)], shift, item_x)
+
+def dicts():
+    def shift(points):
+        for point in points:
+            point["x"] += 1.0
+            point["y"] += 1.0
+    return(lambda xs, ys: [{"x" : x, "y" : y} for (x, y) in zip(xs, ys)], shift, lambda points: points[0]["x"])
+
+def numpy_structured():
+    def create(xs, ys):
+        points = numpy.empty(len(xs), dtype=[("x", numpy.float64), ("y", numpy.float64)])
+        points["x"] = xs
+        points["y"] = ys
+        return(points)
+    def shift(points):
+        points["x"] += 1.0
+        points["y"] += 1.0
+    return(create, shift, lambda points: points["x"][0])
+
+def numpy_array():
+    def shift(points):
+        points += 1.0
+    return(lambda xs, ys: numpy.array((xs, ys), dtype=numpy.float64).T.copy(), shift, lambda points: points[0, 0])
+
+def vec2d_array():
+    from Vec2dArray import Vec2dArray
+    def shift(points):
+        points += (1.0, 1.0)
+    return(lambda xs, ys: Vec2dArray(xs, ys), shift, lambda points: points.x[0])
+
+
+# name of candidate, function returning
+# (create(xs, ys), shift(points), x of first point)
+CANDIDATES = collections.OrderedDict((
+    ("class, __iadd__", point_iadd),
+    ("class, __add__", point_add),
+    ("class __slots__, __iadd__", point2_iadd),
+    ("class __slots__, __add__", point2_add),
+    ("cython PointC, __iadd__", point_c_iadd),
+    ("cython PointC, __add__", point_c_add),
+    ("Vec2d, __iadd__", vec2d_iadd),
+    ("Vec2dFast, __iadd__", vec2d_fast_iadd),
+    ("Vec3d, __iadd__", vec3d_iadd),
+    ("cython Vector3h, __iadd__", vector3h_iadd),
+    ("list of tuples, new tuples", tuples),
+    ("list of lists, inplace", lists),
+    ("list of array.array, inplace", arrays),
+    ("list of dicts, inplace", dicts),
+    ("numpy structured array", numpy_structured),
+    ("numpy (N x 2) array", numpy_array),
+    ("Vec2dArray", vec2d_array),
+))
+
+
+def run(name, size, repeat=5, warmup=1):
+    """
+    benchmark one candidate with size points,
+    returns dict with results, or with error if candidate is not available
+    """
+    result = {
+        "candidate" : name,
+        "n" : size,
+    }
+    random.seed(size)
+    xs = [random.random() * 800 for _ in range(size)]
+    ys = [random.random() * 600 for _ in range(size)]
+    try:
+        (create, shift, first_x) = CANDIDATES[name]()
+    except ImportError as exc:
+        result["error"] = str(exc)
+        return(result)
+    # memory of points, without coordinate lists
+    tracemalloc.start()
+    starttime = time.perf_counter()
+    points = create(xs, ys)
+    result["create_ms"] = (time.perf_counter() - starttime) * 1000
+    (memory, _) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result["bytes_per_element"] = memory / size
+    for _ in range(warmup):
+        shift(points)
+    times = []
+    for _ in range(repeat):
+        starttime = time.perf_counter()
+        shift(points)
+        times.append(time.perf_counter() - starttime)
+    # every run has to move the points, else wrong thing is measured,
+    # tolerance allows for single precision of PointC
+    if abs(first_x(points) - (xs[0] + warmup + repeat)) > 1e-3:
+        result["error"] = "points were not shifted"
+        return(result)
+    result["best_ns"] = min(times) / size * 1e9
+    result["median_ns"] = numpy.median(times) / size * 1e9
+    return(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark of point representations")
+    parser.add_argument("-n", "--sizes", default="1000,10000,100000",
+        help="comma separated list of number of points")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="measured runs")
+    parser.add_argument("-w", "--warmup", type=int, default=1, help="runs before measuring")
+    parser.add_argument("-f", "--filter", default="", help="only candidates containing this text")
+    parser.add_argument("--csv", help="write table also to this CSV file")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    names = [name for name in CANDIDATES if args.filter.lower() in name.lower()]
+    results = []
+    print("%-30s %9s %11s %12s %12s %12s" % ("candidate", "n", "create ms", "best ns/el", "median ns/el", "bytes/el"))
+    for name in names:
+        for size in sizes:
+            result = run(name, size, args.repeat, args.warmup)
+            results.append(result)
+            if "error" in result:
+                print("%-30s %9d %s" % (name, size, result["error"]))
+                continue
+            print("%-30s %9d %11.2f %12.1f %12.1f %12.1f" % (name, size, result["create_ms"],
+                result["best_ns"], result["median_ns"], result["bytes_per_element"]))
+    if args.csv:
+        columns = ("candidate", "n", "create_ms", "best_ns", "median_ns", "bytes_per_element", "error")
+        with open(args.csv, "w") as outfile:
+            writer = csv.DictWriter(outfile, columns)
+            writer.writeheader()
+            writer.writerows(results)
 
 if __name__ == "__main__":
-    point1 = None
-    point2 = None
-    point3 = None
-    point4 = None
-    point5 = None
-    point6 = None
-    point7 = None
-    point8 = None
-    print "generating"
-    generate()
-    print "calculating"
-    run_and_stop("Point Class List, __iadd__", calculate1)
-    run_and_stop("Point Class List, __add__", calculate1a)
-    run_and_stop("Tuple List", calculate2)
-    run_and_stop("Tuple List, map function", calculate2a)
-    run_and_stop("Array List", calculate3)
-    run_and_stop("Point class with slots", calculate4)
-    run_and_stop("List of lists", calculate5)
-    run_and_stop("List of lists, inplace", calculate5a)
-    run_and_stop("List of dicts, inplace", calculate6)
-    run_and_stop("List of dicts, new dicts", calculate6a)
-    run_and_stop("Point Class List with __slots__, __iadd__", calculate7)
-    run_and_stop("Point Class List with __slots__, __add__", calculate7a)
-    run_and_stop("Cython Point Class List, __iadd__", calculate8)
-    run_and_stop("Cython Point Class List, __add__", calculate8a)
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/python3
+"""
+headless benchmark of every effect
+
+every effect is drawn on an offscreen surface with the SDL dummy
+video driver, for a fixed number of frames per resolution.
+frame times (p50/p95/p99), allocations and throughput are printed
+and saved as JSON, so runs can be compared with --compare
+
+    python3 effect_benchmarks.py -e Plasma,FirePy -r 320x200,800x600
+    python3 effect_benchmarks.py -o new.json -c old.json
+"""
+
+import io
+import os
+# has to be set before pygame initializes the display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import time
+import json
+import platform
+import argparse
+import tracemalloc
+import collections
+import contextlib
+import numpy
+import pygame
+
+
+def plasma(surface):
+    from Plasma import Plasma
+    return Plasma(surface).update
+
+def plasma_fractal(surface):
+    from PlasmaFractal import PlasmaFractal
+    return PlasmaFractal(surface).update
+
+def plasma_fractal2(surface):
+    from PlasmaFractal2 import PlasmaFractal2
+    return PlasmaFractal2(surface).update
+
+def fire(surface):
+    from fire import FirePy
+    return FirePy(surface, surface.get_rect(), 4).update
+
+def mandelbrot(surface):
+    from Mandelbrot import Mandelbrot
+    effect = Mandelbrot(surface)
+    effect.wait()
+    return effect.update
+
+def mandelbrot_zoom(surface):
+    from Mandelbrot import MandelbrotZoom
+    effect = MandelbrotZoom(surface, center=(-0.743643887037151, 0.13182590420533))
+    def update():
+        effect.zoom(1.02)
+        effect.update()
+    return update
+
+def rotating_cube(surface):
+    import Utils3d
+    import Transformer
+    from Mesh import Mesh
+    (width, height) = surface.get_size()
+    return Mesh(
+        surface,
+        origin=(width // 2, height // 2),
+        transformations=Transformer.RotationTransformer(
+            Utils3d.get_scale_rot_matrix(
+                scale_tuple=(width, height, 1),
+                aspect_tuple=(16, 9),
+                shift_tuple=(0, 0, -10)),
+            degrees=(1, 2, 3),
+            steps=360),
+        polygons=Utils3d.get_cube_polygons(),
+        culling=True,
+        shading=True).update
+
+def flying_cubes(surface):
+    import Utils3d
+    import Transformer
+    from Mesh import Mesh
+    cube = Utils3d.get_cube_polygons()
+    center = (surface.get_width() // 2, surface.get_height() // 2)
+    meshes = [Mesh(surface, origin=center, transformations=Transformer.flying_cubes_t(x, y, center), polygons=cube,
+        culling=True, shading=True)
+        for y in range(100, 500, 50) for x in range(100, 500, 50)]
+    def update():
+        for mesh in meshes:
+            mesh.update()
+    return update
+
+def starfield(surface):
+    from Starfield import Starfield
+    return Starfield(surface, stars=1000, speed=0.01, shading=True).update
+
+def sphere(surface):
+    from Vec3d import Vec3d
+    from Sphere import Sphere
+    effect = Sphere(surface, (100, 0, 0), Vec3d(-1.5, -1.5, 1.5), Vec3d(1, 1, 1))
+    theta = [0.0]
+    def update():
+        # rotate and draw, like test()
+        theta[0] += 1.0
+        effect.rotate(dx=theta[0], dy=theta[0], dz=0.0)
+        effect.update(256, 2)
+    return update
+
+def circle(surface):
+    from Vec3d import Vec3d
+    from Circle import Circle
+    effect = Circle(surface, (100, 0, 0), Vec3d(-1.5, -1.5, 1.5), Vec3d(1, 1, 1))
+    theta = [0.0]
+    def update():
+        # rotate and draw, like test()
+        theta[0] += 1.0
+        effect.rotate(dx=theta[0], dy=theta[0], dz=0.0)
+        effect.update(256, 2)
+    return update
+
+def tree(surface):
+    from Vec2d import Vec2d
+    from Tree import Tree
+    (width, height) = surface.get_size()
+    return Tree(surface, pygame.Color(255, 255, 0), Vec2d(width // 2, height - 10), 8, height // 3).update
+
+def universe(surface):
+    from Universe import Universe
+    return Universe(surface, stars=50, speed=0.01).update
+
+def exploding_particles(surface):
+    from ExplodingParticles import Universe
+    return Universe(surface, number=50, speed=0.01).update
+
+def scroll_text(surface):
+    from ScrollText import ScrollText
+    return ScrollText(surface, "Dolor Ipsum Dolor uswef", surface.get_height() // 2, pygame.Color(255, 255, 0)).update
+
+def sinus_text(surface):
+    from SinusText import SinusText
+    return SinusText(surface, "Dolor Ipsum Dolor uswef", surface.get_height() // 2, 30, 2, pygame.Color(0, 255, 255)).update
+
+def hilbert_curve(surface):
+    from HilbertCurve import HilbertCurve
+    return HilbertCurve(surface).update
+
+def coffee_draw(surface):
+    from CoffeeBean import CoffeeDraw
+    return CoffeeDraw(surface).update
+
+def prime_spiral(surface):
+    from prime_spiral import PrimeSpiral
+    return PrimeSpiral(surface).update
+
+
+# every entry builds the effect on surface and returns
+# a callable, which draws one frame
+EFFECTS = collections.OrderedDict((
+    ("Plasma", plasma),
+    ("PlasmaFractal", plasma_fractal),
+    ("PlasmaFractal2", plasma_fractal2),
+    ("FirePy", fire),
+    ("Mandelbrot", mandelbrot),
+    ("MandelbrotZoom", mandelbrot_zoom),
+    ("Mesh", rotating_cube),
+    ("FlyingCubes", flying_cubes),
+    ("Starfield", starfield),
+    ("Sphere", sphere),
+    ("Circle", circle),
+    ("Tree", tree),
+    ("Universe", universe),
+    ("ExplodingParticles", exploding_particles),
+    ("ScrollText", scroll_text),
+    ("SinusText", sinus_text),
+    ("HilbertCurve", hilbert_curve),
+    ("CoffeeDraw", coffee_draw),
+    ("PrimeSpiral", prime_spiral),
+))
+
+
+def benchmark(name, size, frames=100, warmup=10, alloc_frames=10):
+    """
+    run one effect at resolution size,
+    returns dict with results, or with error if effect failed
+    """
+    result = {
+        "effect" : name,
+        "resolution" : "%dx%d" % size,
+        "frames" : frames,
+    }
+    surface = pygame.Surface(size, 0, pygame.display.get_surface())
+    try:
+        # effects print progress messages, keep table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            starttime = time.perf_counter()
+            update = EFFECTS[name](surface)
+            result["setup_ms"] = (time.perf_counter() - starttime) * 1000
+            for _ in range(warmup):
+                surface.fill((0, 0, 0))
+                update()
+            times = numpy.empty(frames)
+            for frame in range(frames):
+                surface.fill((0, 0, 0))
+                starttime = time.perf_counter()
+                update()
+                times[frame] = time.perf_counter() - starttime
+            # allocations are measured in own pass, tracemalloc slows down
+            peaks = []
+            retained = 0
+            tracemalloc.start()
+            for _ in range(alloc_frames):
+                surface.fill((0, 0, 0))
+                tracemalloc.reset_peak()
+                (before, _) = tracemalloc.get_traced_memory()
+                update()
+                (after, peak) = tracemalloc.get_traced_memory()
+                peaks.append(peak - before)
+                retained += after - before
+            tracemalloc.stop()
+    except Exception as exc:
+        tracemalloc.stop()
+        result["error"] = "%s: %s" % (exc.__class__.__name__, exc)
+        return result
+    times *= 1000
+    result.update({
+        "mean_ms" : times.mean(),
+        "p50_ms" : numpy.percentile(times, 50),
+        "p95_ms" : numpy.percentile(times, 95),
+        "p99_ms" : numpy.percentile(times, 99),
+        "max_ms" : times.max(),
+        "fps" : 1000 / times.mean(),
+        "mpixel_per_s" : size[0] * size[1] / times.mean() / 1000,
+        "alloc_peak_kb" : max(peaks) / 1024,
+        "alloc_retained_kb" : retained / alloc_frames / 1024,
+    })
+    return result
+
+
+def print_results(results, baseline=None):
+    """print results as table, with change of p50 against baseline"""
+    old = {}
+    if baseline is not None:
+        old = dict(((entry["effect"], entry["resolution"]), entry) for entry in baseline["results"])
+    print("%-20s %-10s %9s %9s %9s %9s %10s %10s %8s" % (
+        "effect", "resolution", "setup ms", "p50 ms", "p95 ms", "p99 ms", "fps", "peak kb", "vs base"))
+    for entry in results:
+        if "error" in entry:
+            print("%-20s %-10s %s" % (entry["effect"], entry["resolution"], entry["error"].splitlines()[0]))
+            continue
+        change = ""
+        before = old.get((entry["effect"], entry["resolution"]))
+        if before is not None and "p50_ms" in before:
+            change = "%.2fx" % (before["p50_ms"] / entry["p50_ms"])
+        print("%-20s %-10s %9.2f %9.3f %9.3f %9.3f %10.1f %10.1f %8s" % (
+            entry["effect"], entry["resolution"], entry["setup_ms"], entry["p50_ms"],
+            entry["p95_ms"], entry["p99_ms"], entry["fps"], entry["alloc_peak_kb"], change))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="headless benchmark of effects")
+    parser.add_argument("-e", "--effects", default=",".join(EFFECTS.keys()),
+        help="comma separated list of effects, default all")
+    parser.add_argument("-r", "--resolutions", default="320x200,800x600",
+        help="comma separated list of resolutions")
+    parser.add_argument("-f", "--frames", type=int, default=100, help="measured frames per run")
+    parser.add_argument("-w", "--warmup", type=int, default=10, help="frames before measuring")
+    parser.add_argument("-a", "--alloc-frames", type=int, default=10, help="frames with allocation tracing")
+    parser.add_argument("-o", "--output", default="effect_benchmarks.json", help="JSON file to write")
+    parser.add_argument("-c", "--compare", help="JSON file of earlier run to compare with")
+    parser.add_argument("-l", "--list", action="store_true", help="list effects and exit")
+    args = parser.parse_args()
+    if args.list:
+        print("\n".join(EFFECTS.keys()))
+        return
+    names = args.effects.split(",")
+    for name in names:
+        if name not in EFFECTS:
+            parser.error("unknown effect %s" % name)
+    sizes = [tuple(int(value) for value in resolution.split("x")) for resolution in args.resolutions.split(",")]
+    pygame.init()
+    # some effects need a display surface for pixel format
+    pygame.display.set_mode((1, 1))
+    results = []
+    for name in names:
+        for size in sizes:
+            results.append(benchmark(name, size, args.frames, args.warmup, args.alloc_frames))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as infile:
+            baseline = json.load(infile)
+    print_results(results, baseline)
+    with open(args.output, "w") as outfile:
+        json.dump({
+            "date" : time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python" : platform.python_version(),
+            "platform" : platform.platform(),
+            "pygame" : pygame.version.ver,
+            "numpy" : numpy.__version__,
+            "results" : results,
+        }, outfile, indent=2)
+    print("results written to %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
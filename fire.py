@@ -4,7 +4,6 @@ import pygame
 import sys
 import random
 import numpy
-from Fire import Fire as Fire
 
 
 class FirePy(object):
@@ -12,6 +11,10 @@ class FirePy(object):
     Simulated Fire, 2d effect
     idea and basic algorithm from
     http://lodev.org/cgtutor/fire.html
+
+    every frame is calculated with shifted array arithmetic on
+    an uint16 buffer and mapped through an integer palette lookup
+    table straight into pixels2d of the intermediate surface
     """
 
     def __init__(self, surface, rect, scale=4):
@@ -24,65 +27,72 @@ class FirePy(object):
         """ 
         self.surface = surface
         self.rect = rect
-        self.width = rect.width / scale
-        self.height = rect.height / scale
+        self.width = rect.width // scale
+        self.height = rect.height // scale
         self.scale = scale
         # initialize values
-        # scaled down surface
-        self.drawsurface = pygame.Surface((self.width, self.height))
+        # scaled down surface, same pixel format as surface
+        self.drawsurface = pygame.Surface((self.width, self.height), 0, surface)
         self.drawsurface.fill((0, 0, 0))
-        self.array2d = None
+        # preallocated destination for scaling
+        self.blitsurface = pygame.Surface((self.width * scale, self.height * scale), 0, surface)
+        self.random = numpy.random.default_rng()
         self.fire = None
+        self.neighbours = None
         self.palette = None
         self.initialize()
 
     def initialize(self):
-        """generate palette and surface to draw intermdiate fire, also array"""
-        # self.drawsurface.fill((0, 0, 0))
-        self.array2d = pygame.surfarray.array2d(self.drawsurface)
-        self.fire = numpy.zeros((self.width, self.height))
+        """generate palette and buffers to calculate intermediate fire"""
+        # two additional rows below the visible baseline,
+        # so no row has to wrap around
+        self.fire = numpy.zeros((self.width, self.height + 2), dtype=numpy.uint16)
+        # sum of neighbours for every row except baseline
+        self.neighbours = numpy.zeros((self.width, self.height - 1), dtype=numpy.uint16)
         # generate palette
-        self.palette = numpy.zeros(255)
+        self.palette = numpy.zeros(256, dtype=numpy.uint32)
         # aplette should be something from black to yellow red
-        self.palette[0] = pygame.Color(0, 0, 0, 255)
-        for index in range(1, 255):
+        self.palette[0] = self.drawsurface.map_rgb((0, 0, 0))
+        for index in range(1, 256):
             color = pygame.Color(0, 0, 0, 255)
             # original C Comments
             # Hue goes from 0 to 85: red to yellow
             # Saturation is always the maximum: 255
             # Lightness is 0..100 for x=0..128, and 255 for x=128..255
             # color = HSLtoRGB(ColorHSL(x / 3, 255, std::min(255, x * 2)));
-            color.hsla = (index, 100, index / 2.55, 10)
-            self.palette[index] = color
+            color.hsla = (index / 3, 100, min(100, index / 1.275), 10)
+            self.palette[index] = self.drawsurface.map_rgb(color)
 
     def update(self):
-        """update every frame"""
-        w = self.width
+        """update every frame, returns rect drawn to"""
         h = self.height
-        # random baseline
-        for x in range(w):
-            self.fire[x][h - 1] = abs(32768 + random.randint(0, 32768)) % 256
-        # calculate each pixel according to neighbours
-        for y in range(h - 1):
-            for x in range(w):
-                # every new point depends on O Points
-                #    N
-                #   OOO
-                #    O
-                self.fire[x][y] = \
-                    ((self.fire[(x - 1) % w][(y + 1) % h] \
-                    + self.fire[(x) % w][(y + 2) % h] \
-                    + self.fire[(x + 1) % w][(y + 1) % h] \
-                    + self.fire[(x) % w][(y + 3) % h]) \
-                    * 16) / 65
-                # the last factor 16/65 should be slightly larger than 4
-                # and lesser than 5
-                # closer to 4 will make flames higher
-                self.array2d[x][y] = self.palette[int(self.fire[x][y])]
-        pygame.surfarray.blit_array(self.drawsurface, self.array2d)
+        fire = self.fire
+        neighbours = self.neighbours
+        # random baseline and the two rows below
+        fire[:, h - 1:] = self.random.integers(0, 256, size=(self.width, 3), dtype=numpy.uint16)
+        # every new point depends on O Points
+        #    N
+        #   OOO
+        #    O
+        # row y + 2 and row y + 3
+        numpy.add(fire[:, 2:h + 1], fire[:, 3:h + 2], out=neighbours)
+        # row y + 1 left and right neighbours, x wraps around
+        below = fire[:, 1:h]
+        neighbours[1:-1] += below[:-2]
+        neighbours[1:-1] += below[2:]
+        neighbours[0] += below[-1] + below[1]
+        neighbours[-1] += below[-2] + below[0]
+        # the last factor 16/65 should be slightly larger than 4
+        # and lesser than 5
+        # closer to 4 will make flames higher
+        neighbours *= 16
+        numpy.floor_divide(neighbours, 65, out=fire[:, :h - 1])
+        pixels = pygame.surfarray.pixels2d(self.drawsurface)
+        numpy.take(self.palette, fire[:, :h], out=pixels)
+        del pixels
         # scale fire surface up to given size
-        blitsurface = pygame.transform.scale(self.drawsurface, (self.width * self.scale, self.height * self.scale))
-        self.surface.blit(blitsurface, self.rect)
+        pygame.transform.scale(self.drawsurface, self.blitsurface.get_size(), self.blitsurface)
+        return self.surface.blit(self.blitsurface, self.rect)
 
 
 def test():
@@ -91,7 +101,7 @@ def test():
         surface = pygame.display.set_mode((320, 200))
         pygame.init()
         spheres = (
-            Fire(surface, 2), 
+            FirePy(surface, surface.get_rect(), 2), 
             )
         clock = pygame.time.Clock()       
         pause = False
@@ -111,7 +121,7 @@ def test():
                 pygame.display.update()
             pygame.display.set_caption("frame rate: %.2f frames per second" % clock.get_fps())
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 
 if __name__ == '__main__':
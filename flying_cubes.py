@@ -26,7 +26,9 @@ def test():
                         surface,
                         origin=(300, 300), 
                         transformations = Transformer.flying_cubes_t(x, y),
-                        polygons = cube)
+                        polygons = cube,
+                        culling=True,
+                        shading=True)
                 )
         clock = pygame.time.Clock()       
         pause = False
@@ -2,11 +2,49 @@
 #
 
 import sys
+import numpy
 import pygame
 from Mandelbrot import Mandelbrot as Mandelbrot
 
+# squared escape radius, large enough for smooth escape time
+BAILOUT = 256.0
+
+
+def escape_time(left, bottom, stepx, stepy, width, height, itermax=255):
+    """
+    vectorized version of Mandelbrot.calculate_tile
+
+    smooth escape time of every pixel, pixel 0, 0 is at left, bottom
+    returns (width x height) float64 array, points inside the set get itermax.
+    only points which not escaped yet are iterated further
+    """
+    cx = left + numpy.arange(width) * stepx
+    cy = bottom + numpy.arange(height) * stepy
+    c = (cx[:, numpy.newaxis] + 1j * cy[numpy.newaxis, :]).ravel()
+    z = c.copy()
+    values = numpy.full(width * height, float(itermax))
+    # flat index of every point still iterating
+    index = numpy.arange(width * height)
+    for iteration in range(itermax):
+        betrag = z.real * z.real + z.imag * z.imag
+        escaped = betrag >= BAILOUT
+        if escaped.any():
+            # continuous escape time, n + 1 - log2(log(|z|))
+            values[index[escaped]] = iteration + 1 - numpy.log2(0.5 * numpy.log(betrag[escaped]))
+            running = ~escaped
+            index = index[running]
+            z = z[running]
+            c = c[running]
+            if len(index) == 0:
+                break
+        z *= z
+        z += c
+    numpy.clip(values, 0, itermax, out=values)
+    return values.reshape((width, height))
+
+
 class MandelbrotPy(object):
-    """Clasical Mandelbrot Function, realy slow on python, so have some patience"""
+    """Clasical Mandelbrot Function, whole frame calculated with numpy"""
 
     def __init__(self, surface):
         """
@@ -17,39 +55,19 @@ class MandelbrotPy(object):
         self.width = self.surface.get_width()
         self.height = self.surface.get_height()
         self.array2d = pygame.surfarray.array2d(self.surface)
+        # grey palette, one entry for every iteration
+        self.palette = numpy.array([self.surface.map_rgb((value, value, value)) for value in range(256)], dtype=numpy.uint32)
         self.initialize()
-        print "done" 
 
-    def initialize(self, left=-2.1, right=0.7, bottom=-1.2, top=1.2, maxiter=30):
+    def initialize(self, left=-2.1, right=0.7, bottom=-1.2, top=1.2, itermax=255):
         """
         initialize pixelarray with color value,
-        classical approach, really, really slow
+        every pixel of region at once
         """
-        x = xx = y = cx = cy = betrag = x2 = y2 = None
-        iteration = hx = hy = None
-        itermax = 255		# how many iterations to do
-        magnify=1.0		# no magnification
         stepy = (top - bottom) / self.height
         stepx = (right - left) / self.width
-        cy = bottom
-        for hy in xrange(self.height):
-            cx = left
-            for hx in xrange(self.width):
-                x = cx
-                y = cy
-                iteration = 0
-                betrag = 0 
-                while (iteration < itermax) and (betrag < maxiter):
-                    x2 = x * x
-                    y2 = y * y
-                    betrag = x2 + y2
-                    xx = x2 - y2 + cx
-                    y = 2.0 * x * y + cy
-                    x = xx
-                    iteration += 1
-                self.array2d[hx][hy] = pygame.Color(iteration, iteration, iteration)
-                cx = cx + stepx
-            cy = cy + stepy
+        values = escape_time(left, bottom, stepx, stepy, self.width, self.height, itermax)
+        self.array2d[:] = self.palette[(values * (255.0 / itermax)).astype(numpy.intp)]
 
     def update(self):
         """blit pixelarray to surface"""
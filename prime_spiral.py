@@ -4,65 +4,93 @@ import sys
 import pygame
 import math
 import time
+import numpy
+
+
+def sieve(limit):
+    """sieve of eratosthenes, True for every prime number below limit"""
+    primes = numpy.ones(max(limit, 2), dtype=bool)
+    primes[:2] = False
+    for number in range(2, math.isqrt(max(limit - 1, 0)) + 1):
+        if primes[number]:
+            primes[number * number::number] = False
+    return primes[:limit]
+
+
+def ulam_spiral(numbers):
+    """
+    position of every number relative to center of ulam spiral,
+    0 is in center, 1 right of it, then the spiral goes up and
+    counterclockwise, y axis is down like on screen
+    """
+    numbers = numpy.asarray(numbers, dtype=numpy.int64) + 1
+    # ring around center, the last number of ring is (2 * ring + 1) ** 2
+    ring = numpy.ceil((numpy.sqrt(numbers) - 1) / 2).astype(numpy.int64)
+    side = 2 * ring
+    # distance to last number of ring, every side of ring is side long
+    back = (side + 1) ** 2 - numbers
+    x = numpy.empty_like(numbers)
+    y = numpy.empty_like(numbers)
+    # bottom side, top side, left side and right side of ring
+    sides = (
+        (back <= side, ring - back, ring),
+        ((back > side) & (back <= 2 * side), -ring, ring - back + side),
+        ((back > 2 * side) & (back <= 3 * side), -ring + back - 2 * side, -ring),
+        (back > 3 * side, ring, -ring + back - 3 * side),
+        )
+    for (mask, side_x, side_y) in sides:
+        x[mask] = side_x[mask]
+        y[mask] = side_y[mask]
+    return x, y
+
+
+def sacks_spiral(numbers, scale=1.0):
+    """
+    position of every number relative to center of sacks spiral,
+    number n is at radius sqrt(n) and one full turn per square number
+    """
+    root = numpy.sqrt(numbers)
+    angle = 2 * math.pi * root
+    x = numpy.rint(numpy.cos(angle) * root * scale).astype(numpy.int64)
+    y = numpy.rint(-numpy.sin(angle) * root * scale).astype(numpy.int64)
+    return x, y
+
 
 class PrimeSpiral(object):
+    """
+    spiral of prime numbers
+
+    primes are found with one numpy sieve, all positions on the spiral
+    are calculated in closed form at once, and all primes are written
+    with one scatter into pixels2d of surface
+
+    layout is "ulam" for the square ulam spiral, or "sacks" for the
+    spiral with primes on curves of polynomials
+    """
 
-    def __init__(self, surface):
+    def __init__(self, surface, layout="ulam", color=pygame.Color(0, 255, 0)):
         self.surface = surface
-        self.pixelarray = pygame.PixelArray(surface)
+        self.layout = layout
+        self.color = color
         self.initialize()
 
     def initialize(self):
-     width = min(self.surface.get_width(), self.surface.get_height())
-     max_counter = (width - 1) ** 2
-     for counter, pos in enumerate(self.spiral_walk(width)):
-        if counter == max_counter:
-            break
-        #print counter, self.is_prime(counter), pos
-        if self.is_prime(counter):
-            try:
-                self.pixelarray[pos[0], pos[1]] = 0x00FF00
-            except IndexError:
-                print counter, self.is_prime(counter), pos
-
-    @staticmethod
-    def is_prime(number):
-        startprimes = {
-            0 : True,
-            1 : True,
-            2 : False,
-            3 : True,
-            4 : False,
-            5 : True,
-            6 : False,
-            7 : True,
-            8 : False,
-        }
-        if number < 9 :
-            return startprimes[number]
-        for i in range(2, int(math.sqrt(number)) + 1):
-            #print "testing %s %% %s = %s" % (number, i, number % i)
-            if number % i == 0:
-                return False
-        return True
-    
-    def spiral_walk(self, width):
-        pos = [int(width/2), int(width/2)]
-        vecs = [
-            (1, 0),
-            (0, -1),
-            (-1, 0),
-            (0, 1)
-        ]
-        counter = 0
-        for length in range(1, width):
-            for a in range(2):
-                direction = vecs[counter % 4]
-                for i in range(length):
-                    yield pos
-                    pos[0] += direction[0]
-                    pos[1] += direction[1]
-                counter += 1
+        width = min(self.surface.get_width(), self.surface.get_height())
+        max_counter = (width - 1) ** 2
+        numbers = numpy.flatnonzero(sieve(max_counter))
+        if self.layout == "ulam":
+            (x, y) = ulam_spiral(numbers)
+        elif self.layout == "sacks":
+            # largest number on border of square
+            (x, y) = sacks_spiral(numbers, (width - 1) / 2 / math.sqrt(max(max_counter, 1)))
+        else:
+            raise ValueError("unknown layout %s" % self.layout)
+        x += width // 2
+        y += width // 2
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < width)
+        pixels = pygame.surfarray.pixels2d(self.surface)
+        pixels[x[inside], y[inside]] = self.surface.map_rgb(self.color)
+        del pixels
 
     def update(self):
         pass
@@ -75,7 +103,7 @@ def main():
     clock = pygame.time.Clock()
     starttime = time.time()
     demo = PrimeSpiral(surface)
-    print "cacluated prime spiral in %f seconds" % (time.time() - starttime)
+    print("cacluated prime spiral in %f seconds" % (time.time() - starttime))
     while True:
         clock.tick(fps)
         events = pygame.event.get()  
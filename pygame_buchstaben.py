@@ -8,8 +8,10 @@ import random
 import string
 import os
 # from pygame.locals import *
+# own modules
+from GlyphAtlas import get_atlas
 
-CHARACTERS = list(string.letters)
+CHARACTERS = list(string.ascii_letters)
 # define screen size
 SCREEN = (640, 480)
 # control Frame Rate
@@ -20,7 +22,8 @@ BACKGROUND_MUSIC = "monkey_island_theme.mp3"
 # define some fonts
 pygame.font.init()
 TITLE_FONT = pygame.font.Font("atari full.ttf", 32) # title
-CHARACTER_FONT = pygame.font.Font(None, 48) # the falling characters
+CHARACTER_FONT = (None, 48, False) # the falling characters, from glyph atlas
+CHARACTER_COLOR = (10, 10, 10)
 SCORE_FONT = pygame.font.Font("atari full.ttf", 24) # score
 INFO_FONT = pygame.font.Font("atari full.ttf", 12) # other messages
 
@@ -45,7 +48,8 @@ class Character:
         """just __init__"""
         self.surface = surface
         self.character = character
-        self.text = CHARACTER_FONT.render(character, 1, (10, 10, 10))
+        # glyph is rendered only once into atlas, not for every character
+        self.atlas = get_atlas()
         self.posx = random.random() * surface.get_width()
         self.posy = 0
         self.speed = random.random()
@@ -74,16 +78,13 @@ class Character:
             self.character_engine.delete(self, clicked=False)
         # for debug only, draw red rectangle around charcter to show hitting area
         pygame.draw.rect(self.surface, (255, 0, 0), self.get_myrect(), 1)
-        self.surface.blit(self.text, (round(self.posx), round(self.posy)))
+        glyph = self.atlas.get_glyph(CHARACTER_FONT, CHARACTER_COLOR, self.character)
+        self.surface.blit(self.atlas.surface, (round(self.posx), round(self.posy)), glyph)
 
     def get_myrect(self):
         """return rect around itself"""
-        myrect = self.text.get_rect(center=(
-               round(self.posx) + \
-               self.text.get_width() / 2, \
-               round(self.posy) + \
-               self.text.get_height() / 2)
-               )
+        glyph = self.atlas.get_glyph(CHARACTER_FONT, CHARACTER_COLOR, self.character)
+        myrect = pygame.Rect((round(self.posx), round(self.posy)), glyph.size)
         return(myrect)
 
     def check_click(self, clickpos):
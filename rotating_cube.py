@@ -11,6 +11,7 @@ import numpy as np
 #from Matrix3d import Matrix3d as Matrix3d
 #from Utils3d import Utils3d as Utils3d
 import Utils3d
+import Transformer
 #from Polygon import Polygon as Polygon
 from Mesh import Mesh as Mesh
 
@@ -28,14 +29,16 @@ def test():
                 surface,
                 origin=(300, 300), 
                 transformations=
-                    Utils3d.get_rot_matrix(
+                    Transformer.RotationTransformer(
                         Utils3d.get_scale_rot_matrix(
                             scale_tuple=(600,600,1), 
                             aspect_tuple=(16, 9),
                             shift_tuple=(0, 0, -10)),
                         degrees=(1, 2, 3),
                         steps=360),
-                polygons = cube)
+                polygons = cube,
+                culling=True,
+                shading=True)
         )
         clock = pygame.time.Clock()       
         pause = False
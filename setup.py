@@ -18,6 +18,7 @@ extensions = [
     Extension("Polygon", ["src/Polygon.pyx"], extra_compile_args=extra_compile_args),
     Extension("Utils3d", ["src/Utils3d.pyx"], extra_compile_args=extra_compile_args),
     Extension("Mesh", ["src/Mesh.pyx"], extra_compile_args=extra_compile_args),
+    Extension("Transformer", ["src/Transformer.pyx"], extra_compile_args=extra_compile_args),
     Extension("Plasma", ["src/Plasma.pyx"], extra_compile_args=extra_compile_args),
     Extension("PlasmaPy", ["src/PlasmaPy.py"], extra_compile_args=extra_compile_args),
     Extension("PlasmaFractal", ["src/PlasmaFractal.pyx"], extra_compile_args=extra_compile_args),
@@ -26,8 +27,8 @@ extensions = [
     Extension("CoffeeBean", ["src/CoffeeBean.pyx"], extra_compile_args=extra_compile_args),
     Extension("SinusText", ["src/SinusText.pyx"], extra_compile_args=extra_compile_args),
     Extension("HilbertCurve", ["src/HilbertCurve.pyx"], extra_compile_args=extra_compile_args),
-    Extension("Fire", ["src/Fire.pyx"], extra_compile_args=extra_compile_args),
     Extension("PointC", ["src/PointC.pyx"], extra_compile_args=extra_compile_args),
+    Extension("Vector3h", ["src/Vector3h.pyx"], extra_compile_args=extra_compile_args),
 ]
 
 setup(
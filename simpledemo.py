@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/python3
 
 import pygame
 import sys
@@ -10,56 +10,50 @@ from Plasma import Plasma as Plasma
 from PlasmaFractal import PlasmaFractal as PlasmaFractal
 from CoffeeBean import CoffeeDraw as CoffeeDraw
 import Utils3d
+import Transformer
 from Mesh import Mesh as Mesh
+from Tree import Tree as Tree
+from Vec2d import Vec2d
+from Compositor import Compositor
 
 def test():
     try:
         fps = 50
         surface = pygame.display.set_mode((800, 600))
-        print pygame.display.Info()
+        print(pygame.display.Info())
         pygame.init()
-        things = (
-                {"start" : 0, "stop" : 10,
-                    "class" : SinusText(surface, "SimpleDemo by GunnerySergeant", 200, 20, 1, pygame.Color(0,255,255))},
-                {"start" : 10, "stop" : 20,
-                    "class" : SinusText(surface, "Start with some Plasma Effect", 200, 30, 2, pygame.Color(0,255,255)),},
-                {"start" : 20, "stop": 30,
-                    "class" : Plasma(surface, scale=4),},
-                {"start" : 30, "stop" : 40,
-                    "class" : SinusText(surface, "a nice PlasmaFractal Effect", 200, 30, 2, pygame.Color(0,255,255)),},
-                {"start" : 40, "stop": 50,
-                    "class" : PlasmaFractal(surface, scale=4),},
-                {"start" : 50, "stop" : 60,
-                    "class" : SinusText(surface, "some sice coffeebean graphics, don't know why its so called, do you?", 200, 30, 2, pygame.Color(0,255,255)),},
-                {"start" : 70, "stop" : 80,
-                    "class" : CoffeeDraw(surface),},
-                {"start" : 90, "stop" : 100,
-                    "class" : SinusText(surface, "no demo without rotating cubes ...", 200, 20, 2, pygame.Color(0,128,255)),},
-                {"start" : 90, "stop" : 100,
-                    "class" : SinusText(surface, "no demo without rotating cubes ...", 190, 30, 4, pygame.Color(0,128,255)),},
-                {"start" : 100, "stop": 110,
-                    "class" :
-                    Mesh(
-                        surface,
-                        origin=(300, 300), 
-                        transformations=
-                            Utils3d.get_rot_matrix(
-                                Utils3d.get_scale_rot_matrix(
-                                    scale_tuple=(600,600,1), 
-                                    aspect_tuple=(16, 9),
-                                    shift_tuple=(0, 0, -10)),
-                                degrees=(1, 2, 3),
-                                steps=360),
-                        polygons = Utils3d.get_cube_polygons())},
-                {"start" : 109, "stop" : 120,
-                "class" : SinusText(surface, "greetings to all, who are better demomakers than i", 200, 30, 2, pygame.Color(0,255,255)),},
-         
-            )
-        clock = pygame.time.Clock()       
-        # mark pause state 
+        compositor = Compositor(surface)
+        compositor.add(SinusText(surface, "SimpleDemo by GunnerySergeant", 200, 20, 1, pygame.Color(0,255,255)), start=0, stop=10)
+        compositor.add(SinusText(surface, "Start with some Plasma Effect", 200, 30, 2, pygame.Color(0,255,255)), start=10, stop=20)
+        compositor.add(Plasma(surface, scale=4), start=20, stop=30)
+        compositor.add(SinusText(surface, "a nice PlasmaFractal Effect", 200, 30, 2, pygame.Color(0,255,255)), start=30, stop=40)
+        compositor.add(PlasmaFractal(surface, scale=4), start=40, stop=50)
+        compositor.add(SinusText(surface, "some sice coffeebean graphics, don't know why its so called, do you?", 200, 30, 2, pygame.Color(0,255,255)), start=50, stop=60)
+        compositor.add(CoffeeDraw(surface), start=70, stop=80)
+        compositor.add(SinusText(surface, "no demo without rotating cubes ...", 200, 20, 2, pygame.Color(0,128,255)), start=90, stop=100)
+        compositor.add(SinusText(surface, "no demo without rotating cubes ...", 190, 30, 4, pygame.Color(0,128,255)), start=90, stop=100)
+        compositor.add(
+            Mesh(
+                surface,
+                origin=(300, 300),
+                transformations=
+                    Transformer.RotationTransformer(
+                        Utils3d.get_scale_rot_matrix(
+                            scale_tuple=(600,600,1),
+                            aspect_tuple=(16, 9),
+                            shift_tuple=(0, 0, -10)),
+                        degrees=(1, 2, 3),
+                        steps=360),
+                polygons = Utils3d.get_cube_polygons(),
+                culling=True,
+                shading=True),
+            start=100, stop=110)
+        # tree does not move, is drawn once into background
+        compositor.add(Tree(surface, pygame.Color(0, 100, 100), Vec2d(400, 590), 6, 150), static=True, start=109, stop=120)
+        compositor.add(SinusText(surface, "greetings to all, who are better demomakers than i", 200, 30, 2, pygame.Color(0,255,255)), start=109, stop=120)
+        clock = pygame.time.Clock()
+        # mark pause state
         pause = False
-        # fill background
-        surface.fill((0, 0, 0, 255))
         running = True
         frames = 0
         starttime = time.time()
@@ -67,29 +61,25 @@ def test():
             # limit to FPS
             clock.tick(fps)
             # Event Handling
-            events = pygame.event.get()  
-            for event in events:  
-                if event.type == pygame.QUIT:  
+            events = pygame.event.get()
+            for event in events:
+                if event.type == pygame.QUIT:
                     running = False
             keyinput = pygame.key.get_pressed()
             if keyinput is not None:
                 # print keyinput
                 if keyinput[pygame.K_ESCAPE]:
                     running = False
-            runtime = int(time.time() - starttime)
-            # Update Graphics
+            runtime = time.time() - starttime
+            # Update Graphics, only changed parts of screen are pushed
             if pause is not True:
-                surface.fill((0, 0, 0, 255))
-                for thing in things:
-                    if thing["start"] < runtime < thing["stop"]:
-                        thing["class"].update()
-                pygame.display.update()
-                # pygame.display.flip()
+                compositor.update(runtime)
             frames += 1
         duration = time.time() - starttime
-        print "Done %s frames in %s seconds, %s frames/s" % (frames, duration, frames/duration)
+        print("Done %s frames in %s seconds, %s frames/s" % (frames, duration, frames/duration))
+        print("%f of screen updated per frame" % (compositor.pixels / compositor.frames / (surface.get_width() * surface.get_height())))
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 if __name__ == "__main__":
     test()
@@ -4,9 +4,15 @@ import pygame
 import sys
 import math
 from SinusText import SinusText as SinusText
+# own modules
+from GlyphAtlas import TextLine
 
 class SinusTextPy(object):
-    """Sinus wave scroll text"""
+    """Sinus wave scroll text
+
+    glyphs of visible window are blitted from shared glyph atlas
+    into window surface, columns are blitted from there
+    """
 
     def __init__(self, surface, text, hpos, amplitude, frequency, color, size=30):
         """
@@ -20,7 +26,7 @@ class SinusTextPy(object):
         """
         self.surface = surface
         # prepend an append some spaces
-        appendix = " " * (self.surface.get_width() / size)
+        appendix = " " * (self.surface.get_width() // size)
         self.text = appendix + text + appendix
         self.hpos = hpos
         self.amplitude = amplitude
@@ -28,8 +34,8 @@ class SinusTextPy(object):
         self.color = color
         self.size = size
         # initialize
-        self.font = None
-        self.text_surface = None
+        self.line = None
+        self.window = None
         self.initialize()
         # position in rendered string
         self.position = 0
@@ -38,8 +44,8 @@ class SinusTextPy(object):
 
     def initialize(self):
         """generate initial position"""
-        self.font = pygame.font.SysFont("mono", self.size, bold=True)
-        self.text_surface = self.font.render(self.text, True, self.color)
+        self.line = TextLine(self.text, ("mono", self.size, True), self.color)
+        self.window = pygame.Surface((self.surface.get_width(), self.line.height), pygame.SRCALPHA, self.line.atlas.surface)
 
     def update(self, hpos=None):
         """
@@ -48,13 +54,16 @@ class SinusTextPy(object):
         """
         if hpos is not None:
             self.hpos = hpos
-        for offset in range(self.text_surface.get_width()):
+        visible = min(self.window.get_width(), self.line.width - self.position)
+        self.window.fill((0, 0, 0, 0))
+        self.line.draw(self.window, (0, 0), self.position, visible, special_flags=pygame.BLEND_RGBA_MAX)
+        for offset in range(visible):
             self.surface.blit( \
-                self.text_surface, \
+                self.window, \
                 (0 + offset, self.hpos + math.sin(offset * self.frequency * self.factor) * self.amplitude), \
-                (self.position + offset, 0, 1, self.size) \
+                (offset, 0, 1, self.size) \
             )
-        if self.position < self.text_surface.get_width():
+        if self.position < self.line.width:
             self.position += 1
         else:
             self.position = 0
@@ -86,7 +95,7 @@ def test():
                     thing.update(hpos=None)
                 pygame.display.flip()
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 if __name__ == '__main__':
     test()
@@ -2,106 +2,135 @@
 
 import sys
 import pygame
-import math
-import array
+import numpy as np
+
+# vertices of curves by (iteration, length)
+CURVES = {}
+
+
+def hilbert_points(int iteration):
+    """
+    grid coordinates of all 4 ** iteration points of hilbert curve,
+    index to coordinate mapping with bit manipulation, for all
+    indices at once, one loop per iteration
+    """
+    cdef int size = 1 << iteration
+    cdef int step = 1
+    index = np.arange(size * size, dtype=np.int32)
+    x = np.zeros_like(index)
+    y = np.zeros_like(index)
+    while step < size:
+        # quadrant of every point at this level
+        rx = 1 & (index >> 1)
+        ry = 1 & (index ^ rx)
+        # lower quadrants are rotated, right one is flipped,
+        # step - 1 - x is x ^ (step - 1) for x below step
+        swap = ry ^ 1
+        flip = (step - 1) * (swap & rx)
+        x ^= flip
+        y ^= flip
+        # swap x and y with xor
+        flip = (x ^ y) * swap
+        x ^= flip
+        y ^= flip
+        x += step * rx
+        y += step * ry
+        index >>= 2
+        step <<= 1
+    return np.column_stack((x, y))
+
+
+def get_curve(int iteration, int length):
+    """
+    vertices of curve relative to its start, lines have length,
+    curve starts to the left and down like the old turtle graphics
+    """
+    key = (iteration, length)
+    vertices = CURVES.get(key)
+    if vertices is None:
+        vertices = CURVES[key] = hilbert_points(iteration) * (-length, length)
+    return vertices
+
 
 cdef class HilbertCurve(object):
-    """Basic Hilbert Curve Algorithm"""
+    """Basic Hilbert Curve Algorithm
+
+    vertices are calculated once without recursion, see get_curve,
+    and drawn into an offscreen surface, every frame this surface is
+    blitted. with speed the curve grows, and only the new lines of
+    every frame are drawn
+    """
 
     cdef object surface
     cdef int iteration
     cdef int length
     cdef tuple pos
     cdef object color
-    cdef int angle
-    cdef float deg2rad
-    cdef object sin
-    cdef object cos
+    cdef public int speed
+    cdef object vertices
+    cdef int drawn
+    cdef object baked
+    cdef object rect
 
-    def __init__(self, surface, int iteration=6, int length=6):
+    def __init__(self, surface, int iteration=6, int length=6, int speed=0):
+        """
+        (pygame.Surface) surface - surface to draw on
+        (int) iteration - which iteration of the Hilbert curve to draw
+        (int) length - length of each line in the Hilbert curve
+        (int) speed - lines added per frame, 0 to draw whole curve at once
+        """
         self.surface = surface
-        # Which iteration of the Hilbert curve to draw
         self.iteration = iteration
-        # Length of each line in the Hilbert curve
         self.length = length
         self.pos = (self.surface.get_width() - 10, 10)
         self.color = pygame.Color(238, 255, 0)
-        self.angle = 1
-        self.deg2rad = math.pi / 180
-        self.sin = array.array("f", [0.0] * 361)
-        self.cos = array.array("f", [0.0] * 361)
-        self.initialize()
-
-    cdef initialize(self):
-        deg2rad = math.pi / 180
-        for degree in range(361):
-            rad = degree * deg2rad
-            self.sin[degree] = math.sin(rad)
-            self.cos[degree] = math.cos(rad)
-
-    cdef forward(self, int distance):
-        dest = (self.pos[0] + self.cos[self.angle] * (-distance), self.pos[1] + self.sin[self.angle] * (-distance))
-        pygame.draw.line(self.surface, self.color, self.pos, dest)
-        self.pos = dest
-
-    cdef right(self, int angle):
-        self.angle -= angle
-        if self.angle < 0:
-            self.angle += 360
-        elif self.angle > 360:
-            self.angle -= 360
-
-    cdef left(self, int angle):
-        self.right(-angle)
-
-    cdef leftHilbert(self, int l, int w):
-        if l == 0:
-            return
-        self.right(90)
-        self.rightHilbert(l - 1, w)
-        self.forward(w)
-        self.left(90)
-        self.leftHilbert(l - 1, w)
-        self.forward(w)
-        self.leftHilbert(l - 1, w)
-        self.left(90)
-        self.forward(w)
-        self.rightHilbert(l - 1, w)
-        self.right(90)
-
-    cdef rightHilbert(self, int l, int w):
-        if l == 0:
-            return
-        self.left(90)
-        self.leftHilbert(l - 1, w)
-        self.forward(w)
-        self.right(90)
-        self.rightHilbert(l - 1, w)
-        self.forward(w)
-        self.rightHilbert(l - 1, w)
-        self.right(90)
-        self.forward(w)
-        self.leftHilbert(l - 1, w)
-        self.left(90)
+        self.speed = speed
+        # draw.lines takes the array as it is, faster than a list
+        self.vertices = get_curve(iteration, length) + self.pos
+        # bounding box of curve on surface, only this part is blitted
+        self.rect = pygame.Rect(self.vertices.min(axis=0).tolist(), (np.ptp(self.vertices, axis=0) + 1).tolist()).clip(self.surface.get_rect())
+        # curve on transparent offscreen surface
+        self.baked = pygame.Surface(self.surface.get_size(), 0, self.surface)
+        self.baked.set_colorkey((0, 0, 0))
+        self.restart()
+
+    cpdef restart(self):
+        """start drawing curve again"""
+        self.baked.fill((0, 0, 0))
+        self.drawn = 1
+        if self.speed == 0:
+            self.grow(len(self.vertices))
+
+    cpdef grow(self, int lines):
+        """draw next lines of curve into offscreen surface"""
+        cdef int end = min(self.drawn + lines, len(self.vertices))
+        if end > self.drawn:
+            # start at last drawn vertex, to continue the polyline
+            pygame.draw.lines(self.baked, self.color, False, self.vertices[self.drawn - 1:end])
+            self.drawn = end
 
     cpdef update(self):
-        self.leftHilbert(self.iteration, self.length)
+        """blit curve, returns rect drawn to"""
+        if self.drawn < len(self.vertices):
+            self.grow(self.speed)
+        return self.surface.blit(self.baked, self.rect, self.rect)
 
 
 def test():
     """ test """
-    fps = 1
+    fps = 30
     surface = pygame.display.set_mode((600, 400))
     pygame.init()
     clock = pygame.time.Clock()
-    coffee_draw = HilbertCurve(surface)
+    coffee_draw = HilbertCurve(surface, iteration=8, length=2, speed=64)
     while True:
         clock.tick(fps)
-        events = pygame.event.get()  
-        for event in events:  
-            if event.type == pygame.QUIT:  
+        events = pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT:
                 sys.exit(0)
         pygame.display.set_caption("frame rate: %.2f frames per second" % clock.get_fps())
+        surface.fill((0, 0, 0))
         coffee_draw.update()
         pygame.display.update()
 
@@ -2,87 +2,404 @@
 #
 
 import sys
+import os
+import math
+import collections
 import pygame
+import concurrent.futures
 import numpy as np
 cimport numpy as np
+cimport cython
+from libc.math cimport log
+
+# squared escape radius, large enough for smooth escape time
+DEF BAILOUT = 256.0
+DEF LOG2 = 0.6931471805599453
+
+
+cdef inline double escape(double cx, double cy, int itermax) noexcept nogil:
+    """smooth escape time of one point, itermax if inside the set"""
+    cdef double x = cx
+    cdef double y = cy
+    cdef double x2 = x * x
+    cdef double y2 = y * y
+    cdef double smooth
+    cdef int iteration = 0
+    while (iteration < itermax) and (x2 + y2 < BAILOUT):
+        y = 2.0 * x * y + cy
+        x = x2 - y2 + cx
+        x2 = x * x
+        y2 = y * y
+        iteration += 1
+    if iteration == itermax:
+        return(itermax)
+    # continuous escape time, n + 1 - log2(log(|z|))
+    smooth = iteration + 1 - log(0.5 * log(x2 + y2)) / LOG2
+    return(min(max(smooth, 0.0), itermax))
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline double point(double[:, ::1] values, double left, double bottom, double stepx, double stepy, int hx, int hy, int itermax) noexcept nogil:
+    """escape time of one pixel, only calculated once"""
+    if values[hx, hy] < 0:
+        values[hx, hy] = escape(left + hx * stepx, bottom + hy * stepy, itermax)
+    return(values[hx, hy])
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void trace(double[:, ::1] values, double left, double bottom, double stepx, double stepy, int x0, int y0, int x1, int y1, int itermax) noexcept nogil:
+    """
+    border tracing of rectangle x0, y0 to x1, y1 (inclusive),
+    if every pixel on the border has the same integer escape time, the
+    inside is filled with the smooth value of the first corner without
+    calculation, so shading there is off by less than one iteration.
+    otherwise the rectangle is split in four parts. small rectangles
+    are calculated pixel by pixel
+    """
+    cdef double value = point(values, left, bottom, stepx, stepy, x0, y0, itermax)
+    # smooth values are continuous, compare the iteration count only
+    cdef int first = <int>value
+    cdef bint uniform = True
+    cdef int hx, hy, mx, my
+    for hx in range(x0, x1 + 1):
+        if <int>point(values, left, bottom, stepx, stepy, hx, y0, itermax) != first:
+            uniform = False
+        if <int>point(values, left, bottom, stepx, stepy, hx, y1, itermax) != first:
+            uniform = False
+    for hy in range(y0, y1 + 1):
+        if <int>point(values, left, bottom, stepx, stepy, x0, hy, itermax) != first:
+            uniform = False
+        if <int>point(values, left, bottom, stepx, stepy, x1, hy, itermax) != first:
+            uniform = False
+    if uniform:
+        for hx in range(x0 + 1, x1):
+            for hy in range(y0 + 1, y1):
+                values[hx, hy] = value
+    elif (x1 - x0 < 8) or (y1 - y0 < 8):
+        for hx in range(x0 + 1, x1):
+            for hy in range(y0 + 1, y1):
+                point(values, left, bottom, stepx, stepy, hx, hy, itermax)
+    else:
+        # four parts, sharing their borders
+        mx = (x0 + x1) // 2
+        my = (y0 + y1) // 2
+        trace(values, left, bottom, stepx, stepy, x0, y0, mx, my, itermax)
+        trace(values, left, bottom, stepx, stepy, mx, y0, x1, my, itermax)
+        trace(values, left, bottom, stepx, stepy, x0, my, mx, y1, itermax)
+        trace(values, left, bottom, stepx, stepy, mx, my, x1, y1, itermax)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef np.ndarray calculate_tile(double left, double bottom, double stepx, double stepy, int width, int height, int itermax=255, bint border_tracing=False):
+    """
+    calculate smooth escape time of every pixel of one tile,
+    pixel 0, 0 is at left, bottom
+
+    returns (width x height) float64 array, values between 0 and itermax,
+    points inside the set get itermax.
+    with border_tracing regions with the same integer escape time on
+    their border are filled without calculation, with shading off by
+    less than one iteration, this may miss very thin filaments.
+    the GIL is released while calculating, so tiles run
+    in parallel on a thread pool
+    """
+    cdef np.ndarray tile
+    cdef double[:, ::1] values
+    cdef int hx, hy
+    if border_tracing:
+        # negative values mark pixels not calculated yet
+        tile = np.full((width, height), -1.0, dtype=np.float64)
+        values = tile
+        with nogil:
+            trace(values, left, bottom, stepx, stepy, 0, 0, width - 1, height - 1, itermax)
+        return(tile)
+    tile = np.empty((width, height), dtype=np.float64)
+    values = tile
+    with nogil:
+        for hx in range(width):
+            for hy in range(height):
+                values[hx, hy] = escape(left + hx * stepx, bottom + hy * stepy, itermax)
+    return(tile)
+
 
 cdef class Mandelbrot(object):
-    """Clasical Mandelbrot Function, realy slow on python, so have some patience"""
+    """Clasical Mandelbrot Function, tiled and multi threaded
+
+    the viewport is split in tiles, which are calculated on a pool
+    of threads. every finished tile is streamed into the pixel buffer
+    on the next update, so the image builds up while calculating
+    """
 
     cdef object surface
     cdef int width
     cdef int height
+    cdef int itermax
+    cdef public int tile_size
     cdef np.ndarray array2d
+    cdef np.ndarray palette
+    cdef object pool
+    cdef list pending
 
-    def __init__(self, surface):
+    def __init__(self, surface, int tile_size=64, int threads=0):
         """
         (pygame.Surface) surface - surface to draw on
+        (int) tile_size - width and height of tiles in pixel
+        (int) threads - size of thread pool, 0 for number of cpus
         """
         self.surface = surface
         # set some values
         self.width = self.surface.get_width()
         self.height = self.surface.get_height()
+        self.tile_size = tile_size
         self.array2d = pygame.surfarray.array2d(self.surface)
+        self.pool = concurrent.futures.ThreadPoolExecutor(threads or os.cpu_count())
+        self.pending = []
         self.initialize()
-        print "done" 
 
-    cdef initialize(self, float left=-2.1, float right=0.7, float bottom=-1.2, float top=1.2, int maxiter=30):
+    cpdef initialize(self, double left=-2.1, double right=0.7, double bottom=-1.2, double top=1.2, int itermax=255):
+        """
+        start calculation of region, every tile is one job on the pool,
+        tiles of previous regions which are not started yet are cancelled
+        """
+        cdef double stepx = (right - left) / self.width
+        cdef double stepy = (top - bottom) / self.height
+        cdef int hx, hy, tile_width, tile_height
+        for future in self.pending:
+            future.cancel()
+        self.pending = []
+        self.itermax = itermax
+        # grey palette, one entry for every iteration
+        self.palette = np.array([self.surface.map_rgb((value, value, value)) for value in range(256)], dtype=np.uint32)
+        for hx in range(0, self.width, self.tile_size):
+            tile_width = min(self.tile_size, self.width - hx)
+            for hy in range(0, self.height, self.tile_size):
+                tile_height = min(self.tile_size, self.height - hy)
+                future = self.pool.submit(calculate_tile, left + hx * stepx, bottom + hy * stepy, stepx, stepy, tile_width, tile_height, itermax)
+                self.pending.append((hx, hy, future))
+
+    cpdef bint stream(self):
         """
-        initialize pixelarray with color value,
-        classical approach, really, really slow
+        copy every finished tile into pixel buffer,
+        return True if all tiles are done
         """
-        cdef float x, xx, y, cx, cy, betrag, x2, y2
-        cdef int interation, hx, hy
-        cdef int itermax
-        cdef float magnify
-        cdef float stepy
-        cdef float stepx
-        cdef int color
-        x = xx = y = cx = cy = betrag = x2 = y2 = 0.0
-        iteration = hx = hy = 0
-        itermax = 255		# how many iterations to do
-        magnify=1.0		# no magnification
-        stepy = (top - bottom) / self.height
-        stepx = (right - left) / self.width
-        cy = bottom
-        for hy in xrange(self.height):
-            cx = left
-            for hx in xrange(self.width):
-                x = cx
-                y = cy
-                iteration = 0
-                betrag = 0.0 
-                while (iteration < itermax) and (betrag < maxiter):
-                    x2 = x * x
-                    y2 = y * y
-                    betrag = x2 + y2
-                    xx = x2 - y2 + cx
-                    y = 2.0 * x * y + cy
-                    x = xx
-                    iteration += 1
-                color = (iteration << 16) + (iteration << 8) + iteration
-                # color = pygame.Color(iteration, iteration, iteration)
-                self.array2d[hx][hy] = color
-                cx = cx + stepx
-            cy = cy + stepy
+        cdef list pending = []
+        cdef np.ndarray tile
+        for (hx, hy, future) in self.pending:
+            if not future.done():
+                pending.append((hx, hy, future))
+                continue
+            tile = future.result()
+            self.array2d[hx:hx + tile.shape[0], hy:hy + tile.shape[1]] = \
+                self.palette[(tile * (255.0 / self.itermax)).astype(np.intp)]
+        self.pending = pending
+        return(len(self.pending) == 0)
+
+    cpdef wait(self):
+        """block until all tiles are calculated"""
+        concurrent.futures.wait([future for (hx, hy, future) in self.pending])
+        self.stream()
 
     cpdef update(self):
-        """blit pixelarray to surface"""
+        """stream finished tiles and blit pixelarray to surface"""
+        self.stream()
         pygame.surfarray.blit_array(self.surface, self.array2d)
 
+cdef class MandelbrotZoom(object):
+    """Mandelbrot with interactive zoom and pan
+
+    the plane is covered by a grid of tiles for every level, at level 0
+    one tile covers 4 x 4 units, every level halves the size of a tile.
+    calculated tiles are kept in a LRU cache keyed by (level, tile_x, tile_y),
+    so moving the view only calculates newly exposed tiles.
+    tiles not calculated yet are drawn from a coarser cached level
+    first and refined in later frames, as soon as they are finished
+    on the thread pool. tiles are calculated with border tracing.
+    """
+
+    cdef object surface
+    cdef int width
+    cdef int height
+    cdef public int tile_size
+    cdef public int itermax
+    cdef public int cache_size
+    cdef public int coarse_levels
+    cdef public double center_x
+    cdef public double center_y
+    cdef public double scale
+    cdef np.ndarray palette
+    cdef object pool
+    cdef object cache
+    cdef dict pending
+
+    def __init__(self, surface, tuple center=(-0.7, 0.0), double scale=0.0, int tile_size=64, int threads=0, int cache_size=256, int itermax=255):
+        """
+        (pygame.Surface) surface - surface to draw on
+        (tuple) center - point of plane in the middle of surface
+        (float) scale - units of plane per pixel, 0 to fit the whole set
+        (int) tile_size - width and height of tiles in pixel
+        (int) threads - size of thread pool, 0 for number of cpus
+        (int) cache_size - how many tiles to keep, at least all tiles of one view
+        (int) itermax - maximum number of iterations
+        """
+        cdef int fine_x, fine_y, coarse
+        self.surface = surface
+        self.width = self.surface.get_width()
+        self.height = self.surface.get_height()
+        self.tile_size = tile_size
+        self.itermax = itermax
+        # missing tiles are drawn from up to this many levels above
+        self.coarse_levels = 3
+        # a screen pixel covers up to two tile pixels, see get_level, the
+        # cache holds at least all fine and coarse tiles of one view
+        fine_x = 2 * self.width // tile_size + 2
+        fine_y = 2 * self.height // tile_size + 2
+        coarse = ((fine_x >> self.coarse_levels) + 2) * ((fine_y >> self.coarse_levels) + 2)
+        self.cache_size = max(cache_size, fine_x * fine_y + coarse)
+        (self.center_x, self.center_y) = center
+        self.scale = scale or 2.8 / self.width
+        self.palette = np.array([self.surface.map_rgb((value, value, value)) for value in range(256)], dtype=np.uint32)
+        self.pool = concurrent.futures.ThreadPoolExecutor(threads or os.cpu_count())
+        self.cache = collections.OrderedDict()
+        self.pending = {}
+
+    cpdef zoom(self, double factor, double x=-1, double y=-1):
+        """
+        zoom in by factor, values below 1 zoom out,
+        the point of plane at pixel x, y stays in place,
+        default is the middle of surface
+        """
+        if x < 0:
+            x = self.width / 2
+        if y < 0:
+            y = self.height / 2
+        self.center_x += (x - self.width / 2) * self.scale * (1 - 1 / factor)
+        self.center_y += (y - self.height / 2) * self.scale * (1 - 1 / factor)
+        self.scale /= factor
+
+    cpdef pan(self, double dx, double dy):
+        """move view by dx, dy pixels"""
+        self.center_x += dx * self.scale
+        self.center_y += dy * self.scale
+
+    cpdef int get_level(self):
+        """level with tile pixels at least as small as screen pixels"""
+        return(max(0, int(math.ceil(math.log2(4.0 / self.tile_size / self.scale)))))
+
+    cpdef np.ndarray get_tile(self, int level, int tile_x, int tile_y):
+        """
+        return tile from cache, or None if not calculated yet,
+        in this case calculation is started on the pool
+        """
+        cdef tuple key = (level, tile_x, tile_y)
+        cdef double step
+        try:
+            tile = self.cache[key]
+            self.cache.move_to_end(key)
+            return(tile)
+        except KeyError:
+            pass
+        if key not in self.pending:
+            step = 4.0 / self.tile_size / 2 ** level
+            self.pending[key] = self.pool.submit(calculate_tile,
+                tile_x * self.tile_size * step, tile_y * self.tile_size * step,
+                step, step, self.tile_size, self.tile_size, self.itermax, True)
+        return(None)
+
+    cpdef np.ndarray get_coarse_tile(self, int level, int tile_x, int tile_y):
+        """
+        return tile upscaled from the nearest cached coarser level,
+        or None if there is none
+        """
+        cdef int coarse, shift, size, offset_x, offset_y
+        cdef np.ndarray tile
+        for shift in range(1, min(level, self.coarse_levels) + 1):
+            size = self.tile_size >> shift
+            if size == 0:
+                break
+            coarse = level - shift
+            tile = self.cache.get((coarse, tile_x >> shift, tile_y >> shift))
+            if tile is not None:
+                offset_x = (tile_x - ((tile_x >> shift) << shift)) * size
+                offset_y = (tile_y - ((tile_y >> shift) << shift)) * size
+                tile = tile[offset_x:offset_x + size, offset_y:offset_y + size]
+                return(tile.repeat(1 << shift, axis=0).repeat(1 << shift, axis=1))
+        return(None)
+
+    cpdef stream(self):
+        """move finished tiles into cache"""
+        for key in [key for (key, future) in self.pending.items() if future.done()]:
+            future = self.pending.pop(key)
+            if not future.cancelled():
+                self.cache[key] = future.result()
+
+    cpdef evict(self, set wanted):
+        """drop least recently used tiles above cache_size, except wanted ones"""
+        cdef int excess = len(self.cache) - self.cache_size
+        if excess > 0:
+            for key in [key for key in self.cache if key not in wanted][:excess]:
+                del self.cache[key]
+
+    cpdef update(self):
+        """draw visible area from tiles, request missing ones"""
+        cdef int level = self.get_level()
+        cdef double step = 4.0 / self.tile_size / 2 ** level
+        cdef int tile_size = self.tile_size
+        cdef np.ndarray gx, gy, mosaic, tile
+        cdef int tx0, ty0, tx1, ty1, tx, ty
+        cdef set wanted = set()
+        self.stream()
+        # position of every screen pixel in pixels of level
+        gx = np.floor((self.center_x + (np.arange(self.width) - self.width / 2) * self.scale) / step).astype(np.int64)
+        gy = np.floor((self.center_y + (np.arange(self.height) - self.height / 2) * self.scale) / step).astype(np.int64)
+        tx0 = gx[0] // tile_size
+        ty0 = gy[0] // tile_size
+        tx1 = gx[-1] // tile_size
+        ty1 = gy[-1] // tile_size
+        mosaic = np.zeros(((tx1 - tx0 + 1) * tile_size, (ty1 - ty0 + 1) * tile_size), dtype=np.float64)
+        if level > self.coarse_levels:
+            # request coarse tiles of whole view first, the pool works in order
+            for tx in range(tx0 >> self.coarse_levels, (tx1 >> self.coarse_levels) + 1):
+                for ty in range(ty0 >> self.coarse_levels, (ty1 >> self.coarse_levels) + 1):
+                    wanted.add((level - self.coarse_levels, tx, ty))
+                    self.get_tile(level - self.coarse_levels, tx, ty)
+        for tx in range(tx0, tx1 + 1):
+            for ty in range(ty0, ty1 + 1):
+                wanted.add((level, tx, ty))
+                tile = self.get_tile(level, tx, ty)
+                if tile is None:
+                    tile = self.get_coarse_tile(level, tx, ty)
+                if tile is not None:
+                    mosaic[(tx - tx0) * tile_size:(tx - tx0 + 1) * tile_size, (ty - ty0) * tile_size:(ty - ty0 + 1) * tile_size] = tile
+        # tiles out of view are not needed any more, if not started yet
+        for key in list(self.pending.keys()):
+            if key not in wanted and self.pending[key].cancel():
+                del self.pending[key]
+        self.evict(wanted)
+        gx -= tx0 * tile_size
+        gy -= ty0 * tile_size
+        mosaic = mosaic[gx[:, np.newaxis], gy[np.newaxis, :]]
+        mosaic *= 255.0 / self.itermax
+        pixels2d = pygame.surfarray.pixels2d(self.surface)
+        np.take(self.palette, mosaic.astype(np.intp), out=pixels2d, mode="clip")
+        del pixels2d
+
+
 def test():
     try:
         fps = 1
         surface = pygame.display.set_mode((800, 600))
         pygame.init()
         mandelbrot = Mandelbrot(surface)
-        clock = pygame.time.Clock()       
+        clock = pygame.time.Clock()
         pause = False
         while True:
             clock.tick(fps)
-            events = pygame.event.get()  
-            for event in events:  
-                if event.type == pygame.QUIT:  
+            events = pygame.event.get()
+            for event in events:
+                if event.type == pygame.QUIT:
                     sys.exit(0)
             keyinput = pygame.key.get_pressed()
             if keyinput is not None:
@@ -93,7 +410,40 @@ def test():
                 mandelbrot.update()
                 pygame.display.flip()
     except KeyboardInterrupt:
-        print 'shutting down'
+        print("shutting down")
+
+
+def test_zoom():
+    """continuous zoom into seahorse valley, arrow keys to pan"""
+    try:
+        fps = 30
+        surface = pygame.display.set_mode((800, 600))
+        pygame.init()
+        mandelbrot = MandelbrotZoom(surface, center=(-0.743643887037151, 0.13182590420533))
+        clock = pygame.time.Clock()
+        while True:
+            clock.tick(fps)
+            events = pygame.event.get()
+            for event in events:
+                if event.type == pygame.QUIT:
+                    sys.exit(0)
+            keyinput = pygame.key.get_pressed()
+            if keyinput is not None:
+                if keyinput[pygame.K_ESCAPE]:
+                    sys.exit(1)
+                if keyinput[pygame.K_LEFT]:
+                    mandelbrot.pan(-10, 0)
+                if keyinput[pygame.K_RIGHT]:
+                    mandelbrot.pan(10, 0)
+                if keyinput[pygame.K_UP]:
+                    mandelbrot.pan(0, -10)
+                if keyinput[pygame.K_DOWN]:
+                    mandelbrot.pan(0, 10)
+            mandelbrot.zoom(1.02)
+            mandelbrot.update()
+            pygame.display.flip()
+    except KeyboardInterrupt:
+        print("shutting down")
 
 
 if __name__ == '__main__':
@@ -9,7 +9,18 @@ ctypedef np.float64_t DTYPE_t
 import Utils3d
 
 cdef class Mesh(object):
-    """abstract class to represent mesh of polygons"""
+    """abstract class to represent mesh of polygons
+
+    polygons are packed into one (n x 4) array of vertices and an
+    index buffer of faces, so every frame needs only one matrix
+    multiplication and one projection for all vertices, shared
+    vertices are transformed only once
+
+    visible surface stage, every step vectorized over all faces
+    back faces are culled with precomputed face normals,
+    remaining faces are sorted from far to near (painter's algorithm)
+    and flat shaded by angle to light source
+    """
 
     cdef object surface
     cdef int origin_x
@@ -17,23 +28,67 @@ cdef class Mesh(object):
     cdef tuple origin
     cdef int frames
     cdef int len_transformations
-    cdef list transformations
+    cdef object transformations
     cdef list polygons
     cdef np.ndarray shift_vec
+    cdef np.ndarray vertices
+    cdef np.ndarray faces
+    cdef np.ndarray center_faces
+    cdef np.ndarray normals
+    cdef public double fov
+    cdef public double viewer_distance
+    cdef public bint culling
+    cdef public bint shading
+    cdef public np.ndarray light_position
 
-    def __init__(self, surface, tuple origin, transformations=None, polygons=None):
+    def __init__(self, surface, tuple origin, transformations=None, polygons=None, double fov=0.8, double viewer_distance=1, bint culling=False, bint shading=False):
         """
         pygame surface to draw on
         center positon of mesh in 2d space
+        transformations - one matrix per frame, anything with len() and
+        indexing, list or (steps x 4 x 4) ndarray of precalculated matrices
+        or lazy Transformer.RotationTransformer
+        fov and viewer_distance for perspective projection
+        culling - do not draw faces pointing away from viewer
+        shading - fill faces with color from angle to light source,
+        otherwise draw wireframe
         """
         self.surface = surface
         (self.origin_x, self.origin_y) = origin
         self.frames = 0
-        # initialze list of transformations applied to every face
+        # initialze source of transformations applied to every face
         self.transformations = transformations
         self.len_transformations = len(transformations)
         # initialize list of polygons for this mesh
         self.polygons = polygons
+        (self.vertices, self.faces) = Utils3d.pack_polygons(polygons)
+        # closed polygons repeat the first vertex at the end,
+        # use every vertex only once to get center of face
+        if np.all(self.faces[:, 0] == self.faces[:, -1]):
+            self.center_faces = self.faces[:, :-1]
+        else:
+            self.center_faces = self.faces
+        self.normals = self.initialize_normals()
+        self.fov = fov
+        self.viewer_distance = viewer_distance
+        self.culling = culling
+        self.shading = shading
+        # light from above
+        self.light_position = np.array((0.0, 0.0, 10.0))
+
+    cdef np.ndarray initialize_normals(self):
+        """
+        precalculate normal of every face in object space
+        normals are flipped to point away from the center of the mesh,
+        because polygons like Utils3d.get_cube_polygons have no
+        consistent vertex order. works for closed, convex meshes
+        """
+        cdef np.ndarray normals
+        cdef np.ndarray outward
+        normals = np.array([polygon.get_normal_faster()[:3] for polygon in self.polygons])
+        outward = self.vertices[self.center_faces, :3].mean(axis=1) - self.vertices[:, :3].mean(axis=0)
+        normals[np.einsum("ij,ij->i", normals, outward) < 0] *= -1
+        return(normals)
 
     cpdef initialize_points(self):
         """
@@ -52,38 +107,58 @@ cdef class Mesh(object):
     cpdef update(self):
         """
         called on every frame
-        apply transformation matrix and project every polygon to 2d
-        for color avg_z function is used
-        polygons are sorted on avg_z value
+        apply transformation matrix to all vertices at once and project them to 2d
+        faces pointing away from viewer are culled
+        for color angle between face normal and light source is used
+        faces are sorted on distance to viewer
 
-        finally painting on surface is called
+        finally painting on surface is called,
+        returns rect drawn to
         """
-        cdef np.ndarray light_positon
-        cdef np.ndarray pos_vec
-        cdef np.ndarray v_light
-        cdef np.ndarray normal
-        cdef double light_angle
-        cdef int normal_color
-        # light from above
-        #light_position = np.array((0.0, 0.0, 10.0, 1.0), dtype=DTYPE)
-        # apply linear transformations to vetices
-        # daw faces fom lowe z to higher
+        cdef np.ndarray transformation
+        cdef np.ndarray transformed
+        cdef np.ndarray projected
+        cdef np.ndarray faces
+        cdef np.ndarray centers
+        cdef np.ndarray normals
+        cdef np.ndarray view
+        cdef np.ndarray visible
+        cdef np.ndarray order
+        cdef np.ndarray shades
         transformation = self.transformations[self.frames % self.len_transformations]
-        color = pygame.Color(200, 200, 200, 255)
-        for polygon in self.polygons:
-            # apply transformation to every vertice in polygon
-            newpolygon = polygon.transform(transformation)
-            # get new position vector
-            #pos_vec = newpolygon.get_position_vector()
-            # calculate vector from face to lightsource
-            #v_light = pos_vec - light_position
-            # get the normal of the face
-            #normal = newpolygon.get_normal_faster()
-            # calculate angle between face normal and vector to light source
-            #light_angle = Utils3d.angle_to(normal, v_light)
+        # row vectors, so v' = M.v becomes v' = v.M^T for all vertices
+        transformed = self.vertices.dot(transformation.T)
+        projected = Utils3d.project_vertices(transformed, self.origin_x, self.origin_y, self.fov, self.viewer_distance)
+        faces = self.faces
+        # position vector of every face
+        centers = transformed[self.center_faces, :3].mean(axis=1)
+        # vector from viewer to every face, viewer sits at z = -viewer_distance
+        view = centers.copy()
+        view[:, 2] += self.viewer_distance
+        # normals transform with inverse transpose of linear part,
+        # as row vectors n' = n.(M^-1)
+        normals = self.normals.dot(np.linalg.inv(transformation[:3, :3]))
+        if self.culling:
+            visible = np.einsum("ij,ij->i", normals, view) < 0
+            faces = faces[visible]
+            centers = centers[visible]
+            view = view[visible]
+            normals = normals[visible]
+        # draw faces from far to near
+        order = np.argsort(-np.einsum("ij,ij->i", view, view))
+        if self.shading:
             # angle to light source in radians, between 0 and math.pi
-            #normal_color = int(light_angle * 255 / math.pi)
-            #avg_z = max(min(abs(int(newface.get_avg_z() * 10)), 255), 0) 
-            #color = pygame.Color(normal_color, normal_color, normal_color, 255)
-            pygame.draw.polygon(self.surface, color, newpolygon.projected(self.origin_x, self.origin_y), 1)
+            shades = (Utils3d.angles_to(normals, centers - self.light_position) * 255 / math.pi).astype(int)
+            for points, shade in zip(projected[faces[order]].tolist(), shades[order].tolist()):
+                pygame.draw.polygon(self.surface, (shade, shade, shade), points, 0)
+        else:
+            color = pygame.Color(200, 200, 200, 255)
+            for points in projected[faces[order]].tolist():
+                pygame.draw.polygon(self.surface, color, points, 1)
         self.frames += 1
+        # bounding box of all drawn vertices
+        if len(faces) == 0:
+            return pygame.Rect(0, 0, 0, 0)
+        used = projected[np.unique(faces)]
+        return pygame.Rect(int(used[:, 0].min()), int(used[:, 1].min()),
+            int(used[:, 0].max() - used[:, 0].min()) + 2, int(used[:, 1].max() - used[:, 1].min()) + 2)
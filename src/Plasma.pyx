@@ -6,88 +6,90 @@ import random
 import array
 import numpy as np
 cimport numpy as np
-DTYPE = np.float
-ctypedef np.float_t DTYPE_t
+# own modules
+from TrigTable import get_table
 
 
 cdef class Plasma(object):
-    """Plasma Effect on Surface"""
+    """Plasma Effect on Surface
+
+    every frame is calculated as whole array operations,
+    x/y phase grids are precalculated in initialize,
+    values are mapped through palette lookup table directly
+    into pixels2d of surface, no intermediate allocations
+    """
 
     cdef int tick
     cdef object surface
     cdef object parent
-    cdef object sin
-    cdef object cos
+    cdef np.ndarray sin
+    cdef np.ndarray sin_xy
+    cdef np.ndarray palette
+    cdef np.ndarray x8
+    cdef np.ndarray y8
+    cdef np.ndarray xy8
+    cdef np.ndarray phase
+    cdef np.ndarray value
 
     def __init__(self, surface, scale=1):
         """
         (pygame.Surface) surface - surface to draw on
-        (int) scale - scaling factor
+        (int) scale - scaling factor, 1 draws directly on surface
         """
         # initialize things
         self.tick = 0
         self.parent = surface
-        self.surface = pygame.Surface(surface.get_size())
-        self.surface = pygame.transform.scale(self.surface, (int(self.surface.get_width() / scale), int(self.surface.get_height() / scale)))
-        print "using %s arraytype" % pygame.surfarray.get_arraytype()
-        self.sin = array.array("f", [0.0] * 512)
-        self.cos = array.array("f", [0.0] * 512)
+        if scale == 1:
+            self.surface = surface
+        else:
+            self.surface = pygame.Surface((int(surface.get_width() / scale), int(surface.get_height() / scale)), 0, surface)
         self.initialize()
 
     cdef initialize(self):
-        cdef rad_to_degree = math.pi / 180
-        for degree in range(512):
-            rad = degree * rad_to_degree * 512/360
-            self.sin[degree] = math.sin(rad)
-            self.cos[degree] = math.cos(rad)
+        """precalculate tables and phase grids, allocate frame buffers"""
+        cdef int width = self.surface.get_width()
+        cdef int height = self.surface.get_height()
+        # 512 entries sinus table, two full turns of the shared table
+        # with 256 phases, in fixed point with factor 64
+        cdef np.ndarray sin = get_table(256).sin_array(np.arange(512))
+        self.sin = np.rint(sin * 64).astype(np.int32)
+        # ((x8 + y8 + t) >> 2) & 511 is the same as
+        # table[(x8 + y8 + t) & 2047] with every entry four times
+        self.sin_xy = np.repeat(self.sin, 4)
+        # palette, v in -4 to +4 is shifted by 4 and scaled by 64
+        self.palette = np.array([self.surface.map_rgb((min(255, int(128 + value * 128)), 0, 0)) for value in sin], dtype=np.uint32)
+        # shift by 3 bits, equals multiplication by 8
+        self.x8 = np.arange(width, dtype=np.int32) << 3
+        self.y8 = np.arange(height, dtype=np.int32) << 3
+        # same memory layout as pixels2d, x is the fast axis
+        self.xy8 = np.asfortranarray(self.x8[:, np.newaxis] + self.y8[np.newaxis, :])
+        self.phase = np.empty_like(self.xy8)
+        self.value = np.empty_like(self.xy8)
 
     cdef calculate(self):
-        """version with math.sin"""
-        cdef int t
-        cdef int xx
-        cdef int yy
-        cdef int y8
-        cdef int x8
-        cdef int index
-        cdef double v
-        cdef double ysin
-        #cdef double rad_to_degree =  math.pi / 180
-        cdef np.ndarray pixel2d
-        t = self.tick
+        """version with whole array operations"""
+        cdef int t = self.tick
+        cdef np.ndarray ysin
+        cdef np.ndarray xsin
+        # these values are the same for every xx, shifted by 4*64
+        ysin = self.sin[((self.y8 + t) >> 2) & 511] + 256
+        # these values are the same for every yy
+        xsin = self.sin[(self.x8 + t) & 511]
+        # & 2047 makes sure, that the result is in between 0-2048
+        np.add(self.xy8, t, out=self.phase)
+        np.bitwise_and(self.phase, 2047, out=self.phase)
+        np.take(self.sin_xy, self.phase, out=self.value)
+        self.value += xsin[:, np.newaxis]
+        self.value += ysin[np.newaxis, :]
+        # get to color up your life, palette lookup into surface
         pixel2d = pygame.surfarray.pixels2d(self.surface)
-        for yy in range(self.surface.get_height()):
-            # these two values are the same for every xx
-            y8 = yy << 3
-            ysin = self.sin[(y8 + t) >> 2 & 511]
-            for xx in range(self.surface.get_width()):
-                # shift by 3 bits, equals multiplication by 8
-                x8 = (xx << 3) + t
-                # & 511 makes sure, that the result is in between 0-512
-                v = ysin + self.sin[x8 & 511]
-                v += self.sin[(x8 + y8) >> 2 & 511]
-                # this square root cost about 20 fps
-                #v += self.sin[(int(math.sqrt(100 * (cx * cx + cy * cy) + 1)) + t) & 511]
-                # get to color up your life, calculate hue
-                # v should be in boundary -4 to +4, range of 8
-                # so get to my array type sin, it should be shifted by 4 and scaled by 64
-                index = int((v + 4) * 64)
-                pixel2d[xx, yy] = int(128 + self.sin[index] * 128) << 16
+        np.take(self.palette, self.value, out=pixel2d, mode="clip")
+        del pixel2d
         self.tick += 5
 
-    cdef calculate2(self):
-        """version with math.sin"""
-        cdef int xx
-        cdef int yy
-        cdef np.ndarray pixel2d
-        pixel2d = pygame.surfarray.pixels2d(self.surface)
-        for yy in range(self.surface.get_height()):
-            for xx in range(self.surface.get_width()):
-                pixel2d[xx, yy] = 1 << 24
-     
     cpdef update(self):
         """update every frame"""
         self.calculate()
-        # scale surface to size of parent surface to fit
-        pygame.transform.scale(self.surface, self.parent.get_size(), self.parent)
-
-
+        if self.surface is not self.parent:
+            # scale surface to size of parent surface to fit
+            pygame.transform.scale(self.surface, self.parent.get_size(), self.parent)
@@ -1,33 +1,53 @@
 #!/usr/bin/python
 from __future__ import division
 import pygame
-import math
-import random
-import array
 import numpy as np
 cimport numpy as np
-DTYPE = np.float
-ctypedef np.float_t DTYPE_t
+# own modules
+from DiamondSquare import diamond_square, next_power_of_two, to_index
 
 
 cdef class PlasmaFractal(object):
+    """Plasma Fractal
+
+    heightmap is generated once with iterative diamond-square in
+    DiamondSquare, and kept as 8 bit palette index in a surface with
+    palette. every frame the palette built from ComputeColor is rotated
+    and the surface is blitted, there is no work per pixel in python
+    """
 
     cdef object surface
+    cdef object rng
+    cdef public double roughness
+    cdef public int speed
+    cdef public bint cycle
+    cdef int size
+    cdef int tick
+    cdef list colors
+    cdef object indexed
 
-    def __init__(self, surface, scale=1):
+    def __init__(self, surface, scale=1, seed=None, roughness=1.5, cycle=True, speed=1):
         """
         (pygame.Surface) surface - surface to draw on
         (int) scale - scaling factor
+        (int) seed - seed of random generator, None for random plasma
+        (float) roughness - random displacement of midpoints
+        (bool) cycle - if True, plasma is generated once and animated
+            by rotating the palette, else new plasma every frame
+        (int) speed - palette entries rotated per frame
         """
         # initialize things
         self.surface = surface
-        #self.surface = pygame.Surface(surface.get_size())
-        #self.surface = pygame.transform.scale(self.surface, (self.surface.get_width() / scale, self.surface.get_height() / scale))
-        #print "using %s arraytype" % pygame.surfarray.get_arraytype()
-
-    cdef Displace(self, float num):
-        cdef float maximum = num / (self.surface.get_width() + self.surface.get_height()) * 3
-        return((random.random() - 0.5) * maximum)
+        self.rng = np.random.default_rng(seed)
+        self.roughness = roughness
+        self.cycle = cycle
+        self.speed = speed
+        self.tick = 0
+        # heightmap is square with power of two size, cut to surface
+        self.size = next_power_of_two(max(surface.get_width(), surface.get_height()))
+        self.colors = [self.ComputeColor(index / 255.0) for index in range(256)]
+        self.indexed = pygame.Surface(surface.get_size(), 0, 8)
+        self.generate()
 
     cdef ComputeColor(self, float c):
         cdef float red
@@ -49,49 +69,19 @@ cdef class PlasmaFractal(object):
             blue = (0.5 - c) * 2
         return(pygame.Color(int(red*255), int(green*255), int(blue*255)))
 
-    cpdef update(self):
-            """
-            This is something of a helper function to create an initial grid
-            before the recursive function is called.
-            """
-            cdef float c1, c2, c3, c4
-            #Assign the four corners of the intial grid random color values
-            #These will end up being the colors of the four corners of the applet.
-            c1 = random.random()
-            c2 = random.random()
-            c3 = random.random()
-            c4 = random.random()
-            self.DivideGrid(0, 0, self.surface.get_width(), self.surface.get_height(), c1, c2, c3, c4)
+    cpdef generate(self):
+        """new plasma with random corners into 8 bit index surface"""
+        cdef int width = self.surface.get_width()
+        cdef int height = self.surface.get_height()
+        heights = diamond_square(self.size, self.roughness, self.rng)
+        pygame.surfarray.blit_array(self.indexed, to_index(heights[:width, :height]))
 
-    cdef DivideGrid(self, float x, float y, float width, float height, float c1, float c2, float c3, float c4):
+    cpdef update(self):
         """
-        This is the recursive function that implements the random midpoint
-        //displacement algorithm. It will call itself until the grid pieces
-        //become smaller than one pixel.
+        rotate palette and blit plasma, returns rect drawn to
         """
-        cdef float Edge1, Edge2, Edge3, Edge4, Middle
-        cdef float newWidth = width / 2
-        cdef float newHeight = height / 2
-        cdef float c
-
-        if width > 2 or height > 2:
-            Middle = (c1 + c2 + c3 + c4) / 4 + self.Displace(newWidth + newHeight)  #Randomly displace the midpoint!
-            Edge1 = (c1 + c2) / 2  #Calculate the edges by averaging the two corners of each edge.
-            Edge2 = (c2 + c3) / 2
-            Edge3 = (c3 + c4) / 2
-            Edge4 = (c4 + c1) / 2
-
-            #Make sure that the midpoint doesn't accidentally "randomly displaced" past the boundaries!
-            if Middle < 0:
-                Middle = 0
-            elif Middle > 1.0:
-                Middle = 1.0
-            #Do the operation over again for each of the four new grids.
-            self.DivideGrid(x, y, newWidth, newHeight, c1, Edge1, Middle, Edge4)
-            self.DivideGrid(x + newWidth, y, newWidth, newHeight, Edge1, c2, Edge2, Middle)
-            self.DivideGrid(x + newWidth, y + newHeight, newWidth, newHeight, Middle, Edge2, c3, Edge3)
-            self.DivideGrid(x, y + newHeight, newWidth, newHeight, Edge4, Middle, Edge3, c4)
-        else:    #This is the "base case," where each grid piece is less than the size of a pixel.
-            #The four corners of the grid piece will be averaged and drawn as a single pixel.
-            c = (c1 + c2 + c3 + c4) / 4
-            self.surface.set_at((int(x), int(y)), self.ComputeColor(c)) #Java doesn't have a function to draw a single pixel, so
+        if not self.cycle:
+            self.generate()
+        self.indexed.set_palette(self.colors[self.tick:] + self.colors[:self.tick])
+        self.tick = (self.tick + self.speed) % 256
+        return self.surface.blit(self.indexed, (0, 0))
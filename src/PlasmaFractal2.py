@@ -3,69 +3,69 @@
 
 import sys
 import pygame
-import random
-import math
+import numpy
+# own modules
+from DiamondSquare import diamond_square, next_power_of_two, tile
 
 class PlasmaFractal2(object):
-    """Plasma Generator"""
+    """Plasma Generator
 
-    def __init__(self, surface):
+    heightmap is generated once with iterative diamond-square in
+    DiamondSquare, values wrap around at 256 and are kept as palette
+    index in a surface with 8 bit palette. with speed the palette is
+    rotated every frame, which animates the plasma for free
+    """
+
+    def __init__(self, surface, seed=None, tile_size=None, speed=0):
         """
         (pygame.Surface) surface - surface to draw on
+        (int) seed - seed of random generator, None for random plasma
+        (int) tile_size - power of two, if given a seamless tile of this
+            size is generated and repeated over surface
+        (int) speed - palette entries rotated per frame, 0 for static image
         """
         self.surface = surface
         # set some values
         self.width = self.surface.get_width()
         self.height = self.surface.get_height()
-        self.roughness = random.randint(2, 5)
-        self.data = [[0 for y in range(self.height)] for x in range(self.width)]
-        self.array2d = pygame.surfarray.array2d(self.surface)
+        self.rng = numpy.random.default_rng(seed)
+        self.roughness = int(self.rng.integers(2, 6))
+        self.tile_size = tile_size
+        self.speed = speed
+        self.tick = 0
+        # green plasma, palette index is value of green
+        self.colors = [(0, value, 100) for value in range(256)]
+        self.indexed = pygame.Surface((self.width, self.height), 0, 8)
+        self.indexed.set_palette(self.colors)
         self.initialize()
-        print "done" 
-
-    def adjust(self, xa, ya, x, y, xb, yb):
-        if (self.data[x][y] == 0):
-          d = math.fabs(xa - xb) + math.fabs(ya - yb)
-          v = (self.data[xa][ya] + self.data[xb][yb]) / 2.0 \
-             + (random.random() - 0.5) * d * self.roughness
-          c = int(math.fabs(v) % 256)
-          self.data[x][y] = c
-
-    def subdivide(self, x1, y1, x2, y2):
-        if (not ((x2 - x1 < 2.0) and (y2 - y1 < 2.0))):
-            x = int((x1 + x2) / 2.0)
-            y = int((y1 + y2) / 2.0)
-            self.adjust(x1, y1, x, y1, x2, y1)
-            self.adjust(x2, y1, x2, y, x2, y2)
-            self.adjust(x1, y2, x, y2, x2, y2)
-            self.adjust(x1, y1, x1, y, x1, y2)
-            if(self.data[x][y] == 0):
-                v = int((self.data[x1][y1] + self.data[x2][y1]) \
-                   + self.data[x2][y2] + self.data[x1][y2]) / 4.0
-                self.data[x][y] = v
-            self.subdivide(x1, y1, x, y)
-            self.subdivide(x, y1, x2, y)
-            self.subdivide(x, y, x2, y2)
-            self.subdivide(x1, y, x, y2)
+        print("done")
 
     def initialize(self):
-        ## {{{ http://code.activestate.com/recipes/577113/ (r1)
-        # plasma.py
-        # plasma fractal
-        # FB - 201003147
-        self.data[0][0] = random.randint(0, 255)
-        self.data[self.width - 1][0] = random.randint(0, 255)
-        self.data[self.width - 1][self.height - 1] = random.randint(0, 255)
-        self.data[0][self.height - 1] = random.randint(0, 255)
-        self.subdivide(0, 0, self.width - 1, self.height - 1)
-        for y in range(self.height):
-            for x in range(self.width):
-                self.array2d[x][y] = pygame.Color(0, int(self.data[x][y]), 100)
-        ## end of http://code.activestate.com/recipes/577113/ }}}
+        """generate heightmap and pixels"""
+        ## idea of http://code.activestate.com/recipes/577113/ (r1)
+        # plasma fractal, corners are random in 0 to 255, midpoints are
+        # displaced by roughness per pixel of width of cell
+        if self.tile_size is None:
+            size = next_power_of_two(max(self.width, self.height))
+        else:
+            size = self.tile_size
+        # heights are in units of 256 values
+        data = diamond_square(size, self.roughness * size / 256.0, self.rng,
+            corners=self.rng.integers(0, 256, 4) / 256.0, tileable=self.tile_size is not None)
+        if self.tile_size is None:
+            data = data[:self.width, :self.height]
+        else:
+            data = tile(data, self.width, self.height)
+        # values wrap around, like abs(v) % 256
+        index = (numpy.abs(data) * 256).astype(numpy.int64) & 255
+        pygame.surfarray.blit_array(self.indexed, index.astype(numpy.uint8))
 
     def update(self):
-        """blit pixelarray to surface"""
-        pygame.surfarray.blit_array(self.surface, self.array2d)
+        """blit plasma to surface, returns rect drawn to"""
+        if self.speed:
+            self.tick = (self.tick + self.speed) % 256
+            self.indexed.set_palette(self.colors[self.tick:] + self.colors[:self.tick])
+        return self.surface.blit(self.indexed, (0, 0))
 
 
 def test():
@@ -73,7 +73,7 @@ def test():
         fps = 1
         pygame.init()
         surface = pygame.display.set_mode((800, 600))
-        print pygame.display.Info()
+        print(pygame.display.Info())
         thing = PlasmaFractal2(surface)
         clock = pygame.time.Clock()       
         pause = False
@@ -92,7 +92,7 @@ def test():
                 thing.update()
                 pygame.display.flip()
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 
 if __name__ == '__main__':
@@ -7,6 +7,8 @@ import math
 # from scipy.weave import converters
 import time
 import Plasma
+# own modules
+from TrigTable import get_table
 from Plasma import Plasma as Plasma
 from Plasma import PlasmaFractal as PlasmaFractal
 
@@ -46,18 +48,13 @@ class PlasmaPy(object):
                 yy = height
                 self.data.append((x, y, width, height, xx, yy))
                 counter += 1
-        self.sins = []
-        self.steps = int(2000 * math.pi)
-        step = 2 * math.pi / self.steps
-        radian = 0.0
-        for i in range(self.steps):
-            self.sins.append(math.sin(radian))
-            radian += step
-        assert abs(self.sin(math.pi/4) - 1.0) <= .1
+        # shared table, 8192 phases are about 1300 per radian
+        self.table = get_table(8192)
+        assert abs(self.sin(math.pi/2) - 1.0) <= .1
 
     def sin(self, radian):
-        """own sin method for precalculated sin values in list"""
-        return(self.sins[int(radian * 2000) % self.steps])
+        """own sin method for precalculated sin values in shared table"""
+        return(self.table.sin_radians(radian))
 
     def calculate(self, data):
         """version with math.sin"""
@@ -111,7 +108,7 @@ def test():
     try:
         #fps = 50
         surface = pygame.display.set_mode((400, 225))
-        print pygame.display.Info()
+        print(pygame.display.Info())
         pygame.init()
         things = (
             Plasma(surface, scale=2),
@@ -146,9 +143,9 @@ def test():
                 # pygame.display.flip()
             frames += 1
         duration = time.time() - starttime
-        print "Done %s frames in %s seconds, %s frames/s" % (frames, duration, frames/duration)
+        print("Done %s frames in %s seconds, %s frames/s" % (frames, duration, frames / duration))
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 if __name__ == "__main__":
     test()
@@ -15,4 +15,4 @@ cdef class PointC(object):
     def __iadd__(self, other):
         self.x += other.x
         self.y += other.y
-        return()
+        return(self)
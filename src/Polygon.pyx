@@ -31,9 +31,13 @@ cdef class Polygon(object):
         self.len_vertices = len(vertices)
         self.normal = self._get_normal_faster()
 
+    cpdef np.ndarray get_vertices(self):
+        """return vertices as (n x 4) ndarray"""
+        return(self.vertices)
+
     cpdef double get_avg_z(self):
         """return average z of vertices"""
-        return(self.vertices[:,2] / self.len_vertices)
+        return(self.vertices[:, 2].sum() / self.len_vertices)
 
     cpdef Polygon transform(self, np.ndarray matrix):
         """apply transformation to all vertices"""
@@ -165,17 +169,17 @@ cdef class Polygon(object):
 
     def __richcmp__(obj1, obj2, method):
         if method == 0: # < __lt__
-            return(obj1.get_avg_z() < obj2.self.avg_z())
+            return(obj1.get_avg_z() < obj2.get_avg_z())
         elif method == 2: # == __eq__
             return(obj1.vertices == obj2.vertices)
         elif method == 4: # > __gt__
-            return(obj1.get_avg_z() > obj2.self.avg_z())
+            return(obj1.get_avg_z() > obj2.get_avg_z())
         elif method == 1: # <= lower_equal
-            return(obj1.get_avg_z() <= obj2.self.avg_z())
+            return(obj1.get_avg_z() <= obj2.get_avg_z())
         elif method == 3: # != __ne__
             return(obj1.vertices != obj2.vertices)
         elif method == 5: # >= greater equal
-            return(obj1.get_avg_z() >= obj2.self.avg_z())
+            return(obj1.get_avg_z() >= obj2.get_avg_z())
  
     def __str__(self):
         return(str(self.vertices))
@@ -3,9 +3,19 @@
 import pygame
 import sys
 import math
+import numpy as np
+# own modules
+from GlyphAtlas import TextLine
 
 class SinusText(object):
-    """Sinus wave scroll text"""
+    """Sinus wave scroll text
+
+    vertical displacement of every column is calculated once into a
+    table. every frame the glyphs of the visible window of the text are
+    blitted from the shared glyph atlas, and warped with one array
+    gather into a strip of the height of the wave, which is blitted
+    with one call
+    """
 
     def __init__(self, surface, text, hpos, amplitude, frequency, color, size=30):
         """
@@ -19,7 +29,7 @@ class SinusText(object):
         """
         self.surface = surface
         # prepend an append some spaces
-        appendix = " " * (self.surface.get_width() / size)
+        appendix = " " * (self.surface.get_width() // size)
         self.text = appendix + text + appendix
         self.hpos = hpos
         self.amplitude = amplitude
@@ -27,37 +37,62 @@ class SinusText(object):
         self.color = color
         self.size = size
         # initialize
-        self.font = None
-        self.text_surface = None
-        self.initialize()
+        self.line = None
         # position in rendered string
         self.position = 0
         # radian to degree
         self.factor = 2 * math.pi / self.surface.get_width()
+        self.initialize()
 
     def initialize(self):
-        """generate initial position"""
-        self.font = pygame.font.SysFont("mono", self.size, bold=True)
-        self.text_surface = self.font.render(self.text, True, self.color)
+        """generate initial position and displacement table"""
+        self.line = TextLine(self.text, ("mono", self.size, True), self.color)
+        # displacement of every column of surface
+        self.waves = np.sin(np.arange(self.surface.get_width()) * self.frequency * self.factor) * self.amplitude
+        self.calculate(self.hpos)
+
+    def calculate(self, hpos):
+        """strip for wave at hpos and row in text pixels of every pixel of strip"""
+        self.hpos = hpos
+        # only the first size rows of every column are drawn
+        rows = min(self.size, self.line.height)
+        # y of every column, truncated like blit does
+        ys = (self.hpos + self.waves).astype(int)
+        self.top = ys.min()
+        # visible window of text
+        self.window = pygame.Surface((len(ys), rows), pygame.SRCALPHA, self.line.atlas.surface)
+        self.strip = pygame.Surface((len(ys), ys.max() - self.top + rows), pygame.SRCALPHA, self.window)
+        # window pixels with transparent rows above and below, so every
+        # row of strip is a valid index into it
+        self.pad = self.strip.get_height()
+        self.text_pixels = np.zeros((len(ys), rows + 2 * self.pad), dtype=np.uint32)
+        self.rows = np.arange(self.strip.get_height())[np.newaxis, :] - (ys - self.top)[:, np.newaxis] + self.pad
 
     def update(self, hpos=None):
         """
-        update every frame
+        update every frame, returns rect drawn to
         (int)hpos y axis offset
         """
-        if hpos is not None:
-            self.hpos = hpos
-        for offset in range(self.text_surface.get_width()):
-            self.surface.blit( \
-                self.text_surface, \
-                (0 + offset, self.hpos + math.sin(offset * self.frequency * self.factor) * self.amplitude), \
-                (self.position + offset, 0, 1, self.size) \
-            )
-        if self.position < self.text_surface.get_width():
+        if hpos is not None and hpos != self.hpos:
+            self.calculate(hpos)
+        # visible window of text, the rest of the text is right of surface
+        visible = min(self.surface.get_width(), self.line.width - self.position)
+        if visible > 0:
+            self.window.fill((0, 0, 0, 0))
+            self.line.draw(self.window, (0, 0), self.position, visible, special_flags=pygame.BLEND_RGBA_MAX)
+            self.text_pixels[:, self.pad:self.pad + self.window.get_height()] = pygame.surfarray.pixels2d(self.window)
+            pixels = pygame.surfarray.pixels2d(self.strip)
+            pixels[:visible] = self.text_pixels[np.arange(visible)[:, np.newaxis], self.rows[:visible]]
+            del pixels
+            rect = self.surface.blit(self.strip, (0, self.top), (0, 0, visible, self.strip.get_height()))
+        else:
+            rect = pygame.Rect(0, 0, 0, 0)
+        if self.position < self.line.width:
             self.position += 2
         else:
             self.position = 0
- 
+        return rect
+
 
 def test():
     try:
@@ -85,7 +120,7 @@ def test():
                     thing.update(hpos=None)
                 pygame.display.flip()
     except KeyboardInterrupt:
-        print 'shutting down'
+        print('shutting down')
 
 if __name__ == '__main__':
     test()
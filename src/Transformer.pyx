@@ -0,0 +1,139 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import math
+import collections
+import numpy as np
+cimport numpy as np
+DTYPE = np.float64
+ctypedef np.float64_t DTYPE_t
+# own modules
+import Utils3d
+
+# sin/cos for every whole degree, shared by all transformers
+cdef np.ndarray SIN = np.sin(np.radians(np.arange(360)))
+cdef np.ndarray COS = np.cos(np.radians(np.arange(360)))
+
+
+cdef tuple sin_cos(double degree):
+    """return (sin, cos) of angle in degrees, from table if possible"""
+    cdef int index
+    if degree == int(degree):
+        index = int(degree) % 360
+        return((SIN[index], COS[index]))
+    return((math.sin(degree * math.pi / 180), math.cos(degree * math.pi / 180)))
+
+
+cdef class RotationTransformer(object):
+    """
+    lazy source of transformation matrices for Mesh
+
+    the same transformations as Utils3d.get_rot_matrix, but every
+    matrix is composed only if the frame is drawn, from cached
+    sin/cos values. the last cache_size matrices are kept in a LRU
+    cache, so memory and startup time do not grow with steps.
+
+    supports len() and indexing like the precalculated list,
+    index is the frame number
+    """
+
+    cdef np.ndarray static_transformation
+    cdef tuple degrees
+    cdef int steps
+    cdef int cache_size
+    cdef object cache
+
+    def __init__(self, np.ndarray static_transformation, tuple degrees, int steps=360, int cache_size=64):
+        """
+        static_transformation of type np.ndarray, will be applied to every step
+        degrees of type tuple, for every axis one entry in degrees
+        steps of type int, after how many frames animation repeats
+        cache_size of type int, how many matrices to keep
+        """
+        self.static_transformation = static_transformation
+        self.degrees = degrees
+        self.steps = steps
+        self.cache_size = cache_size
+        self.cache = collections.OrderedDict()
+
+    def __len__(self):
+        return(self.steps)
+
+    def __getitem__(self, int frame):
+        return(self.get(frame % self.steps))
+
+    cpdef np.ndarray get(self, int step):
+        """return transformation matrix for step, from cache if possible"""
+        cdef np.ndarray transformation
+        try:
+            transformation = self.cache[step]
+            self.cache.move_to_end(step)
+            return(transformation)
+        except KeyError:
+            pass
+        transformation = self.static_transformation.dot(self.get_rotation(step))
+        self.cache[step] = transformation
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return(transformation)
+
+    cpdef np.ndarray get_rotation(self, int step):
+        """
+        return rotation matrix of step, same as
+        get_rot_z_matrix . get_rot_x_matrix . get_rot_y_matrix
+        but composed in one go
+        """
+        cdef double sx, cx, sy, cy, sz, cz
+        (sx, cx) = sin_cos(self.degrees[0] * step)
+        (sy, cy) = sin_cos(self.degrees[1] * step)
+        (sz, cz) = sin_cos(self.degrees[2] * step)
+        return(np.array((
+            (cz * cy + sz * sx * sy, -sz * cx, cz * sy - sz * sx * cy, 0),
+            (sz * cy - cz * sx * sy,  cz * cx, sz * sy + cz * sx * cy, 0),
+            (              -cx * sy,      -sx,                cx * cy, 0),
+            (                     0,        0,                      0, 1)
+            ), dtype=DTYPE))
+
+    cpdef np.ndarray pack(self):
+        """
+        return all steps as packed (steps x 4 x 4) ndarray,
+        for cases where precalculation is preferred, Mesh
+        accepts this array as transformations too
+        """
+        cdef np.ndarray angles = np.arange(self.steps) * np.radians(self.degrees)[:, np.newaxis]
+        cdef np.ndarray sin = np.sin(angles)
+        cdef np.ndarray cos = np.cos(angles)
+        (sx, sy, sz) = sin
+        (cx, cy, cz) = cos
+        cdef np.ndarray rotations = np.zeros((self.steps, 4, 4), dtype=DTYPE)
+        rotations[:, 0, 0] = cz * cy + sz * sx * sy
+        rotations[:, 0, 1] = -sz * cx
+        rotations[:, 0, 2] = cz * sy - sz * sx * cy
+        rotations[:, 1, 0] = sz * cy - cz * sx * sy
+        rotations[:, 1, 1] = cz * cx
+        rotations[:, 1, 2] = sz * sy + cz * sx * cy
+        rotations[:, 2, 0] = -cx * sy
+        rotations[:, 2, 1] = -sx
+        rotations[:, 2, 2] = cx * cy
+        rotations[:, 3, 3] = 1
+        return(np.matmul(self.static_transformation, rotations))
+
+
+cpdef RotationTransformer flying_cubes_t(int x, int y, tuple center=(300, 300), double fov=0.8, double viewer_distance=1):
+    """
+    transformations for one cube of flying_cubes,
+    rotating cube which appears at screen position x, y
+    if drawn by Mesh with origin center
+    """
+    # far in front of the viewer, so perspective does not smear the
+    # cubes at the border, viewer_distance + z has to stay positive
+    cdef double z = 100
+    # screen offset = world offset * fov / (viewer_distance + z)
+    cdef double factor = fov / (viewer_distance + z)
+    static_transformation = Utils3d.get_scale_rot_matrix(
+        scale_tuple=(1000, 1000, 1),
+        aspect_tuple=(16, 9),
+        shift_tuple=((x - center[0]) / factor, -(y - center[1]) / factor, z))
+    # every cube rotates a little different
+    degrees = ((x // 50) % 3 + 1, (y // 50) % 3 + 1, 1)
+    return(RotationTransformer(static_transformation, degrees, steps=360))
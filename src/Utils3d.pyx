@@ -18,6 +18,20 @@ cpdef np.ndarray project(vec1, int win_width, int win_height, double fov, double
     y = -vec1[1] * factor + win_height / 2
     return(np.array((x, y, 1), dtype=DTYPE))
 
+cpdef np.ndarray project_vertices(np.ndarray vertices, int shift_x, int shift_y, double fov, double viewer_distance):
+    """
+    project (n x 4) array of vertices to (n x 2) array of 2d points
+    same perspective projection as Polygon.projected, but for
+    all vertices in one call
+    """
+    cdef np.ndarray factor = fov / (viewer_distance + vertices[:, 2])
+    cdef np.ndarray points = np.empty((vertices.shape[0], 2), dtype=DTYPE)
+    np.multiply(vertices[:, 0], factor, out=points[:, 0])
+    points[:, 0] += shift_x
+    np.multiply(vertices[:, 1], -factor, out=points[:, 1])
+    points[:, 1] += shift_y
+    return(points)
+
 cpdef np.ndarray get_identity_matrix():
     return(np.eye(4))
 
@@ -182,7 +196,7 @@ cpdef list get_pyramid_polygons():
     face = face.dot(get_rot_x_matrix(-math.pi/4))
     face = face.dot(get_rot_y_matrix(math.pi/2))
     face = face.dot(get_shift_matrix(-1, 0, 0))
-    polygons.append(face)
+    polygons.append(Polygon(face))
     return(polygons)
 
 cpdef list get_cube_polygons():
@@ -209,6 +223,29 @@ cpdef list get_cube_polygons():
     polygons.append(rec.transform(t))
     return(polygons)
 
+cpdef tuple pack_polygons(list polygons):
+    """
+    pack list of polygons into one mesh representation
+
+    returns (vertices, faces)
+    vertices (n x 4) ndarray, every vertex only once, also if shared by polygons
+    faces (number of polygons x k) ndarray index buffer into vertices,
+    all polygons have to consist of the same number k of vertices
+    """
+    cdef list face_vertices = []
+    cdef set lengths = set()
+    for polygon in polygons:
+        if isinstance(polygon, Polygon):
+            polygon = polygon.get_vertices()
+        face_vertices.append(polygon)
+        lengths.add(len(polygon))
+    if len(lengths) != 1:
+        raise(ValueError("all polygons of a mesh must have the same number of vertices"))
+    # round to find shared vertices, adding 0.0 turns -0.0 into 0.0
+    cdef np.ndarray stacked = np.vstack(face_vertices).round(decimals=9) + 0.0
+    vertices, index = np.unique(stacked, axis=0, return_inverse=True)
+    return((vertices.astype(DTYPE), index.reshape(len(face_vertices), -1)))
+
 cpdef np.ndarray get_scale_rot_matrix(scale_tuple, aspect_tuple, shift_tuple):
     """
     create a affinde transformation matrix
@@ -296,6 +333,16 @@ cpdef double angle_to(vector, other):
     cdef double dotproduct = v1.dot(v2)
     return(math.acos(dotproduct))
 
+cpdef np.ndarray angles_to(np.ndarray vectors, np.ndarray others):
+    """
+    angle_to for (n x 3) arrays, one angle for every row pair
+    returns angles in radians between 0 and math.pi
+    """
+    cdef np.ndarray dotproducts = np.einsum("ij,ij->i", vectors, others)
+    dotproducts /= np.linalg.norm(vectors, axis=1) * np.linalg.norm(others, axis=1)
+    # rounding errors could push the cosine out of -1..1
+    return(np.arccos(np.clip(dotproducts, -1.0, 1.0)))
+
 cpdef double angle_to_unit(vector, other):
     """this version assumes that these two vectors are unit vectors"""
     return(math.acos(vector.dot(other)))